@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Sharded False-Friend Auto-Detection
+
+auto_detect_false_friends() as a map-reduce over the filesystem, for when
+scoring every shared JMdict/CEDICT word gets too heavy for one process:
+
+    map     shard i of N scores the shared words whose CRC-32 falls in
+            bucket i (stable across processes, machines and Python hash
+            seeds) and writes part-0000i-of-0000N.jsonl, sorted by rank
+    reduce  checks that all N parts exist and agree on the threshold,
+            merges them in rank order and returns the same ranked
+            FalseFriend list auto_detect_false_friends() produces, ready
+            for merge_false_friends()
+
+Parts are written to a temp file and renamed, so a reducer never sees a
+half-written part, and a failed shard can be rerun alone. Any node that can
+read the JMdict/CEDICT inputs and write to the shared directory can run a
+map step.
+
+Usage:
+    python auto_detect_shards.py run --shards 8 --jobs 4 --jmdict ... --cedict ...
+    python auto_detect_shards.py map --shard 3 --shards 8 --jmdict ... --cedict ...
+    python auto_detect_shards.py reduce --shards 8
+    python expand_false_friends.py --auto-detect --shards 8 --jmdict ... --cedict ...
+
+Output:
+    build/auto_shards/part-*.jsonl
+"""
+
+import heapq
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import List, Optional
+
+from expand_false_friends import (FalseFriend, candidate_rank_key, load_cedict_meanings,
+                                  load_jmdict_meanings, rank_auto_candidates,
+                                  score_shared_words)
+
+
+SHARD_DIR = Path("build") / "auto_shards"
+DEFAULT_THRESHOLD = 0.3
+
+
+def shard_of(word: str, num_shards: int) -> int:
+    """Stable shard number for a headword."""
+    return zlib.crc32(word.encode("utf-8")) % num_shards
+
+
+def part_path(shard_dir: Path, shard: int, num_shards: int) -> Path:
+    return Path(shard_dir) / f"part-{shard:05d}-of-{num_shards:05d}.jsonl"
+
+
+# =============================================================================
+# Map
+# =============================================================================
+
+def map_shard(jp_meanings: dict, cn_meanings: dict, shard: int, num_shards: int,
+              shard_dir: Path = SHARD_DIR, threshold: float = DEFAULT_THRESHOLD) -> Path:
+    """Score one shard of the shared words and write its part file."""
+    if not 0 <= shard < num_shards:
+        raise ValueError(f"Shard {shard} out of range for {num_shards} shards")
+    words = sorted(w for w in jp_meanings.keys() & cn_meanings.keys()
+                   if shard_of(w, num_shards) == shard)
+    scored = sorted(score_shared_words(jp_meanings, cn_meanings, words, threshold),
+                    key=candidate_rank_key)
+
+    path = part_path(shard_dir, shard, num_shards)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    with open(tmp, "w", encoding="utf-8") as f:
+        header = {"shard": shard, "shards": num_shards, "threshold": threshold,
+                  "words": len(words), "candidates": len(scored)}
+        f.write(json.dumps(header) + "\n")
+        for candidate in scored:
+            f.write(json.dumps(candidate, ensure_ascii=False) + "\n")
+    os.replace(tmp, path)
+    return path
+
+
+def map_shard_from_paths(jmdict_path: str, cedict_path: str, shard: int, num_shards: int,
+                         shard_dir: Path = SHARD_DIR,
+                         threshold: float = DEFAULT_THRESHOLD) -> Path:
+    """map_shard() for a worker that loads its own inputs (other process or node)."""
+    return map_shard(load_jmdict_meanings(jmdict_path), load_cedict_meanings(cedict_path),
+                     shard, num_shards, shard_dir, threshold)
+
+
+# =============================================================================
+# Reduce
+# =============================================================================
+
+def _read_part(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+def reduce_shards(num_shards: int, shard_dir: Path = SHARD_DIR,
+                  threshold: Optional[float] = None) -> List[FalseFriend]:
+    """Merge all part files into the ranked auto-detected list."""
+    missing = [i for i in range(num_shards) if not part_path(shard_dir, i, num_shards).exists()]
+    if missing:
+        raise FileNotFoundError(f"Missing {len(missing)} of {num_shards} shard parts "
+                                f"in {shard_dir}: {missing[:10]}")
+
+    parts = []
+    thresholds = set()
+    for i in range(num_shards):
+        header, candidates = _read_part(part_path(shard_dir, i, num_shards))
+        if header["shard"] != i or header["shards"] != num_shards:
+            raise ValueError(f"Part {i} has header {header}")
+        thresholds.add(header["threshold"])
+        parts.append(candidates)
+    if len(thresholds) > 1 or (threshold is not None and thresholds != {threshold}):
+        raise ValueError(f"Shard parts were scored with different thresholds: {sorted(thresholds)}")
+
+    # Parts are already rank-sorted; merging keeps reduce linear
+    merged = heapq.merge(*parts, key=candidate_rank_key)
+    candidates = rank_auto_candidates(merged)
+    print(f"Auto-detected {len(candidates)} potential false friends ({num_shards} shards)")
+    return candidates
+
+
+# =============================================================================
+# Local driver
+# =============================================================================
+
+def auto_detect_sharded(jmdict_path: str, cedict_path: str, num_shards: int,
+                        jobs: Optional[int] = None, shard_dir: Path = SHARD_DIR,
+                        threshold: float = DEFAULT_THRESHOLD) -> List[FalseFriend]:
+    """Run every map step in a local process pool, then reduce."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Stale parts from a run with another shard count must not be mixed in
+    for stale in Path(shard_dir).glob("part-*.jsonl"):
+        stale.unlink()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(map_shard_from_paths, jmdict_path, cedict_path,
+                               i, num_shards, shard_dir, threshold)
+                   for i in range(num_shards)]
+        for future in futures:
+            future.result()
+    return reduce_shards(num_shards, shard_dir, threshold)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sharded false-friend auto-detection")
+    parser.add_argument("command", choices=["run", "map", "reduce"])
+    parser.add_argument("--shards", type=int, required=True, help="Number of shards")
+    parser.add_argument("--shard", type=int, help="Shard to score (map)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (run)")
+    parser.add_argument("--jmdict", type=str, help="Path to JMDict data")
+    parser.add_argument("--cedict", type=str, help="Path to CEDICT data")
+    parser.add_argument("--dir", type=str, default=str(SHARD_DIR), help="Shared part directory")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--output", type=str,
+                        help="Save the reduced list (reduce/run) with save_false_friends")
+    args = parser.parse_args()
+
+    shard_dir = Path(args.dir)
+    if args.command == "map":
+        if args.shard is None or not (args.jmdict and args.cedict):
+            parser.error("map needs --shard, --jmdict and --cedict")
+        path = map_shard_from_paths(args.jmdict, args.cedict, args.shard, args.shards,
+                                    shard_dir, args.threshold)
+        print(f"Wrote {path}")
+    else:
+        if args.command == "run":
+            if not (args.jmdict and args.cedict):
+                parser.error("run needs --jmdict and --cedict")
+            result = auto_detect_sharded(args.jmdict, args.cedict, args.shards, args.jobs,
+                                         shard_dir, args.threshold)
+        else:
+            result = reduce_shards(args.shards, shard_dir, args.threshold)
+        if args.output:
+            from expand_false_friends import save_false_friends
+            save_false_friends(result, args.output)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Autocomplete Index
+
+Search-as-you-type over the compiled characters without a LIKE scan. Four
+sorted key sets, one per way a learner types a query:
+    character  the headword itself (学, 学生, ...)
+    kana       on'yomi / kun'yomi / JMdict readings folded to hiragana
+    romaji     the same readings in Hepburn romaji
+    pinyin     toneless pinyin, spaces removed (xuesheng)
+
+Entries are numbered in commonness order (frequency_rank, then stroke
+count, as for the shards), so every posting list is already ranked and the
+top-N completions of a prefix are the N smallest IDs over the keys in its
+range. Prefixes whose range spans more than HOT_PREFIX_KEYS keys ("s",
+"し", "学") get that answer precomputed in a "<field>_top" index; every
+other prefix merges at most HOT_PREFIX_KEYS sorted lists, so a completion
+never touches more than a bounded number of keys.
+
+The file is an indexes.py posting-list file (sorted keys, u32 posting
+offsets, u32 IDs); the entry strings are in its metadata.
+
+Usage:
+    python autocomplete.py がく xue 学            # top completions
+    python autocomplete.py --benchmark             # latency over many prefixes
+
+Output:
+    output/autocomplete.idx
+"""
+
+import heapq
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from indexes import IndexFile, write_indexes
+from kana import normalize_readings, to_hiragana
+from pinyin import to_toneless
+from ranking import commonness_key
+
+
+OUTPUT_DIR = Path("output")
+AUTOCOMPLETE_PATH = OUTPUT_DIR / "autocomplete.idx"
+
+FIELDS = ["character", "kana", "romaji", "pinyin"]
+
+# Prefixes covering more keys than this get a precomputed top list
+HOT_PREFIX_KEYS = 64
+# Length of the precomputed lists (and the largest n they can answer)
+MAX_COMPLETIONS = 50
+DEFAULT_COMPLETIONS = 10
+
+
+def _pinyin_key(text: str) -> str:
+    return "".join(to_toneless(text).lower().split())
+
+
+# =============================================================================
+# Builder
+# =============================================================================
+
+def _top_ids(mapping: dict, keys: List[str], limit: int) -> List[int]:
+    """The `limit` smallest distinct IDs over the posting lists of `keys`."""
+    result = []
+    last = None
+    for entry_id in heapq.merge(*(mapping[k] for k in keys)):
+        if entry_id != last:
+            result.append(entry_id)
+            last = entry_id
+            if len(result) >= limit:
+                break
+    return result
+
+
+def _hot_prefixes(mapping: dict, hot_keys: int, limit: int) -> dict:
+    """Precomputed top lists for every prefix whose key range is large."""
+    keys = sorted(mapping)
+    counts = {}
+    for key in keys:
+        for n in range(1, len(key) + 1):
+            counts[key[:n]] = counts.get(key[:n], 0) + 1
+
+    import bisect
+    top = {}
+    for prefix, count in counts.items():
+        if count > hot_keys:
+            start = bisect.bisect_left(keys, prefix)
+            top[prefix] = _top_ids(mapping, keys[start:start + count], limit)
+    return top
+
+
+def build_autocomplete(characters: list,
+                       reading_entries: Optional[Iterable[Tuple[str, List[str]]]] = None):
+    """
+    Build (indexes, metadata) for write_indexes().
+
+    reading_entries are (character, raw readings) pairs as produced by
+    data_pipeline.character_reading_entries(); without them the readings
+    come from each entry's on'yomi / kun'yomi.
+    """
+    ordered = sorted(characters, key=commonness_key)
+    entry_ids = {entry["character"]: i for i, entry in enumerate(ordered)}
+
+    if reading_entries is None:
+        reading_entries = [
+            (e["character"], (e.get("japanese") or {}).get("onyomi", [])
+             + (e.get("japanese") or {}).get("kunyomi", []))
+            for e in ordered]
+    flat_ids, flat_values = [], []
+    for char, readings in reading_entries:
+        if char in entry_ids:
+            for value in readings:
+                flat_ids.append(entry_ids[char])
+                flat_values.append(value)
+    hiragana, romaji = normalize_readings(flat_values)
+
+    tables = {field: {} for field in FIELDS}
+    for entry_id, entry in enumerate(ordered):
+        tables["character"].setdefault(entry["character"], set()).add(entry_id)
+        for reading in (entry.get("chinese") or {}).get("pinyin_toneless") or []:
+            key = _pinyin_key(reading)
+            if key:
+                tables["pinyin"].setdefault(key, set()).add(entry_id)
+    for entry_id, kana_keys, roma_keys in zip(flat_ids, hiragana, romaji):
+        for key in kana_keys:
+            tables["kana"].setdefault(key, set()).add(entry_id)
+        for key in roma_keys:
+            tables["romaji"].setdefault(key, set()).add(entry_id)
+
+    indexes = {}
+    for field in FIELDS:
+        mapping = {key: sorted(ids) for key, ids in tables[field].items()}
+        indexes[field] = mapping
+        indexes[f"{field}_top"] = _hot_prefixes(mapping, HOT_PREFIX_KEYS, MAX_COMPLETIONS)
+
+    metadata = {
+        "fields": FIELDS,
+        "hot_prefix_keys": HOT_PREFIX_KEYS,
+        "max_completions": MAX_COMPLETIONS,
+        "entries": [entry["character"] for entry in ordered],
+        "frequency_ranks": [entry.get("frequency_rank") for entry in ordered],
+    }
+    return indexes, metadata
+
+
+def write_autocomplete(characters: list, reading_entries=None,
+                       output_path: Path = AUTOCOMPLETE_PATH):
+    indexes, metadata = build_autocomplete(characters, reading_entries)
+    write_indexes(output_path, indexes, metadata)
+    sizes = ", ".join(f"{field} {len(indexes[field])}/{len(indexes[field + '_top'])}"
+                      for field in FIELDS)
+    print(f"  Wrote {Path(output_path).name} (keys/hot prefixes: {sizes})")
+
+
+# =============================================================================
+# Reader
+# =============================================================================
+
+class Autocomplete:
+    """Top-N completions from autocomplete.idx."""
+
+    def __init__(self, path: Path = AUTOCOMPLETE_PATH):
+        self.file = IndexFile(Path(path))
+        meta = self.file.metadata
+        self.entries = meta["entries"]
+        self.frequency_ranks = meta["frequency_ranks"]
+        self.hot_prefix_keys = meta["hot_prefix_keys"]
+        self.max_completions = meta["max_completions"]
+
+    @staticmethod
+    def fields_for(query: str) -> List[Tuple[str, str]]:
+        """(field, normalized prefix) pairs a raw query should be matched against."""
+        query = unicodedata.normalize("NFKC", query).strip()
+        if not query:
+            return []
+        if query.isascii():
+            plain = "".join(ch for ch in query.lower() if ch.isalpha())
+            return [("romaji", plain), ("pinyin", plain)] if plain else []
+        hiragana = to_hiragana(query)
+        if all("ぁ" <= ch <= "ゟ" for ch in hiragana):
+            return [("kana", hiragana)]
+        if all(ch.isalpha() and ord(ch) < 0x2E80 for ch in query):
+            # Latin with tone marks: pinyin typed with an IME
+            return [("pinyin", _pinyin_key(query))]
+        return [("character", query)]
+
+    def _field_ids(self, field: str, prefix: str, n: int) -> List[int]:
+        if n <= self.max_completions:
+            top = self.file[f"{field}_top"].get(prefix)
+            if len(top):
+                return list(top[:n])
+        index = self.file[field]
+        positions = index.key_prefix(prefix)
+        lists = [index.postings_at(i) for i in positions]
+        result = []
+        last = None
+        for entry_id in heapq.merge(*lists):
+            if entry_id != last:
+                result.append(entry_id)
+                last = entry_id
+                if len(result) >= n:
+                    break
+        return result
+
+    def complete_ids(self, query: str, n: int = DEFAULT_COMPLETIONS) -> List[int]:
+        """Entry IDs (commonness order) of the top n completions."""
+        per_field = [self._field_ids(field, prefix, n) for field, prefix in self.fields_for(query)]
+        if len(per_field) == 1:
+            return per_field[0]
+        result = []
+        last = None
+        for entry_id in heapq.merge(*per_field):
+            if entry_id != last:
+                result.append(entry_id)
+                last = entry_id
+                if len(result) >= n:
+                    break
+        return result
+
+    def complete(self, query: str, n: int = DEFAULT_COMPLETIONS) -> List[Tuple[str, Optional[int]]]:
+        """Top n (character, frequency_rank) completions for a partial query."""
+        return [(self.entries[i], self.frequency_ranks[i]) for i in self.complete_ids(query, n)]
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _benchmark_queries(reader: Autocomplete, per_field: int = 2000) -> List[str]:
+    """1-4 character prefixes of real keys from every field."""
+    import random
+
+    rng = random.Random(0)
+    queries = []
+    for field in FIELDS:
+        keys = reader.file[field].keys()
+        if not len(keys):
+            continue
+        for _ in range(per_field):
+            key = keys[rng.randrange(len(keys))]
+            queries.append(key[:rng.randint(1, min(4, len(key)))])
+    return queries
+
+
+def run_benchmark(path: Path, n: int = DEFAULT_COMPLETIONS):
+    import time
+
+    start = time.perf_counter()
+    reader = Autocomplete(path)
+    load_ms = (time.perf_counter() - start) * 1000
+    queries = _benchmark_queries(reader)
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        reader.complete(query, n)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+
+    def pct(p):
+        return timings[min(len(timings) - 1, int(len(timings) * p))]
+
+    print(f"\n=== Autocomplete benchmark: {len(reader.entries)} entries, "
+          f"{len(queries)} prefixes, top {n} ===")
+    print(f"  load:  {load_ms:.1f} ms ({Path(path).stat().st_size / 1024:.0f} KB)")
+    print(f"  mean {sum(timings) / len(timings):.1f} us, p50 {pct(0.5):.1f} us, "
+          f"p99 {pct(0.99):.1f} us, max {timings[-1]:.1f} us")
+    print(f"  sub-millisecond: {sum(1 for t in timings if t < 1000) / len(timings):.2%}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Prefix completions over characters")
+    parser.add_argument("queries", nargs="*")
+    parser.add_argument("--path", type=str, default=str(AUTOCOMPLETE_PATH))
+    parser.add_argument("-n", type=int, default=DEFAULT_COMPLETIONS)
+    parser.add_argument("--build", action="store_true",
+                        help="Rebuild from output/characters.json first")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Measure completion latency")
+    parser.add_argument("--synthetic", type=float,
+                        help="Benchmark on scale_test.py data at this scale instead")
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    if args.synthetic:
+        import contextlib
+        import io
+        import tempfile
+
+        import data_pipeline
+        from scale_test import synthetic_sources
+
+        unihan, jmdict, cedict = synthetic_sources(args.synthetic)
+        with contextlib.redirect_stdout(io.StringIO()):
+            characters = data_pipeline.compile_characters(unihan, jmdict, cedict)
+        path = Path(tempfile.mkdtemp()) / AUTOCOMPLETE_PATH.name
+        write_autocomplete(characters,
+                           data_pipeline.character_reading_entries(characters, jmdict), path)
+    elif args.build:
+        with open(OUTPUT_DIR / "characters.json", "r", encoding="utf-8") as f:
+            write_autocomplete(json.load(f), output_path=path)
+
+    if args.benchmark:
+        run_benchmark(path, args.n)
+    if args.queries:
+        reader = Autocomplete(path)
+        for query in args.queries:
+            completions = reader.complete(query, args.n)
+            print(f"{query}: " + ", ".join(f"{c} ({r})" for c, r in completions))
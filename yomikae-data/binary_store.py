@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Compact Binary Store
+
+Packs the pipeline's JSON outputs (characters, false friends) into a single
+binary file that can be memory-mapped and decoded lazily, record by record.
+
+Layout (all integers little-endian):
+    magic "YMKB" | u32 format version | u32 header length | header JSON
+    string table: u32 offsets[count + 1] | UTF-8 blob (deduplicated strings)
+    list table:   u32 offsets[count + 1] | u32 string indices
+    one fixed-width record array per table
+
+The header JSON carries each table's field schema, so new fields can be
+added to the pipeline output without changing the reader.
+
+Usage:
+    python binary_store.py --build        # output/*.json -> output/yomikae.bin
+    python binary_store.py --benchmark    # load time / RSS vs json.load
+
+Output:
+    output/yomikae.bin
+"""
+
+import json
+import mmap
+import struct
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+OUTPUT_DIR = Path("output")
+
+MAGIC = b"YMKB"
+FORMAT_VERSION = 1
+
+NONE_INDEX = 0xFFFFFFFF      # None for str/list fields
+NONE_INT = -0x80000000       # None for int fields
+
+# Field kind -> struct code
+KIND_CODES = {
+    "str": "I",
+    "list": "I",
+    "int": "i",
+    "bool": "B",
+    "obj": "B",   # presence flag for a nested object
+}
+
+# Default inputs for --build, in table order
+BUILD_SOURCES = {
+    "characters": OUTPUT_DIR / "characters.json",
+    "false_friends": OUTPUT_DIR / "false_friends_expanded.json",
+}
+
+
+# =============================================================================
+# Writer
+# =============================================================================
+
+def _infer_kind(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, list):
+        if not all(isinstance(v, str) for v in value):
+            raise ValueError(f"Only lists of strings are supported, got {value!r}")
+        return "list"
+    if isinstance(value, dict):
+        return "obj"
+    raise ValueError(f"Unsupported value type: {type(value).__name__}")
+
+
+def infer_schema(records: list) -> list:
+    """
+    Infer a flat field schema from a list of (possibly nested) dicts.
+
+    Nested dicts become an "obj" presence flag plus dotted child fields,
+    e.g. "japanese", "japanese.onyomi". Fields that are None everywhere
+    default to "str". Returns a list of [name, kind] pairs in first-seen order.
+    """
+    kinds = {}
+
+    def visit(prefix: str, d: dict):
+        for key, value in d.items():
+            name = f"{prefix}{key}"
+            kind = _infer_kind(value)
+            if name not in kinds or kinds[name] is None:
+                kinds[name] = kind
+            elif kind is not None and kinds[name] != kind:
+                raise ValueError(f"Field {name} has mixed types: {kinds[name]} / {kind}")
+            if kind == "obj":
+                visit(f"{name}.", value)
+
+    for record in records:
+        visit("", record)
+
+    return [[name, kind or "str"] for name, kind in kinds.items()]
+
+
+class _StoreBuilder:
+    """Accumulates deduplicated strings and string lists while packing records."""
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.lists = [()]       # list 0 is the shared empty list
+        self.list_ids = {(): 0}
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return NONE_INDEX
+        idx = self.string_ids.get(value)
+        if idx is None:
+            idx = self.string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+    def list(self, values: Optional[list]) -> int:
+        if values is None:
+            return NONE_INDEX
+        key = tuple(self.string(v) for v in values)
+        idx = self.list_ids.get(key)
+        if idx is None:
+            idx = self.list_ids[key] = len(self.lists)
+            self.lists.append(key)
+        return idx
+
+    def pack_table(self, records: list, schema: list) -> bytes:
+        packer = struct.Struct("<" + "".join(KIND_CODES[kind] for _, kind in schema))
+        paths = [name.split(".") for name, _ in schema]
+        out = bytearray()
+        for record in records:
+            row = []
+            for path, (_, kind) in zip(paths, schema):
+                value = record
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if kind == "str":
+                    row.append(self.string(value))
+                elif kind == "list":
+                    row.append(self.list(value))
+                elif kind == "int":
+                    row.append(NONE_INT if value is None else value)
+                else:  # bool / obj presence
+                    row.append(1 if value else 0)
+            out += packer.pack(*row)
+        return bytes(out)
+
+    def pack_strings(self) -> bytes:
+        blob = bytearray()
+        offsets = [0]
+        for s in self.strings:
+            blob += s.encode("utf-8")
+            offsets.append(len(blob))
+        return struct.pack(f"<{len(offsets)}I", *offsets) + bytes(blob)
+
+    def pack_lists(self) -> bytes:
+        items = []
+        offsets = [0]
+        for lst in self.lists:
+            items.extend(lst)
+            offsets.append(len(items))
+        return (struct.pack(f"<{len(offsets)}I", *offsets)
+                + struct.pack(f"<{len(items)}I", *items))
+
+
+def write_store(output_path: Path, tables: dict, metadata: Optional[dict] = None) -> dict:
+    """
+    Write `tables` ({name: list of record dicts}) to a binary store.
+
+    Returns the header dict that was written.
+    """
+    builder = _StoreBuilder()
+    packed = {}
+    for name, records in tables.items():
+        schema = infer_schema(records)
+        packed[name] = (schema, builder.pack_table(records, schema), len(records))
+
+    sections = [builder.pack_strings(), builder.pack_lists()] + [p[1] for p in packed.values()]
+
+    # Offsets in the header are relative to the start of the data area,
+    # so the header can be sized before the offsets are known.
+    header = {
+        "metadata": metadata or {},
+        "strings": {"offset": 0, "count": len(builder.strings)},
+        "lists": {"offset": len(sections[0]), "count": len(builder.lists)},
+        "tables": {},
+    }
+    offset = len(sections[0]) + len(sections[1])
+    for name, (schema, data, count) in packed.items():
+        header["tables"][name] = {
+            "offset": offset,
+            "count": count,
+            "record_size": struct.calcsize("<" + "".join(KIND_CODES[k] for _, k in schema)),
+            "fields": schema,
+        }
+        offset += len(data)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    # Align the data area to 8 bytes
+    header_bytes += b" " * (-(12 + len(header_bytes)) % 8)
+
+    with open(output_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for section in sections:
+            f.write(section)
+
+    return header
+
+
+# =============================================================================
+# Reader
+# =============================================================================
+
+class RecordTable:
+    """Lazily decoded view of one record array in a BinaryStore."""
+
+    def __init__(self, store: "BinaryStore", name: str, info: dict):
+        self.name = name
+        self._store = store
+        self._offset = store._data_offset + info["offset"]
+        self._count = info["count"]
+        self._size = info["record_size"]
+        self.fields = [tuple(f) for f in info["fields"]]
+        self._struct = struct.Struct("<" + "".join(KIND_CODES[k] for _, k in self.fields))
+        self._field_index = {name: i for i, (name, _) in enumerate(self.fields)}
+        self._paths = [name.split(".") for name, _ in self.fields]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self[i]
+
+    def _row(self, i: int) -> tuple:
+        if not 0 <= i < self._count:
+            raise IndexError(f"{self.name} index out of range: {i}")
+        return self._struct.unpack_from(self._store._buf, self._offset + i * self._size)
+
+    def _decode(self, kind: str, raw):
+        if kind == "str":
+            return None if raw == NONE_INDEX else self._store.string(raw)
+        if kind == "list":
+            return None if raw == NONE_INDEX else self._store.string_list(raw)
+        if kind == "int":
+            return None if raw == NONE_INT else raw
+        return bool(raw)
+
+    def get_field(self, i: int, field_name: str):
+        """Decode a single field of record i without touching the others."""
+        j = self._field_index[field_name]
+        return self._decode(self.fields[j][1], self._row(i)[j])
+
+    def __getitem__(self, i: int) -> dict:
+        if i < 0:
+            i += self._count
+        row = self._row(i)
+        record = {}
+        absent = set()
+        for path, (name, kind), raw in zip(self._paths, self.fields, row):
+            if len(path) > 1 and ".".join(path[:-1]) in absent:
+                absent.add(name)
+                continue
+            if kind == "obj":
+                if not raw:
+                    absent.add(name)
+                _set_path(record, path, {} if raw else None)
+                continue
+            _set_path(record, path, self._decode(kind, raw))
+        return record
+
+
+def _set_path(record: dict, path: list, value):
+    parent = record
+    for key in path[:-1]:
+        parent = parent[key]
+    parent[path[-1]] = value
+
+
+class BinaryStore:
+    """
+    Memory-mapped reader for files written by write_store().
+
+    Opening only parses the header; strings and records are decoded on access.
+    """
+
+    def __init__(self, path: Path):
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if self._buf[:4] != MAGIC:
+                raise ValueError(f"{path} is not a Yomikae binary store")
+            version, header_len = struct.unpack_from("<II", self._buf, 4)
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported store version {version} "
+                                 f"(expected {FORMAT_VERSION})")
+        except ValueError:
+            self.close()
+            raise
+
+        self.header = json.loads(bytes(self._buf[12:12 + header_len]).decode("utf-8"))
+        self.metadata = self.header["metadata"]
+        self._data_offset = 12 + header_len
+
+        strings = self.header["strings"]
+        self._str_offsets = self._data_offset + strings["offset"]
+        self._str_blob = self._str_offsets + 4 * (strings["count"] + 1)
+
+        lists = self.header["lists"]
+        self._list_offsets = self._data_offset + lists["offset"]
+        self._list_items = self._list_offsets + 4 * (lists["count"] + 1)
+
+        self.tables = {name: RecordTable(self, name, info)
+                       for name, info in self.header["tables"].items()}
+
+    def __getitem__(self, name: str) -> RecordTable:
+        return self.tables[name]
+
+    def string(self, idx: int) -> str:
+        start, end = struct.unpack_from("<II", self._buf, self._str_offsets + 4 * idx)
+        return self._buf[self._str_blob + start:self._str_blob + end].decode("utf-8")
+
+    def string_list(self, idx: int) -> list:
+        start, end = struct.unpack_from("<II", self._buf, self._list_offsets + 4 * idx)
+        if start == end:
+            return []
+        ids = struct.unpack_from(f"<{end - start}I", self._buf, self._list_items + 4 * start)
+        return [self.string(i) for i in ids]
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_store(path: Path) -> BinaryStore:
+    return BinaryStore(path)
+
+
+# =============================================================================
+# Build from JSON outputs
+# =============================================================================
+
+def load_json_records(path: Path) -> tuple:
+    """Load a pipeline JSON output as (records, metadata)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return data.get("false_friends", []), data.get("metadata", {})
+    return data, {}
+
+
+def build_store(sources: dict, output_path: Path) -> dict:
+    """Pack every existing JSON source into one binary store."""
+    tables = {}
+    metadata = {}
+    for name, path in sources.items():
+        if not path.exists():
+            print(f"  {name}: {path} not found, skipping")
+            continue
+        records, meta = load_json_records(path)
+        tables[name] = records
+        if meta:
+            metadata[name] = meta
+
+    header = write_store(output_path, tables, metadata)
+    size = output_path.stat().st_size
+    print(f"Wrote {output_path} ({size / 1024:.0f} KB, {header['strings']['count']} unique strings)")
+    for name, info in header["tables"].items():
+        print(f"  {name}: {info['count']} records x {info['record_size']} bytes")
+    return header
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+# Each snippet runs in a fresh interpreter so RSS numbers are not shared.
+# Module imports happen before the timer starts in both variants.
+_BENCH_PRELUDE = """
+import json, sys, time
+from binary_store import open_store
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+base = rss_kb()
+t0 = time.perf_counter()
+"""
+
+_BENCH_JSON = _BENCH_PRELUDE + """
+for path in sys.argv[1:]:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+t1 = time.perf_counter()
+print(json.dumps({'load_ms': (t1 - t0) * 1000, 'rss_kb': rss_kb() - base}))
+"""
+
+_BENCH_BINARY = _BENCH_PRELUDE + """
+store = open_store(sys.argv[1])
+t1 = time.perf_counter()
+for table in store.tables.values():
+    table[len(table) // 2]
+t2 = time.perf_counter()
+print(json.dumps({'load_ms': (t1 - t0) * 1000, 'first_record_ms': (t2 - t1) * 1000,
+                  'rss_kb': rss_kb() - base}))
+"""
+
+
+def _run_bench(code: str, args: list, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code, *map(str, args)],
+                             capture_output=True, text=True, check=True,
+                             cwd=Path(__file__).resolve().parent)
+        runs.append(json.loads(out.stdout))
+    # Report the best run to filter out scheduler noise
+    return min(runs, key=lambda r: r["load_ms"])
+
+
+def run_benchmark(sources: dict, store_path: Path, repeat: int = 5):
+    json_paths = [p.resolve() for p in sources.values() if p.exists()]
+    if not json_paths:
+        print("No JSON outputs found to benchmark")
+        return
+    if not store_path.exists():
+        build_store(sources, store_path)
+
+    json_result = _run_bench(_BENCH_JSON, json_paths, repeat)
+    bin_result = _run_bench(_BENCH_BINARY, [store_path.resolve()], repeat)
+
+    json_size = sum(p.stat().st_size for p in json_paths)
+    print(f"\n=== Binary store benchmark (best of {repeat}) ===")
+    print(f"{'':24}{'size KB':>10}{'load ms':>10}{'RSS KB':>10}")
+    print(f"{'json.load':24}{json_size / 1024:>10.0f}{json_result['load_ms']:>10.2f}"
+          f"{json_result['rss_kb']:>10}")
+    print(f"{'binary_store (mmap)':24}{store_path.stat().st_size / 1024:>10.0f}"
+          f"{bin_result['load_ms']:>10.2f}{bin_result['rss_kb']:>10}")
+    print(f"  first record decode: {bin_result['first_record_ms']:.3f} ms")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or benchmark the binary data store")
+    parser.add_argument("--build", action="store_true", help="Pack JSON outputs into a binary store")
+    parser.add_argument("--benchmark", action="store_true", help="Compare against json.load")
+    parser.add_argument("--output", type=str, default=str(OUTPUT_DIR / "yomikae.bin"),
+                        help="Binary store path")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark repetitions")
+
+    args = parser.parse_args()
+    output_path = Path(args.output)
+
+    if args.build:
+        build_store(BUILD_SOURCES, output_path)
+    if args.benchmark:
+        run_benchmark(BUILD_SOURCES, output_path, args.repeat)
+    if not (args.build or args.benchmark):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
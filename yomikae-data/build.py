@@ -0,0 +1,891 @@
+#!/usr/bin/env python3
+"""
+Incremental Build Runner
+
+Runs data_pipeline.py and expand_false_friends.py as one make-like stage
+graph instead of separate scripts with hand-wired outputs:
+
+    parse_unihan ─┐
+    parse_jmdict ─┼─ compile_characters ─┬─ link_characters ─┬─ emit_characters
+    parse_cedict ─┤                      │                   ├─ emit_shards (--shards)
+                  │                      │                   └─ emit_binary (--binary)
+                  │                      ├─ character_readings ─┬─ emit_indexes
+                  │                      │                      └─ emit_autocomplete
+                  │                      ├─ emit_homophones
+                  │                      └─ emit_correspondences
+                  ├─ variant_tables ─┬─ emit_variants
+                  │                  └─ convert_jckv
+                  └─ variant_clusters ─┬─ emit_variant_clusters
+                                       └─ compile_characters, link_characters,
+                                          merge_false_friends
+    compile_false_friends ─ emit_false_friends (+ emit_binary)
+    load_curated ─┐
+    convert_jckv ─┼─ merge_false_friends ─┬─ mine_examples ─┬─ emit_expanded
+    auto_detect  ─┘                       │                 └─ emit_examples
+                                          │  (+ variant_tables, parse_cedict)
+                                          └─ emit_membership (+ variant_tables)
+
+Each stage is fingerprinted from its input files, the source of the code it
+runs (every pipeline function, class and constant reachable from the stage
+function, followed automatically), and its upstream fingerprints. Stages
+whose fingerprint matches the last build (and whose outputs still exist) are
+skipped. Their results are reloaded from build/cache/ only if a downstream
+stage needs them. Independent stale stages run in parallel worker processes,
+each output line tagged with its stage name.
+
+Watch mode runs stages in-process instead, keeping every stage result in
+memory (parsed sources, the JCKV conversion), and polls the curated
+sources, pipeline inputs and pipeline modules so a save re-emits only the
+outputs downstream of what changed.
+
+Usage:
+    python build.py                 # build everything that is stale
+    python build.py emit_expanded   # build one target and its dependencies
+    python build.py --force         # ignore fingerprints
+    python build.py --list          # show the graph and what is stale
+    python build.py --watch         # rebuild affected outputs on every save
+    python build.py --shards --binary   # also build the optional shard and binary outputs
+
+Output:
+    same files as data_pipeline.py / expand_false_friends.py, plus
+    build/state.json and build/cache/*.pkl
+    (characters shards and yomikae.bin only with --shards / --binary)
+"""
+
+import contextlib
+import hashlib
+import importlib
+import inspect
+import itertools
+import json
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import autocomplete
+import binary_store
+import correspondences
+import data_pipeline as dp
+import examples
+import expand_false_friends as eff
+import false_friend_loader
+import headword_store
+import homophones
+import indexes
+import kana
+import membership
+import pinyin
+import progress
+import ranking
+import stats
+import variants
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+BUILD_DIR = Path("build")
+CACHE_DIR = BUILD_DIR / "cache"
+STATE_PATH = BUILD_DIR / "state.json"
+
+# Bump to invalidate every cached stage (e.g. after a pickle format change)
+RUNNER_VERSION = "1"
+# Container items inspected per level when checking a result's classes
+RESULT_SAMPLE = 8
+
+UNIHAN_PATH = dp.SOURCES_DIR / "Unihan.zip"
+JMDICT_PATH = dp.SOURCES_DIR / "JMdict_e.gz"
+CEDICT_PATH = dp.SOURCES_DIR / "cedict_1_0_ts_utf-8_mdbg.zip"
+JCKV_PATH = Path("JKVC_ver3_0.xlsx")
+CURATED_PATH = Path("../Yomikae/Resources/false_friends_v2.json")
+
+EXPANDED_PATH = dp.OUTPUT_DIR / "false_friends_expanded.json"
+JCKV_OUTPUT_PATH = dp.OUTPUT_DIR / "false_friends_jckv.json"
+BINARY_PATH = dp.OUTPUT_DIR / "yomikae.bin"
+
+# Built only when named as targets or asked for (data_pipeline.py --shards / --binary)
+OPTIONAL_STAGES = {"shards": "emit_shards", "binary": "emit_binary"}
+
+
+# =============================================================================
+# Stage Model
+# =============================================================================
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable                              # called with dep results, in order
+    deps: List[str] = field(default_factory=list)
+    inputs: List[Path] = field(default_factory=list)    # fingerprinted by content
+    outputs: List[Path] = field(default_factory=list)   # must exist to be fresh
+    code: list = field(default_factory=list)    # extra modules/data whose source counts
+
+
+# Functions, classes and constants defined in these files are followed
+PIPELINE_DIR = Path(__file__).resolve().parent
+_PLAIN_TYPES = (type(None), bool, int, float, complex, str, bytes, tuple, list, dict, Path)
+
+
+def _is_pipeline(obj) -> bool:
+    module = obj if inspect.ismodule(obj) else inspect.getmodule(obj)
+    path = getattr(module, "__file__", None)
+    return path is not None and Path(path).resolve().parent == PIPELINE_DIR
+
+
+def _label(obj) -> str:
+    # Keyed by file, so running build.py as __main__ gives the same labels
+    module = obj if inspect.ismodule(obj) else inspect.getmodule(obj)
+    name = "" if inspect.ismodule(obj) else f".{obj.__qualname__}"
+    return f"{Path(module.__file__).stem}{name}"
+
+
+def _code_names(code) -> set:
+    """Global and attribute names used by a code object and the ones nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _code_names(const)
+    return names
+
+
+def _functions_of(obj) -> list:
+    """The plain functions behind a function or a class's methods."""
+    if inspect.isfunction(obj):
+        return [obj]
+    functions = []
+    for value in vars(obj).values():
+        value = getattr(value, "__func__", value)
+        if isinstance(value, property):
+            functions.extend(f for f in (value.fget, value.fset, value.fdel) if f)
+        elif inspect.isfunction(value):
+            functions.append(value)
+    return functions
+
+
+def _stable(value):
+    """Containers in a canonical order (tables built from sets differ between runs)."""
+    if isinstance(value, dict):
+        return sorted(((repr(_stable(k)), _stable(v)) for k, v in value.items()), key=repr)
+    if isinstance(value, (set, frozenset)):
+        return sorted((_stable(v) for v in value), key=repr)
+    if isinstance(value, (list, tuple)):
+        return [_stable(v) for v in value]
+    return value
+
+
+def _constant_token(value):
+    if isinstance(value, _PLAIN_TYPES + (set, frozenset)):
+        return repr(_stable(value))
+    token = repr(value)
+    return None if " at 0x" in token else token
+
+
+def code_tokens(objs: list) -> Dict[str, str]:
+    """
+    Source of every pipeline function, class and module-level constant that
+    `objs` reach, keyed by a stable label.
+
+    Names a function uses are resolved in its globals (lazy imports via
+    sys.modules); for pipeline modules it refers to (dp.x, variants.y),
+    the used names are looked up as module attributes, so dp's helpers
+    count but the rest of data_pipeline.py does not. Modules listed
+    explicitly count with their whole source.
+    """
+    tokens = {}
+    stack = []
+
+    def visit(value, label: str):
+        if inspect.isfunction(value) or inspect.isclass(value):
+            if _is_pipeline(value) and _label(value) not in tokens:
+                stack.append(value)
+        elif not inspect.ismodule(value):
+            token = _constant_token(value)
+            if token is not None:
+                tokens[label] = token
+
+    for obj in objs:
+        if inspect.ismodule(obj):
+            tokens[_label(obj)] = inspect.getsource(obj)
+        else:
+            visit(obj, repr(obj))
+
+    while stack:
+        obj = stack.pop()
+        label = _label(obj)
+        if label in tokens:
+            continue
+        tokens[label] = inspect.getsource(obj)
+        for function in _functions_of(obj):
+            namespace = getattr(function, "__globals__", {})
+            names = _code_names(function.__code__)
+            module_label = Path(namespace.get("__file__", "")).stem
+            modules = []
+            for name in names:
+                if name in namespace:
+                    value = namespace[name]
+                    visit(value, f"{module_label}.{name}")
+                else:
+                    value = sys.modules.get(name)
+                if inspect.ismodule(value) and _is_pipeline(value):
+                    modules.append(value)
+            for module in modules:
+                for name in names:
+                    if hasattr(module, name):
+                        visit(getattr(module, name), f"{_label(module)}.{name}")
+    return tokens
+
+
+class FileHasher:
+    """Content hashes, reused while (mtime, size) is unchanged."""
+
+    def __init__(self, known: Optional[dict] = None):
+        self.known = known or {}
+
+    def digest(self, path: Path) -> str:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return "missing"
+        key = str(path)
+        stamp = [st.st_mtime_ns, st.st_size]
+        cached = self.known.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        self.known[key] = [stamp, h.hexdigest()]
+        return h.hexdigest()
+
+
+def _cache_path(name: str) -> Path:
+    return CACHE_DIR / f"{name}.pkl"
+
+
+class _StageOutput:
+    """Line-buffered stream that tags every line with its stage name."""
+
+    def __init__(self, stream, name: str):
+        self.stream = stream
+        self.prefix = f"[{name}] "
+        self.pending = ""
+
+    def write(self, text: str) -> int:
+        lines = (self.pending + text).split("\n")
+        self.pending = lines.pop()
+        if lines:
+            # One write per batch of whole lines, so workers never split a line
+            self.stream.write("".join(f"{self.prefix}{line}\n" for line in lines))
+            self.stream.flush()
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    def close(self):
+        if self.pending:
+            self.write("\n")
+
+
+def _run_stage_in_worker(name: str) -> float:
+    """
+    Worker-process entry point: load dep results from the cache, run the
+    stage, and store its result. Returns elapsed seconds. Output is tagged
+    with the stage name since stages run side by side.
+    """
+    stage = STAGES_BY_NAME[name]
+    args = []
+    for dep in stage.deps:
+        with open(_cache_path(dep), "rb") as f:
+            args.append(pickle.load(f))
+    out, err = _StageOutput(sys.stdout, name), _StageOutput(sys.stderr, name)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            result = stage.func(*args)
+    finally:
+        out.close()
+        err.close()
+    with open(_cache_path(name), "wb") as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return time.perf_counter() - start
+
+
+def _result_modules(value, depth: int = 3) -> set:
+    """Modules of the classes in a stage result, sampling the first items of containers."""
+    modules = {type(value).__module__}
+    if depth == 0:
+        return modules
+    if isinstance(value, dict):
+        items = [v for kv in itertools.islice(value.items(), RESULT_SAMPLE) for v in kv]
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = list(itertools.islice(value, RESULT_SAMPLE))
+    else:
+        items = list(getattr(value, "__dict__", {}).values())
+    for item in items:
+        modules |= _result_modules(item, depth - 1)
+    return modules
+
+
+class BuildRunner:
+    """Fingerprints the stage graph and runs only what is stale."""
+
+    def __init__(self, stages: List[Stage], jobs: Optional[int] = None, in_process=False):
+        self.set_stages(stages)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.in_process = in_process
+        self.results = {}   # in-process mode: stage name -> result kept hot
+        self.state = self._load_state()
+        self.hasher = FileHasher(self.state.get("files"))
+
+    def set_stages(self, stages: List[Stage]):
+        self.stages = {s.name: s for s in stages}
+        self.order = self._toposort(stages)
+
+    @staticmethod
+    def _toposort(stages: List[Stage]) -> List[str]:
+        by_name = {s.name: s for s in stages}
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in stage graph at {name}")
+            visiting.add(name)
+            for dep in by_name[name].deps:
+                if dep not in by_name:
+                    raise ValueError(f"Stage {name} depends on unknown stage {dep}")
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for s in stages:
+            visit(s.name)
+        return order
+
+    def _load_state(self) -> dict:
+        if STATE_PATH.exists():
+            with open(STATE_PATH, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {"fingerprints": {}, "files": {}}
+
+    def _save_state(self):
+        BUILD_DIR.mkdir(exist_ok=True)
+        self.state["files"] = self.hasher.known
+        with open(STATE_PATH, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+
+    def fingerprints(self) -> Dict[str, str]:
+        fps = {}
+        for name in self.order:
+            stage = self.stages[name]
+            h = hashlib.sha256()
+            h.update(f"{RUNNER_VERSION}\0{name}\0".encode())
+            for label, token in sorted(code_tokens([stage.func] + stage.code).items()):
+                h.update(f"{label}\0{token}\0".encode("utf-8"))
+            for path in stage.inputs:
+                h.update(f"{path}={self.hasher.digest(path)}\0".encode())
+            for dep in stage.deps:
+                h.update(fps[dep].encode())
+            fps[name] = h.hexdigest()
+        return fps
+
+    def closure(self, targets: Optional[List[str]]) -> List[str]:
+        """Stages needed for `targets` (all stages if None), in build order."""
+        if not targets:
+            return list(self.order)
+        needed = set()
+        stack = list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage: {name}")
+            if name not in needed:
+                needed.add(name)
+                stack.extend(self.stages[name].deps)
+        return [n for n in self.order if n in needed]
+
+    def stale(self, names: List[str], fps: Dict[str, str], force=False) -> List[str]:
+        previous = self.state["fingerprints"]
+        result = []
+        for name in names:
+            stage = self.stages[name]
+            if (force or previous.get(name) != fps[name]
+                    or not _cache_path(name).exists()
+                    or not all(p.exists() for p in stage.outputs)):
+                result.append(name)
+        return result
+
+    def run(self, targets: Optional[List[str]] = None, force=False) -> Dict[str, float]:
+        """Run stale stages for `targets`. Returns {stage: seconds} for stages that ran."""
+        names = self.closure(targets)
+        fps = self.fingerprints()
+        to_run = set(self.stale(names, fps, force))
+        timings = {}
+
+        if not to_run:
+            print("Everything up to date.")
+            return timings
+
+        print(f"Stale: {', '.join(n for n in names if n in to_run)}")
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        dp.OUTPUT_DIR.mkdir(exist_ok=True)
+
+        pending = [n for n in names if n in to_run]
+        if self.in_process:
+            for name in pending:
+                timings[name] = self._run_in_process(name)
+                self.state["fingerprints"][name] = fps[name]
+                self._save_state()
+                print(f"[build] {name} done in {timings[name]:.2f}s")
+            return timings
+
+        running = {}
+        done = set(n for n in names if n not in to_run)
+        # Workers share this stdout; flush whole lines so ours never split theirs
+        if hasattr(sys.stdout, "reconfigure"):
+            sys.stdout.reconfigure(line_buffering=True)
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in list(pending):
+                    if all(d in done for d in self.stages[name].deps):
+                        pending.remove(name)
+                        running[pool.submit(_run_stage_in_worker, name)] = name
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    timings[name] = future.result()  # re-raises stage errors
+                    done.add(name)
+                    self.state["fingerprints"][name] = fps[name]
+                    self._save_state()
+                    print(f"[build] {name} done in {timings[name]:.2f}s")
+
+        return timings
+
+    def forget_results_from(self, modules: list) -> List[str]:
+        """
+        Drop kept results holding instances of classes defined in `modules`.
+
+        Called after those modules are reloaded: the old class objects no
+        longer pickle, so such results are read back from the cache (which
+        resolves the reloaded classes) the next time a stage needs them.
+        """
+        names = {m.__name__ for m in modules}
+        dropped = [name for name, result in self.results.items()
+                   if _result_modules(result) & names]
+        for name in dropped:
+            del self.results[name]
+        return dropped
+
+    def _result(self, name: str):
+        if name not in self.results:
+            with open(_cache_path(name), "rb") as f:
+                self.results[name] = pickle.load(f)
+        return self.results[name]
+
+    def _run_in_process(self, name: str) -> float:
+        """
+        Run one stage in this process, taking dep results from memory
+        (loading each from the cache at most once). The result is kept in
+        memory and still written to the cache so a later normal build
+        agrees with the recorded fingerprints.
+        """
+        stage = self.stages[name]
+        args = [self._result(dep) for dep in stage.deps]
+        start = time.perf_counter()
+        result = self.results[name] = stage.func(*args)
+        elapsed = time.perf_counter() - start
+        with open(_cache_path(name), "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return elapsed
+
+
+# =============================================================================
+# Watch Mode
+# =============================================================================
+
+# Reloaded in dependency order when any of their files change
+WATCHED_MODULES = [pinyin, kana, indexes, ranking, variants, examples, membership, headword_store,
+                   binary_store, stats, autocomplete, homophones, correspondences, dp, eff,
+                   false_friend_loader]
+WATCH_INTERVAL = 0.2
+
+
+def watched_files(runner: BuildRunner) -> List[Path]:
+    """Every stage input plus the source files of the pipeline modules."""
+    files = {Path(m.__file__) for m in WATCHED_MODULES}
+    for stage in runner.stages.values():
+        files.update(stage.inputs)
+    return sorted(files)
+
+
+def _mtimes(files: List[Path]) -> Dict[Path, Optional[int]]:
+    stamps = {}
+    for path in files:
+        try:
+            stamps[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            stamps[path] = None
+    return stamps
+
+
+def _reload_modules(runner: BuildRunner):
+    """Reload the pipeline modules and drop kept results made of their old classes."""
+    for module in WATCHED_MODULES:
+        importlib.reload(module)
+    dropped = runner.forget_results_from(WATCHED_MODULES)
+    if dropped:
+        print(f"  Reloading from cache after code change: {', '.join(dropped)}")
+
+
+def watch(runner: BuildRunner, targets: Optional[List[str]] = None, interval=WATCH_INTERVAL):
+    """
+    Build once, then poll the watched files and rebuild on every save.
+
+    The runner runs in-process, so parsed CEDICT/JMdict/Unihan dicts and the
+    JCKV conversion stay in memory between rebuilds. Editing a curated list
+    in data_pipeline.py reloads the modules and reruns only the stages whose
+    code fingerprint changed (compile_false_friends and what it feeds).
+    Kept results holding instances of reloaded classes (FalseFriend lists,
+    the CEDICT HeadwordStore) are read back from the cache instead.
+    """
+    runner.in_process = True
+    runner.run(targets)
+    files = watched_files(runner)
+    stamps = _mtimes(files)
+    print(f"\nWatching {len(files)} files (Ctrl-C to stop)...")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = _mtimes(files)
+            changed = [p for p in files if current[p] != stamps[p]]
+            if not changed:
+                continue
+            stamps = current
+            print(f"\nChanged: {', '.join(str(p) for p in changed)}")
+
+            start = time.perf_counter()
+            try:
+                if any(p.suffix == ".py" for p in changed):
+                    _reload_modules(runner)
+                    runner.set_stages(make_stages())
+                timings = runner.run(targets)
+            except Exception as e:  # keep watching through a half-saved edit
+                print(f"  Build failed: {type(e).__name__}: {e}")
+                continue
+            print(f"Rebuilt in {time.perf_counter() - start:.2f}s "
+                  f"({len(timings)} stage(s) ran)")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
+# =============================================================================
+# Stage Functions
+# =============================================================================
+# Top-level functions so worker processes can run them by name.
+
+def stage_parse_unihan():
+    return dp.parse_unihan(UNIHAN_PATH) if UNIHAN_PATH.exists() else {}
+
+
+def stage_parse_jmdict():
+    return dp.parse_jmdict(JMDICT_PATH) if JMDICT_PATH.exists() else {}
+
+
+def stage_parse_cedict():
+    return dp.parse_cedict(CEDICT_PATH) if CEDICT_PATH.exists() else {}
+
+
+def stage_source_counts(unihan, jmdict, cedict):
+    return {"unihan": len(unihan), "jmdict": len(jmdict), "cedict": len(cedict)}
+
+
+def stage_variant_tables(unihan, jmdict, cedict):
+    return variants.build_variant_tables(unihan, jmdict, cedict)
+
+
+def stage_emit_variants(tables):
+    variants.write_variants(tables)
+
+
+def stage_variant_clusters(unihan):
+    return variants.build_variant_clusters(unihan)
+
+
+def stage_emit_variant_clusters(clusters):
+    variants.write_variant_clusters(clusters)
+
+
+def stage_compile_characters(unihan, jmdict, cedict, clusters):
+    # Homophone indexes and character statistics are collected in the same pass
+    collector = homophones.HomophoneCollector()
+    character_stats = stats.StatsCollector()
+    characters = dp.compile_characters(unihan, jmdict, cedict, collector, character_stats,
+                                       variants.VariantClusters(clusters))
+    return {"characters": characters, "homophones": collector.build(), "stats": character_stats}
+
+
+def stage_emit_homophones(compiled):
+    homophones.write_homophones(compiled["homophones"], dp.OUTPUT_DIR / "homophones.idx")
+
+
+def stage_emit_correspondences(compiled):
+    correspondences.write_correspondences(compiled["characters"],
+                                          dp.OUTPUT_DIR / "reading_correspondences.json")
+
+
+def stage_character_readings(compiled, jmdict):
+    return list(dp.character_reading_entries(compiled["characters"], jmdict))
+
+
+def stage_link_characters(compiled, false_friends, clusters):
+    # Copy so a cached compile result is never mutated
+    return dp.add_false_friend_links([dict(c) for c in compiled["characters"]], false_friends,
+                                     variants.VariantClusters(clusters))
+
+
+def stage_emit_characters(characters, false_friends):
+    dp.write_characters(characters, false_friends)
+
+
+def stage_emit_false_friends(false_friends):
+    dp.write_false_friends(false_friends)
+
+
+def stage_emit_shards(characters):
+    dp.write_character_shards(characters, dp.OUTPUT_DIR)
+
+
+def stage_emit_binary(characters, false_friends):
+    binary_store.write_store(BINARY_PATH,
+                             {"characters": characters, "false_friends": false_friends})
+    print(f"  Wrote {BINARY_PATH.name}")
+
+
+def stage_emit_indexes(characters, character_readings, false_friends):
+    dp.write_lookup_indexes(
+        characters, character_readings + list(dp.false_friend_reading_entries(false_friends)))
+
+
+def stage_emit_autocomplete(characters, character_readings):
+    autocomplete.write_autocomplete(characters, character_readings,
+                                    dp.OUTPUT_DIR / "autocomplete.idx")
+
+
+def stage_emit_stats(compiled, false_friends, source_counts):
+    # compile_false_friends is its own stage, so its entries are counted here
+    collector = stats.StatsCollector().merge(compiled["stats"])
+    for ff in false_friends:
+        collector.add_false_friend(ff)
+    dp.write_stats(collector, source_counts)
+
+
+def stage_load_curated():
+    if not CURATED_PATH.exists():
+        return []
+    return eff.load_curated_false_friends(str(CURATED_PATH))
+
+
+def stage_convert_jckv(tables):
+    if not JCKV_PATH.exists():
+        return []
+    if not eff.HAS_OPENPYXL:
+        # Returning [] here would let emit_expanded overwrite the output without JCKV entries
+        raise ImportError(f"{JCKV_PATH} needs openpyxl: pip install openpyxl "
+                          f"(or move it away to build without JCKV entries)")
+    return eff.convert_jckv_database(str(JCKV_PATH), variants.VariantTables(tables))
+
+
+def stage_auto_detect():
+    if not (JMDICT_PATH.exists() and CEDICT_PATH.exists()):
+        return []
+    return eff.auto_detect_false_friends(str(JMDICT_PATH), str(CEDICT_PATH))
+
+
+def stage_merge(curated, jckv, auto, clusters):
+    return eff.merge_false_friends(curated, jckv, auto, variants.VariantClusters(clusters))
+
+
+def stage_mine_examples(merged, tables, cedict):
+    sentences = next((p for p in examples.SENTENCE_PATHS if p.exists()), None)
+    if sentences is None:
+        return {"examples": {}, "postings": {}}
+    links = next((p for p in examples.LINK_PATHS if p.exists()), None)
+    return examples.mine_examples(examples.headwords_for(merged), sentences, links,
+                                  variants.VariantTables(tables), words=cedict or None)
+
+
+def stage_emit_examples(mined):
+    if mined["examples"]:
+        examples.write_examples(mined)
+
+
+def stage_emit_jckv(jckv):
+    if jckv:
+        eff.save_false_friends(jckv, str(JCKV_OUTPUT_PATH))
+
+
+def stage_emit_expanded(merged, mined):
+    merged = examples.apply_examples(merged, mined["examples"])
+    eff.save_false_friends(merged, str(EXPANDED_PATH))
+    kana.write_reading_index(
+        kana.build_reading_index((ff.id, [ff.jp_reading]) for ff in merged),
+        EXPANDED_PATH.with_name(f"{EXPANDED_PATH.stem}_reading_index.json"))
+
+
+def stage_emit_membership(merged, tables):
+    membership.write_membership(
+        membership.membership_keys(merged, variants.VariantTables(tables)))
+
+
+def make_stages() -> List[Stage]:
+    """
+    Build the stage list from the current module objects.
+
+    Called again after modules are reloaded in watch mode so code
+    fingerprints see the edited source.
+    """
+    return [
+        Stage("parse_unihan", stage_parse_unihan, inputs=[UNIHAN_PATH]),
+        Stage("parse_jmdict", stage_parse_jmdict, inputs=[JMDICT_PATH], code=[headword_store]),
+        Stage("parse_cedict", stage_parse_cedict, inputs=[CEDICT_PATH],
+              code=[pinyin, headword_store]),
+        Stage("source_counts", stage_source_counts,
+              deps=["parse_unihan", "parse_jmdict", "parse_cedict"]),
+        Stage("variant_clusters", stage_variant_clusters, deps=["parse_unihan"]),
+        Stage("emit_variant_clusters", stage_emit_variant_clusters, deps=["variant_clusters"],
+              outputs=[variants.CLUSTERS_PATH]),
+        Stage("compile_characters", stage_compile_characters,
+              deps=["parse_unihan", "parse_jmdict", "parse_cedict", "variant_clusters"],
+              code=[stats, kana, pinyin]),
+        Stage("emit_homophones", stage_emit_homophones, deps=["compile_characters"],
+              outputs=[dp.OUTPUT_DIR / "homophones.idx"], code=[indexes]),
+        Stage("emit_correspondences", stage_emit_correspondences, deps=["compile_characters"],
+              outputs=[dp.OUTPUT_DIR / "reading_correspondences.json"],
+              code=[correspondences, kana, pinyin]),
+        Stage("variant_tables", stage_variant_tables,
+              deps=["parse_unihan", "parse_jmdict", "parse_cedict"]),
+        Stage("emit_variants", stage_emit_variants, deps=["variant_tables"],
+              outputs=[variants.VARIANTS_PATH]),
+        Stage("character_readings", stage_character_readings,
+              deps=["compile_characters", "parse_jmdict"]),
+        Stage("compile_false_friends", dp.compile_false_friends, code=[pinyin]),
+        Stage("link_characters", stage_link_characters,
+              deps=["compile_characters", "compile_false_friends", "variant_clusters"]),
+        Stage("emit_characters", stage_emit_characters,
+              deps=["link_characters", "compile_false_friends"],
+              outputs=[dp.OUTPUT_DIR / "characters.json"]),
+        Stage("emit_false_friends", stage_emit_false_friends, deps=["compile_false_friends"],
+              outputs=[dp.OUTPUT_DIR / "false_friends.json"]),
+        Stage("emit_shards", stage_emit_shards, deps=["link_characters"],
+              outputs=[dp.OUTPUT_DIR / "characters_manifest.json"]),
+        Stage("emit_binary", stage_emit_binary, deps=["link_characters", "compile_false_friends"],
+              outputs=[BINARY_PATH], code=[binary_store]),
+        Stage("emit_indexes", stage_emit_indexes,
+              deps=["link_characters", "character_readings", "compile_false_friends"],
+              outputs=[dp.OUTPUT_DIR / "reading_index.json", dp.OUTPUT_DIR / "radical_stroke.idx"],
+              code=[kana, indexes]),
+        Stage("emit_autocomplete", stage_emit_autocomplete,
+              deps=["link_characters", "character_readings"],
+              outputs=[dp.OUTPUT_DIR / "autocomplete.idx"], code=[autocomplete, kana, indexes]),
+        Stage("emit_stats", stage_emit_stats,
+              deps=["compile_characters", "compile_false_friends", "source_counts"],
+              outputs=[dp.OUTPUT_DIR / "stats.json"], code=[stats]),
+        Stage("load_curated", stage_load_curated, inputs=[CURATED_PATH],
+              code=[false_friend_loader, pinyin]),
+        Stage("convert_jckv", stage_convert_jckv, deps=["variant_tables"], inputs=[JCKV_PATH],
+              code=[pinyin]),
+        Stage("auto_detect", stage_auto_detect, inputs=[JMDICT_PATH, CEDICT_PATH]),
+        Stage("merge_false_friends", stage_merge,
+              deps=["load_curated", "convert_jckv", "auto_detect", "variant_clusters"]),
+        Stage("mine_examples", stage_mine_examples,
+              deps=["merge_false_friends", "variant_tables", "parse_cedict"],
+              inputs=examples.SENTENCE_PATHS + examples.LINK_PATHS, code=[examples]),
+        Stage("emit_examples", stage_emit_examples, deps=["mine_examples"], code=[indexes]),
+        Stage("emit_jckv", stage_emit_jckv, deps=["convert_jckv"]),
+        Stage("emit_expanded", stage_emit_expanded, deps=["merge_false_friends", "mine_examples"],
+              outputs=[EXPANDED_PATH], code=[kana]),
+        Stage("emit_membership", stage_emit_membership,
+              deps=["merge_false_friends", "variant_tables"],
+              outputs=[membership.MEMBERSHIP_PATH], code=[membership]),
+    ]
+
+
+STAGES = make_stages()
+STAGES_BY_NAME = {s.name: s for s in STAGES}
+
+
+def default_targets(optional: List[str]) -> List[str]:
+    """Every stage except the optional outputs not asked for in `optional`."""
+    skipped = {stage for flag, stage in OPTIONAL_STAGES.items() if flag not in optional}
+    return [s.name for s in STAGES if s.name not in skipped]
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incremental Yomikae data build")
+    parser.add_argument("targets", nargs="*", help="Stages to build (default: all)")
+    parser.add_argument("--force", action="store_true", help="Rebuild regardless of fingerprints")
+    parser.add_argument("--jobs", "-j", type=int, help="Parallel worker processes")
+    parser.add_argument("--download", action="store_true", help="Download missing sources first")
+    parser.add_argument("--shards", action="store_true", help="Also build the character shards")
+    parser.add_argument("--binary", action="store_true", help="Also build output/yomikae.bin")
+    parser.add_argument("--list", action="store_true", help="List stages and staleness, then exit")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep sources in memory and rebuild on every save")
+    parser.add_argument("--progress", choices=progress.MODES,
+                        help="Progress display in stages (default: bar on a terminal, else log lines)")
+    args = parser.parse_args()
+
+    runner = BuildRunner(STAGES, jobs=args.jobs)
+    targets = args.targets or default_targets(
+        [flag for flag in OPTIONAL_STAGES if getattr(args, flag)])
+    if args.progress:
+        progress.set_mode(args.progress)
+    elif runner.jobs > 1:
+        # Bars from parallel workers would overwrite each other on one terminal
+        progress.set_mode("log")
+
+    if args.list:
+        names = runner.closure(targets)
+        stale = set(runner.stale(names, runner.fingerprints(), args.force))
+        for name in names:
+            deps = ", ".join(runner.stages[name].deps)
+            print(f"  {'*' if name in stale else ' '} {name:24} {f'<- {deps}' if deps else ''}")
+        print("(* = stale)")
+        return
+
+    if args.download:
+        dp.download_sources()
+
+    if args.watch:
+        watch(runner, targets)
+        return
+
+    start = time.perf_counter()
+    timings = runner.run(targets, force=args.force)
+    print(f"\nBuild finished in {time.perf_counter() - start:.2f}s "
+          f"({len(timings)} stage(s) ran)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
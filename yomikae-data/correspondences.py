@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+On'yomi / Pinyin Sound Correspondences
+
+On'yomi and Mandarin both descend from Middle Chinese, so their syllables
+line up more often than not: on'yomi -ン goes with pinyin -n, -ウ/-イ with
+-ng, the "entering tone" -ク/-ツ with open vowels. This stage counts those
+correspondences over the compiled single characters and scores each
+character on how well its readings follow them.
+
+Each (on'yomi, pinyin) pair of a character is cut into two features:
+    onset  on'yomi initial consonant (k-, sh-, ky-, ∅-) vs pinyin initial
+           (g-, zh-, x-, ∅-)
+    coda   on'yomi final mora (-ン, -ウ, -イ, -ク, -キ, -ツ, -チ, -∅) vs
+           pinyin ending (-n, -ng, -i, -u, -r, -∅)
+and added to an onyomi x pinyin contingency matrix per feature. A
+character with several readings spreads one unit of weight over all its
+pairs, so polyphonic characters do not dominate. With NumPy the matrices
+are filled with np.add.at in one call; without it, the same counts come
+from a plain loop (--check-backends runs both and compares them).
+
+A pair's regularity is the mean over both features of P(pinyin feature |
+on'yomi feature); a character's score is its best pair's, and it is
+"regular" when that pair's pinyin features each get at least
+REGULAR_SHARE of their on'yomi feature's weight.
+
+Usage:
+    python correspondences.py                        # from output/characters.json
+    python correspondences.py --synthetic 0.2        # scale_test.py data, timed
+    python correspondences.py --synthetic 1 --check-backends
+
+Output:
+    output/reading_correspondences.json
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from kana import DIGRAPH_ROMAJI, HIRAGANA_ROMAJI, extract_readings, to_katakana
+from pinyin import to_toneless
+
+# NumPy only speeds up the counting; results are identical without it
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+COUNT_BACKENDS = ["numpy", "python"]
+DEFAULT_BACKEND = "numpy" if HAS_NUMPY else "python"
+
+
+OUTPUT_DIR = Path("output")
+CORRESPONDENCES_PATH = OUTPUT_DIR / "reading_correspondences.json"
+
+FEATURES = ["onset", "coda"]
+# Minimum P(pinyin feature | on'yomi feature) for a feature to count as regular
+REGULAR_SHARE = 0.2
+# Correspondences listed in the artifact need this much weight
+MIN_WEIGHT = 5.0
+
+PINYIN_INITIALS = ["zh", "ch", "sh", "b", "p", "m", "f", "d", "t", "n", "l", "g", "k", "h",
+                   "j", "q", "x", "r", "z", "c", "s", "y", "w"]
+# Final on'yomi mora -> coda label (anything else is an open syllable)
+ONYOMI_CODAS = {"ん": "-ン", "う": "-ウ", "い": "-イ", "く": "-ク", "き": "-キ",
+                "つ": "-ツ", "ち": "-チ"}
+NONE = "∅"
+
+
+# =============================================================================
+# Features
+# =============================================================================
+
+def onyomi_features(hiragana: str) -> Optional[Tuple[str, str]]:
+    """(onset, coda) of one on'yomi in hiragana, or None if empty."""
+    if not hiragana:
+        return None
+    first = hiragana[:2] if hiragana[:2] in DIGRAPH_ROMAJI else hiragana[0]
+    roma = DIGRAPH_ROMAJI.get(first) or HIRAGANA_ROMAJI.get(first, "")
+    consonant = roma.rstrip("aiueo")
+    onset = f"{consonant or NONE}-"
+    coda = ONYOMI_CODAS.get(hiragana[-1], f"-{NONE}") if len(hiragana) > len(first) else f"-{NONE}"
+    return onset, coda
+
+
+def pinyin_features(syllable: str) -> Optional[Tuple[str, str]]:
+    """(initial, ending) of one toneless pinyin syllable, or None if empty."""
+    syllable = syllable.strip().lower().replace("u:", "ü").replace("v", "ü")
+    if not syllable.isalpha():
+        return None
+    initial = next((i for i in PINYIN_INITIALS if syllable.startswith(i) and len(syllable) > len(i)), "")
+    if syllable.endswith("ng"):
+        ending = "-ng"
+    elif syllable.endswith("n"):
+        ending = "-n"
+    elif syllable.endswith("r") and syllable != "r":
+        ending = "-r"
+    elif syllable[-1] == "i" and len(syllable) > len(initial) + 1:
+        ending = "-i"
+    elif syllable[-1] in "uo" and len(syllable) > len(initial) + 1 and syllable[-2] in "aoi":
+        ending = "-u"
+    else:
+        ending = f"-{NONE}"
+    return f"{initial or NONE}-", ending
+
+
+def reading_pairs(characters: Iterable[dict]):
+    """
+    (character, [(on'yomi katakana, pinyin, on features, pinyin features)])
+    for every single character that has both readings.
+    """
+    on_memo: Dict[str, list] = {}
+    py_memo: Dict[str, Optional[tuple]] = {}
+    for entry in characters:
+        char = entry.get("character", "")
+        if len(char) != 1:
+            continue
+        ons = []
+        for raw in (entry.get("japanese") or {}).get("onyomi") or []:
+            parsed = on_memo.get(raw)
+            if parsed is None:
+                parsed = on_memo[raw] = [(to_katakana(k), onyomi_features(k))
+                                         for k in extract_readings(raw)]
+            ons.extend(p for p in parsed if p[1])
+        chinese = entry.get("chinese") or {}
+        pys = []
+        for raw in chinese.get("pinyin_toneless") or chinese.get("pinyin") or []:
+            syllable = to_toneless(raw).lower()
+            if syllable not in py_memo:
+                py_memo[syllable] = pinyin_features(syllable)
+            if py_memo[syllable]:
+                pys.append((syllable, py_memo[syllable]))
+        if ons and pys:
+            # Dedupe while keeping source order
+            ons = list(dict.fromkeys(ons))
+            pys = list(dict.fromkeys(pys))
+            yield char, [(on, py, on_f, py_f) for on, on_f in ons for py, py_f in pys]
+
+
+# =============================================================================
+# Counting
+# =============================================================================
+
+class ContingencyTable:
+    """Weighted onyomi-feature x pinyin-feature counts for one feature."""
+
+    def __init__(self, rows: List[str], cols: List[str], counts: List[List[float]]):
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.row_index = {label: i for i, label in enumerate(rows)}
+        self.col_index = {label: j for j, label in enumerate(cols)}
+        self.row_totals = [sum(row) for row in counts]
+        self.col_totals = [sum(row[j] for row in counts) for j in range(len(cols))]
+        self.total = sum(self.row_totals)
+
+    def p_col_given_row(self, row: str, col: str) -> float:
+        i, j = self.row_index[row], self.col_index[col]
+        return self.counts[i][j] / self.row_totals[i] if self.row_totals[i] else 0.0
+
+    def cells(self):
+        for i, row in enumerate(self.rows):
+            for j, col in enumerate(self.cols):
+                if self.counts[i][j]:
+                    yield row, col, self.counts[i][j], i, j
+
+
+def _count_numpy(observations, shape, row_index, col_index) -> list:
+    import numpy as np
+
+    n = len(observations)
+    matrix = np.zeros(shape)
+    # Unbuffered, in observation order: the same float sums as the loop below
+    np.add.at(matrix,
+              (np.fromiter((row_index[o[0]] for o in observations), dtype=np.intp, count=n),
+               np.fromiter((col_index[o[1]] for o in observations), dtype=np.intp, count=n)),
+              np.fromiter((o[2] for o in observations), dtype=float, count=n))
+    return matrix.tolist()
+
+
+def _count_python(observations, shape, row_index, col_index) -> list:
+    counts = [[0.0] * shape[1] for _ in range(shape[0])]
+    for row, col, weight in observations:
+        counts[row_index[row]][col_index[col]] += weight
+    return counts
+
+
+def _count(observations: List[Tuple[str, str, float]], backend: str = DEFAULT_BACKEND) -> ContingencyTable:
+    rows = sorted({o[0] for o in observations})
+    cols = sorted({o[1] for o in observations})
+    row_index = {label: i for i, label in enumerate(rows)}
+    col_index = {label: j for j, label in enumerate(cols)}
+    count = _count_numpy if backend == "numpy" else _count_python
+    return ContingencyTable(rows, cols, count(observations, (len(rows), len(cols)),
+                                              row_index, col_index))
+
+
+def build_tables(pairs: List[Tuple[str, list]],
+                 backend: str = DEFAULT_BACKEND) -> Dict[str, ContingencyTable]:
+    observations = {feature: [] for feature in FEATURES}
+    for _, char_pairs in pairs:
+        weight = 1.0 / len(char_pairs)
+        for _, _, on_f, py_f in char_pairs:
+            for k, feature in enumerate(FEATURES):
+                observations[feature].append((on_f[k], py_f[k], weight))
+    return {feature: _count(obs, backend) for feature, obs in observations.items()}
+
+
+# =============================================================================
+# Scores and artifact
+# =============================================================================
+
+def score_characters(pairs: List[Tuple[str, list]], tables: Dict[str, ContingencyTable]) -> dict:
+    """{character: {"score", "regular", "onyomi", "pinyin"}} from each character's best pair."""
+    scores = {}
+    for char, char_pairs in pairs:
+        best = None
+        for on, py, on_f, py_f in char_pairs:
+            shares = [tables[feature].p_col_given_row(on_f[k], py_f[k])
+                      for k, feature in enumerate(FEATURES)]
+            candidate = (sum(shares) / len(shares), min(shares), on, py)
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        scores[char] = {
+            "score": round(best[0], 4),
+            "regular": best[1] >= REGULAR_SHARE,
+            "onyomi": best[2],
+            "pinyin": best[3],
+        }
+    return scores
+
+
+def correspondence_rows(tables: Dict[str, ContingencyTable], min_weight: float = MIN_WEIGHT) -> list:
+    """Cells with enough weight, strongest association (lift) first within each feature."""
+    rows = []
+    for feature, table in tables.items():
+        cells = []
+        for on, py, weight, i, j in table.cells():
+            if weight < min_weight:
+                continue
+            p_py = weight / table.row_totals[i]
+            p_on = weight / table.col_totals[j]
+            lift = p_py / (table.col_totals[j] / table.total)
+            cells.append({
+                "feature": feature, "onyomi": on, "pinyin": py, "weight": round(weight, 2),
+                "p_pinyin_given_onyomi": round(p_py, 4), "p_onyomi_given_pinyin": round(p_on, 4),
+                "lift": round(lift, 3),
+            })
+        rows.extend(sorted(cells, key=lambda c: (-c["lift"], -c["weight"])))
+    return rows
+
+
+def analyze(characters: Iterable[dict], backend: str = DEFAULT_BACKEND) -> dict:
+    """The correspondence artifact for a list of compiled characters."""
+    pairs = list(reading_pairs(characters))
+    tables = build_tables(pairs, backend)
+    scores = score_characters(pairs, tables)
+    return {
+        "metadata": {
+            "characters": len(pairs),
+            "pairs": sum(len(p) for _, p in pairs),
+            "regular": sum(1 for s in scores.values() if s["regular"]),
+            "regular_share": REGULAR_SHARE,
+            "min_weight": MIN_WEIGHT,
+            "features": FEATURES,
+        },
+        "tables": {
+            feature: {"onyomi": t.rows, "pinyin": t.cols,
+                      "weights": [[round(v, 3) for v in row] for row in t.counts]}
+            for feature, t in tables.items()
+        },
+        "correspondences": correspondence_rows(tables),
+        "characters": scores,
+    }
+
+
+def write_correspondences(characters: list, output_path: Path = CORRESPONDENCES_PATH,
+                          backend: str = DEFAULT_BACKEND) -> dict:
+    result = analyze(characters, backend)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    meta = result["metadata"]
+    print(f"  Wrote {Path(output_path).name} ({meta['characters']} characters, "
+          f"{meta['regular']} regular, {len(result['correspondences'])} correspondences)")
+    return result
+
+
+def check_backends(characters: list) -> bool:
+    """Count with NumPy and with the plain loop; True when the matrices and artifacts match."""
+    if not HAS_NUMPY:
+        raise SystemExit("NumPy is not installed; nothing to compare")
+    pairs = list(reading_pairs(characters))
+    tables = {backend: build_tables(pairs, backend) for backend in COUNT_BACKENDS}
+    same = True
+    for feature in FEATURES:
+        a, b = tables["numpy"][feature], tables["python"][feature]
+        diff = max((abs(x - y) for ra, rb in zip(a.counts, b.counts) for x, y in zip(ra, rb)),
+                   default=0.0)
+        equal = a.rows == b.rows and a.cols == b.cols and a.counts == b.counts
+        same = same and equal
+        print(f"  {feature}: {len(a.rows)} x {len(a.cols)}, max difference {diff:g}, "
+              f"{'identical' if equal else 'DIFFERENT'}")
+    documents = [analyze(characters, backend) for backend in COUNT_BACKENDS]
+    print(f"  artifact: {'identical' if documents[0] == documents[1] else 'DIFFERENT'}")
+    return same and documents[0] == documents[1]
+
+
+def print_summary(result: dict, limit: int = 12):
+    for feature in FEATURES:
+        print(f"\n{feature}:")
+        rows = [r for r in result["correspondences"] if r["feature"] == feature][:limit]
+        for r in rows:
+            print(f"  {r['onyomi']:>6} ~ {r['pinyin']:<6} weight {r['weight']:>8.1f}  "
+                  f"P(py|on) {r['p_pinyin_given_onyomi']:.2f}  lift {r['lift']:.2f}")
+    irregular = [c for c, s in result["characters"].items() if not s["regular"]]
+    print(f"\nIrregular: {len(irregular)} of {len(result['characters'])} "
+          f"(e.g. {''.join(irregular[:20])})")
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Mine on'yomi / pinyin sound correspondences")
+    parser.add_argument("--characters", type=str, default=str(OUTPUT_DIR / "characters.json"))
+    parser.add_argument("--output", type=str, default=str(CORRESPONDENCES_PATH))
+    parser.add_argument("--synthetic", type=float,
+                        help="Run on scale_test.py data at this scale (not written)")
+    parser.add_argument("--backend", choices=COUNT_BACKENDS, default=DEFAULT_BACKEND,
+                        help="Contingency counting (numpy when installed)")
+    parser.add_argument("--check-backends", action="store_true",
+                        help="Count with NumPy and the plain loop and compare the results")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        import contextlib
+        import io
+
+        import data_pipeline
+        from scale_test import synthetic_sources
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            characters = data_pipeline.compile_characters(*synthetic_sources(args.synthetic))
+    else:
+        with open(args.characters, "r", encoding="utf-8") as f:
+            characters = json.load(f)
+
+    if args.check_backends:
+        raise SystemExit(0 if check_backends(characters) else 1)
+
+    start = time.perf_counter()
+    if args.synthetic:
+        result = analyze(characters, args.backend)
+    else:
+        result = write_correspondences(characters, Path(args.output), args.backend)
+    print(f"  {len(characters)} entries analyzed in {time.perf_counter() - start:.2f}s "
+          f"({'NumPy' if args.backend == 'numpy' else 'pure Python'} counting)")
+    print_summary(result)
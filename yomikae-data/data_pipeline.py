@@ -13,11 +13,21 @@ Usage:
     python data_pipeline.py --download    # Download source files
     python data_pipeline.py --process     # Process into app format
     python data_pipeline.py --all         # Both steps
+    python data_pipeline.py --shards      # Also write tiered character shards
+    python data_pipeline.py --binary      # Also write output/yomikae.bin (see binary_store.py)
 
 Output:
     output/characters.json     - Unified character database
     output/false_friends.json  - Classified false friends
     output/stats.json          - Processing statistics
+    output/reading_index.json  - Kana/romaji reading -> entry IDs
+    output/radical_stroke.idx  - Radical / stroke-count posting lists (see indexes.py)
+    output/autocomplete.idx    - Prefix completions by character/kana/romaji/pinyin (see autocomplete.py)
+    output/homophones.idx      - Pinyin / on'yomi -> characters, most common first (see homophones.py)
+    output/variants.json       - Traditional/simplified/shinjitai tables (see variants.py)
+    output/variant_clusters.json - Unihan variant clusters for cross-script joins (see variants.py)
+    output/characters_manifest.json + output/characters/  - Tiered shards (--shards)
+    output/yomikae.bin         - Memory-mappable binary store (--binary)
 """
 
 import json
@@ -32,6 +42,19 @@ from dataclasses import dataclass, asdict
 from typing import Optional
 from pathlib import Path
 
+from autocomplete import write_autocomplete
+from correspondences import write_correspondences
+from headword_store import HeadwordStoreBuilder
+from homophones import HomophoneCollector, write_homophones
+from indexes import write_indexes
+from kana import build_reading_index, write_reading_index
+from pinyin import normalize_column, pinyin_forms
+from progress import MODES, Progress, set_mode
+from ranking import commonness_key
+from stats import StatsCollector
+from variants import (VariantClusters, build_variant_clusters, build_variant_tables,
+                      write_variant_clusters, write_variants)
+
 
 # =============================================================================
 # Configuration
@@ -69,6 +92,8 @@ class ChineseReading:
     simplified: Optional[str] = None   # If different from character
     traditional: Optional[str] = None  # If different from character
     meanings: list[str] = None
+    pinyin_numbered: list[str] = None  # CEDICT style (e.g., "mian3")
+    pinyin_toneless: list[str] = None  # Search key (e.g., "mian")
 
 
 @dataclass
@@ -101,6 +126,8 @@ class FalseFriendEntry:
     
     explanation: str
     mnemonic_tip: Optional[str] = None
+    cn_pinyin_numbered: str = ""
+    cn_pinyin_toneless: str = ""
 
 
 # =============================================================================
@@ -709,8 +736,11 @@ FALSE_FRIENDS_ADDITIONAL = [
 ]
 
 
-def compile_false_friends():
-    """Compile all false friends into a unified list with IDs."""
+def compile_false_friends(stats: Optional[StatsCollector] = None):
+    """
+    Compile all false friends into a unified list with IDs.
+    If a StatsCollector is given, every entry is added to it.
+    """
     all_ff = []
     
     # Type 4 (completely different)
@@ -737,6 +767,15 @@ def compile_false_friends():
             entry["type"] = 4
         all_ff.append(entry)
     
+    # Curated pinyin is already tone-marked; add the numbered and toneless
+    # forms so search never converts at query time
+    _, numbered, toneless = normalize_column([ff["cn_pinyin"] for ff in all_ff])
+    for ff, num, plain in zip(all_ff, numbered, toneless):
+        ff["cn_pinyin_numbered"] = num
+        ff["cn_pinyin_toneless"] = plain
+        if stats is not None:
+            stats.add_false_friend(ff)
+    
     return all_ff
 
 
@@ -784,13 +823,19 @@ def parse_unihan(filepath: Path) -> dict:
         "kFrequency": "frequency",
         "kSimplifiedVariant": "simplified",
         "kTraditionalVariant": "traditional",
+        "kSemanticVariant": "semantic_variants",
+        "kZVariant": "z_variants",
     }
     
     with zipfile.ZipFile(filepath, 'r') as zf:
-        for filename in zf.namelist():
-            if filename.startswith("Unihan_") and filename.endswith(".txt"):
+        filenames = [name for name in zf.namelist()
+                     if name.startswith("Unihan_") and name.endswith(".txt")]
+        total = sum(zf.getinfo(name).file_size for name in filenames)
+        with Progress("Unihan", total=total, unit="B") as progress:
+            for filename in filenames:
                 with zf.open(filename) as f:
                     for line in f:
+                        progress.update(len(line))
                         line = line.decode("utf-8").strip()
                         if not line or line.startswith("#"):
                             continue
@@ -813,7 +858,8 @@ def parse_unihan(filepath: Path) -> dict:
 def parse_jmdict(filepath: Path) -> dict:
     """
     Parse JMDict for Japanese readings and meanings.
-    Returns dict mapping character/word -> Japanese data
+    Returns a mapping of character/word -> Japanese data (a HeadwordStore,
+    so headwords of every length fit in memory)
     """
     print("  Parsing JMDict...")
     
@@ -825,28 +871,34 @@ def parse_jmdict(filepath: Path) -> dict:
     
     # JMDict uses entities, need to handle them
     # For simplicity, we'll do basic parsing
-    data = {}
+    builder = HeadwordStoreBuilder(["readings", "meanings"], list_fields=("readings", "meanings"))
     
     # Very basic extraction - in production, use proper XML parsing
     # This is simplified for the example
     entries = re.findall(r'<entry>(.*?)</entry>', content, re.DOTALL)
     
-    for entry in entries[:50000]:  # Limit for speed
-        # Extract kanji
-        kanji_match = re.findall(r'<keb>([^<]+)</keb>', entry)
-        # Extract readings
-        reading_match = re.findall(r'<reb>([^<]+)</reb>', entry)
-        # Extract meanings
-        meaning_match = re.findall(r'<gloss>([^<]+)</gloss>', entry)
-        
-        if kanji_match and reading_match:
-            for k in kanji_match:
-                if len(k) <= 4:  # Focus on short words/single chars
-                    data[k] = {
+    entries = entries[:50000]  # Limit for speed
+    with Progress("JMDict", total=len(entries), unit="entries") as progress:
+        for entry in entries:
+            progress.update()
+            # Extract kanji
+            kanji_match = re.findall(r'<keb>([^<]+)</keb>', entry)
+            # Extract readings
+            reading_match = re.findall(r'<reb>([^<]+)</reb>', entry)
+            # Extract meanings
+            meaning_match = re.findall(r'<gloss>([^<]+)</gloss>', entry)
+            
+            if kanji_match and reading_match:
+                # Every spelling shares one stored entry
+                try:
+                    builder.add(kanji_match, {
                         "readings": reading_match,
                         "meanings": meaning_match[:5]
-                    }
+                    })
+                except ValueError as e:
+                    progress.error(kanji_match[0], e)
     
+    data = builder.build()
     print(f"  Parsed {len(data)} entries from JMDict")
     return data
 
@@ -854,37 +906,56 @@ def parse_jmdict(filepath: Path) -> dict:
 def parse_cedict(filepath: Path) -> dict:
     """
     Parse CC-CEDICT for Chinese readings and meanings.
-    Returns dict mapping character -> Chinese data
+    Returns a mapping of headword -> Chinese data (a HeadwordStore, so
+    headwords of every length fit in memory)
     """
     print("  Parsing CC-CEDICT...")
     
-    data = {}
+    builder = HeadwordStoreBuilder(
+        ["traditional", "simplified", "pinyin", "meanings", "pinyin_numbered", "pinyin_toneless"],
+        list_fields=("meanings",))
+    # Numbered -> all three forms; readings repeat a lot, so convert each once
+    pinyin_memo = {}
     
     with zipfile.ZipFile(filepath, 'r') as zf:
-        for filename in zf.namelist():
-            if filename.endswith('.txt') or filename.endswith('.u8'):
+        filenames = [name for name in zf.namelist()
+                     if name.endswith('.txt') or name.endswith('.u8')]
+        total = sum(zf.getinfo(name).file_size for name in filenames)
+        with Progress("CC-CEDICT", total=total, unit="B") as progress:
+            for filename in filenames:
                 with zf.open(filename) as f:
-                    for line in f:
+                    for line_no, line in enumerate(f, start=1):
+                        progress.update(len(line))
                         line = line.decode('utf-8').strip()
                         if not line or line.startswith('#'):
                             continue
                         
                         # Format: traditional simplified [pinyin] /meaning1/meaning2/
                         match = re.match(r'^(\S+)\s+(\S+)\s+\[([^\]]+)\]\s+/(.+)/$', line)
-                        if match:
-                            trad, simp, pinyin, meanings = match.groups()
-                            meanings_list = [m.strip() for m in meanings.split('/') if m.strip()]
-                            
-                            # Store both traditional and simplified
-                            for char in [trad, simp]:
-                                if len(char) <= 4:
-                                    data[char] = {
-                                        "traditional": trad,
-                                        "simplified": simp,
-                                        "pinyin": pinyin,
-                                        "meanings": meanings_list[:5]
-                                    }
+                        if not match:
+                            progress.error(f"{filename}:{line_no}", "malformed line")
+                            continue
+                        trad, simp, pinyin, meanings = match.groups()
+                        meanings_list = [m.strip() for m in meanings.split('/') if m.strip()]
+                        
+                        forms = pinyin_memo.get(pinyin)
+                        if forms is None:
+                            forms = pinyin_memo[pinyin] = pinyin_forms(pinyin)
+                        
+                        # Store both traditional and simplified
+                        try:
+                            builder.add([trad, simp], {
+                                "traditional": trad,
+                                "simplified": simp,
+                                "pinyin": forms[0],
+                                "meanings": meanings_list[:5],
+                                "pinyin_numbered": forms[1],
+                                "pinyin_toneless": forms[2],
+                            })
+                        except ValueError as e:
+                            progress.error(f"{filename}:{line_no}", e)
     
+    data = builder.build()
     print(f"  Parsed {len(data)} entries from CC-CEDICT")
     return data
 
@@ -893,10 +964,17 @@ def parse_cedict(filepath: Path) -> dict:
 # Data Compilation
 # =============================================================================
 
-def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
+def compile_characters(unihan: dict, jmdict: dict, cedict: dict,
+                       homophones: Optional[HomophoneCollector] = None,
+                       stats: Optional[StatsCollector] = None,
+                       clusters: Optional[VariantClusters] = None) -> list:
     """
     Merge all sources into unified character entries.
     Prioritize characters that exist in both Japanese and Chinese.
+    If a HomophoneCollector or StatsCollector is given, every kept entry is
+    added to it. With variant clusters, Japanese spellings that CEDICT only
+    has in another script (広 -> 广) take that entry's Chinese data, and
+    every entry gets its "variant_cluster" join key.
     """
     print("  Compiling unified character database...")
     
@@ -908,9 +986,32 @@ def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
     common_chars = jp_chars & cn_chars
     print(f"  Found {len(common_chars)} characters in both languages")
     
+    # Japanese-only spellings -> a CEDICT headword in the same variant cluster
+    cn_variants = {}
+    if clusters is not None:
+        cn_by_key = defaultdict(list)
+        for word in sorted(cn_chars):
+            cn_by_key[clusters.key(word)].append(word)
+        for char in jp_chars - cn_chars:
+            for word in cn_by_key.get(clusters.key(char), ()):
+                if clusters.same_word(char, word):
+                    cn_variants[char] = word
+                    break
+        common_chars |= cn_variants.keys()
+        print(f"  Joined {len(cn_variants)} more through variant clusters")
+    
+    # Unihan kMandarin readings converted once for every character
+    unihan_readings = sorted({
+        r for char in common_chars
+        for r in unihan.get(char, {}).get("pinyin", "").split()
+    })
+    _, numbered, toneless = normalize_column(unihan_readings)
+    reading_forms = {r: (n, t) for r, n, t in zip(unihan_readings, numbered, toneless)}
+    
     characters = []
     
-    for char in common_chars:
+    # Sorted so output order (and shard contents) is stable between runs
+    for char in sorted(common_chars):
         entry = {
             "character": char,
             "japanese": None,
@@ -919,6 +1020,8 @@ def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
             "radical": None,
             "frequency_rank": None,
         }
+        if clusters is not None:
+            entry["variant_cluster"] = clusters.key(char)
         
         # Unihan data
         if char in unihan:
@@ -937,8 +1040,11 @@ def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
             
             # Chinese from Unihan
             if u.get("pinyin"):
+                readings = u.get("pinyin", "").split()
                 entry["chinese"] = {
-                    "pinyin": u.get("pinyin", "").split(),
+                    "pinyin": readings,
+                    "pinyin_numbered": [reading_forms[r][0] for r in readings],
+                    "pinyin_toneless": [reading_forms[r][1] for r in readings],
                     "simplified": u.get("simplified"),
                     "traditional": u.get("traditional"),
                     "meanings": [],
@@ -952,11 +1058,14 @@ def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
             entry["japanese"]["meanings"] = j.get("meanings", [])[:5]
         
         # Enhance with CEDICT
-        if char in cedict:
-            c = cedict[char]
+        cn_word = cn_variants.get(char, char)
+        if cn_word in cedict:
+            c = cedict[cn_word]
             if entry["chinese"] is None:
                 entry["chinese"] = {"pinyin": [], "meanings": []}
             entry["chinese"]["pinyin"] = [c.get("pinyin", "")]
+            entry["chinese"]["pinyin_numbered"] = [c.get("pinyin_numbered", "")]
+            entry["chinese"]["pinyin_toneless"] = [c.get("pinyin_toneless", "")]
             entry["chinese"]["simplified"] = c.get("simplified")
             entry["chinese"]["traditional"] = c.get("traditional")
             entry["chinese"]["meanings"] = c.get("meanings", [])[:5]
@@ -964,28 +1073,268 @@ def compile_characters(unihan: dict, jmdict: dict, cedict: dict) -> list:
         # Only include if we have data for both languages
         if entry["japanese"] and entry["chinese"]:
             characters.append(entry)
+            if homophones is not None:
+                homophones.add(entry)
+            if stats is not None:
+                stats.add_character(entry)
     
     print(f"  Compiled {len(characters)} dual-language characters")
     return characters
 
 
-def add_false_friend_links(characters: list, false_friends: list) -> list:
-    """Add false friend IDs to character entries."""
+def add_false_friend_links(characters: list, false_friends: list,
+                           clusters: Optional[VariantClusters] = None) -> list:
+    """
+    Add false friend IDs to character entries.
+    With variant clusters, entries spelled in another script (學 for 学)
+    are linked too, through their variant_cluster key.
+    """
     ff_lookup = {ff["characters"]: ff["id"] for ff in false_friends}
+    cluster_lookup = defaultdict(list)
+    if clusters is not None:
+        for ff in false_friends:
+            cluster_lookup[clusters.key(ff["characters"])].append(ff)
     
     for char in characters:
         # Check single character
         if char["character"] in ff_lookup:
             char["false_friend_id"] = ff_lookup[char["character"]]
+        elif cluster_lookup:
+            key = char.get("variant_cluster") or clusters.key(char["character"])
+            # A shared key only links real variant spellings of the headword
+            for ff in cluster_lookup.get(key, ()):
+                if clusters.same_word(char["character"], ff["characters"]):
+                    char["false_friend_id"] = ff["id"]
+                    break
     
     return characters
 
 
+# Combined radical+residual keys are radical * RS_KEY_BASE + residual strokes,
+# so all characters under one radical form a contiguous key range.
+RS_KEY_BASE = 256
+
+
+def parse_rs_unicode(value: str) -> list:
+    """Parse kRSUnicode ("85.5 85'.5") into [(radical, residual_strokes)]."""
+    result = []
+    for part in (value or "").split():
+        radical, _, residual = part.partition(".")
+        radical = radical.rstrip("'")
+        if radical.isdigit() and residual.lstrip("-").isdigit():
+            result.append((int(radical), max(int(residual), 0)))
+    return result
+
+
+def build_radical_stroke_indexes(characters: list) -> dict:
+    """
+    Build radical / stroke-count inverted indexes over single characters.
+
+    Character IDs are Unicode code points, sorted ascending in every
+    posting list so lists can be intersected with a linear merge.
+    """
+    by_radical = defaultdict(set)
+    by_strokes = defaultdict(set)
+    by_radical_residual = defaultdict(set)
+
+    for entry in characters:
+        char = entry["character"]
+        if len(char) != 1:
+            continue
+        cp = ord(char)
+        for radical, residual in parse_rs_unicode(entry.get("radical")):
+            by_radical[radical].add(cp)
+            by_radical_residual[radical * RS_KEY_BASE + residual].add(cp)
+        if entry.get("stroke_count"):
+            by_strokes[entry["stroke_count"]].add(cp)
+
+    return {
+        name: {key: sorted(ids) for key, ids in mapping.items()}
+        for name, mapping in (
+            ("radical", by_radical),
+            ("strokes", by_strokes),
+            ("radical_residual", by_radical_residual),
+        )
+    }
+
+
+def character_reading_entries(characters: list, jmdict: dict):
+    """Yield (character, raw reading fields) pairs for the reading index."""
+    for char in characters:
+        readings = []
+        if char.get("japanese"):
+            readings += char["japanese"].get("onyomi", []) + char["japanese"].get("kunyomi", [])
+        if char["character"] in jmdict:
+            readings += jmdict[char["character"]].get("readings", [])
+        yield char["character"], readings
+
+
+def false_friend_reading_entries(false_friends: list):
+    """Yield (false friend ID, [jp_reading]) pairs for the reading index."""
+    for ff in false_friends:
+        yield ff["id"], [ff.get("jp_reading", "")]
+
+
+# =============================================================================
+# Sharded Output
+# =============================================================================
+
+# Stroke-count buckets for the long-tail shards (inclusive ranges)
+STROKE_BUCKETS = [(1, 5), (6, 10), (11, 15), (16, 20), (21, 99)]
+
+# Upper bound on entries per shard so no single file dominates a download
+MAX_SHARD_SIZE = 2000
+
+
+def _stroke_bucket(stroke_count: Optional[int]) -> Optional[tuple]:
+    if not stroke_count:
+        return None
+    for low, high in STROKE_BUCKETS:
+        if low <= stroke_count <= high:
+            return (low, high)
+    return STROKE_BUCKETS[-1]
+
+
+def build_character_shards(characters: list, common_size: int = JOYO_KANJI_COUNT,
+                           max_shard_size: int = MAX_SHARD_SIZE) -> list:
+    """
+    Split compiled characters into load-priority tiers.
+
+    Tier 0 ("common") holds the first `common_size` entries by commonness
+    (roughly the Jōyō set) plus every entry linked to a false friend. The
+    long tail is grouped by frequency_rank, then by stroke-count bucket.
+    Returns a list of (shard_info, entries) tuples in priority order.
+    """
+    ordered = sorted(characters, key=commonness_key)
+
+    common = []
+    rest = []
+    for entry in ordered:
+        if len(common) < common_size or entry.get("false_friend_id"):
+            common.append(entry)
+        else:
+            rest.append(entry)
+
+    groups = defaultdict(list)
+    for entry in rest:
+        groups[(entry.get("frequency_rank"), _stroke_bucket(entry.get("stroke_count")))].append(entry)
+
+    shards = [({"name": "common", "tier": 0}, common)]
+
+    def group_order(key):
+        rank, bucket = key
+        return (rank is None, rank or 0, bucket is None, bucket or (0, 0))
+
+    for rank, bucket in sorted(groups, key=group_order):
+        entries = groups[(rank, bucket)]
+        rank_part = f"freq{rank}" if rank is not None else "unranked"
+        stroke_part = f"strokes{bucket[0]:02d}-{bucket[1]:02d}" if bucket else "strokes_unknown"
+        parts = [entries[i:i + max_shard_size] for i in range(0, len(entries), max_shard_size)]
+        for part_num, part in enumerate(parts, start=1):
+            name = f"{rank_part}_{stroke_part}"
+            if len(parts) > 1:
+                name += f"_part{part_num}"
+            shards.append(({
+                "name": name,
+                "tier": 1 if rank is not None else 2,
+                "frequency_rank": rank,
+                "stroke_range": list(bucket) if bucket else None,
+            }, part))
+
+    return shards
+
+
+def write_character_shards(characters: list, output_dir: Path) -> dict:
+    """
+    Write tiered character shards plus characters_manifest.json.
+
+    Each shard is a standalone JSON array with the same schema as
+    characters.json, so the app can decode any shard on its own. Shard
+    files from an earlier build that are not in the new manifest are removed.
+    """
+    shard_dir = output_dir / "characters"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    stale = set(shard_dir.glob("characters_*.json"))
+
+    manifest = {
+        "version": 1,
+        "total_characters": len(characters),
+        "shards": [],
+    }
+
+    for priority, (info, entries) in enumerate(build_character_shards(characters)):
+        filename = f"characters_{priority:02d}_{info['name']}.json"
+        with open(shard_dir / filename, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=2)
+        stale.discard(shard_dir / filename)
+        manifest["shards"].append({
+            **info,
+            "file": f"characters/{filename}",
+            "priority": priority,
+            "count": len(entries),
+        })
+
+    with open(output_dir / "characters_manifest.json", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    for path in stale:
+        path.unlink()
+
+    print(f"  Wrote {len(manifest['shards'])} character shards + characters_manifest.json")
+    return manifest
+
+
+# =============================================================================
+# Output Writers
+# =============================================================================
+
+def write_characters(characters: list, false_friends: list, shards=False, binary=False):
+    """Write characters.json plus the optional shard and binary variants."""
+    with open(OUTPUT_DIR / "characters.json", "w", encoding="utf-8") as f:
+        json.dump(characters, f, ensure_ascii=False, indent=2)
+    print(f"  Wrote {len(characters)} characters to characters.json")
+
+    # Tiered shards for lazy loading in the app
+    if shards:
+        write_character_shards(characters, OUTPUT_DIR)
+
+    # Memory-mappable binary copy of both tables
+    if binary:
+        from binary_store import write_store
+        write_store(OUTPUT_DIR / "yomikae.bin",
+                    {"characters": characters, "false_friends": false_friends})
+        print(f"  Wrote yomikae.bin")
+
+
+def write_false_friends(false_friends: list):
+    with open(OUTPUT_DIR / "false_friends.json", "w", encoding="utf-8") as f:
+        json.dump(false_friends, f, ensure_ascii=False, indent=2)
+    print(f"  Wrote {len(false_friends)} false friends to false_friends.json")
+
+
+def write_lookup_indexes(characters: list, reading_entries: list):
+    """Write reading_index.json and radical_stroke.idx."""
+    # Kana/romaji reading index (characters by character, false friends by ID)
+    write_reading_index(build_reading_index(reading_entries), OUTPUT_DIR / "reading_index.json")
+
+    # Radical / stroke-count inverted indexes (IDs are code points)
+    write_indexes(OUTPUT_DIR / "radical_stroke.idx",
+                  build_radical_stroke_indexes(characters),
+                  {"id": "codepoint", "radical_residual_key_base": RS_KEY_BASE})
+    print(f"  Wrote radical_stroke.idx")
+
+
+def write_stats(stats: StatsCollector, source_counts: dict):
+    """Write stats.json from a collector fed by compile_false_friends / compile_characters."""
+    with open(OUTPUT_DIR / "stats.json", "w", encoding="utf-8") as f:
+        json.dump(stats.stats_document(source_counts), f, indent=2)
+    print(f"  Wrote stats.json")
+
+
 # =============================================================================
 # Main Pipeline
 # =============================================================================
 
-def run_pipeline(download=False, process=True):
+def run_pipeline(download=False, process=True, shards=False, binary=False):
     """Run the full data pipeline."""
     
     print("\n" + "="*60)
@@ -1009,50 +1358,42 @@ def run_pipeline(download=False, process=True):
         jmdict = parse_jmdict(jmdict_path) if jmdict_path.exists() else {}
         cedict = parse_cedict(cedict_path) if cedict_path.exists() else {}
         
+        # Variant equivalence classes, the join key across scripts
+        variant_clusters = build_variant_clusters(unihan)
+        clusters = VariantClusters(variant_clusters)
+        
+        # Filled as entries are compiled; written as stats.json at the end
+        stats = StatsCollector()
+        
         print("\nSTEP 3: Compiling false friends...")
-        false_friends = compile_false_friends()
+        false_friends = compile_false_friends(stats)
         print(f"  Compiled {len(false_friends)} false friend entries")
         
         print("\nSTEP 4: Compiling character database...")
-        characters = compile_characters(unihan, jmdict, cedict)
-        characters = add_false_friend_links(characters, false_friends)
+        homophones = HomophoneCollector()
+        characters = compile_characters(unihan, jmdict, cedict, homophones, stats, clusters)
+        characters = add_false_friend_links(characters, false_friends, clusters)
         
         print("\nSTEP 5: Writing output...")
         OUTPUT_DIR.mkdir(exist_ok=True)
         
-        # Write characters
-        with open(OUTPUT_DIR / "characters.json", "w", encoding="utf-8") as f:
-            json.dump(characters, f, ensure_ascii=False, indent=2)
-        print(f"  Wrote {len(characters)} characters to characters.json")
-        
-        # Write false friends
-        with open(OUTPUT_DIR / "false_friends.json", "w", encoding="utf-8") as f:
-            json.dump(false_friends, f, ensure_ascii=False, indent=2)
-        print(f"  Wrote {len(false_friends)} false friends to false_friends.json")
-        
-        # Write stats
-        stats = {
-            "total_characters": len(characters),
-            "total_false_friends": len(false_friends),
-            "false_friends_by_type": {
-                "type_4_critical": len([f for f in false_friends if f.get("type") == 4]),
-                "type_3_partial": len([f for f in false_friends if f.get("type") == 3]),
-                "type_1_2_expanded": len([f for f in false_friends if f.get("type") in [1, 2]]),
-            },
-            "false_friends_by_severity": {
-                "critical": len([f for f in false_friends if f.get("severity") == "critical"]),
-                "important": len([f for f in false_friends if f.get("severity") == "important"]),
-                "subtle": len([f for f in false_friends if f.get("severity") == "subtle"]),
-            },
-            "sources_used": {
-                "unihan": len(unihan),
-                "jmdict": len(jmdict),
-                "cedict": len(cedict),
-            }
-        }
-        with open(OUTPUT_DIR / "stats.json", "w", encoding="utf-8") as f:
-            json.dump(stats, f, indent=2)
-        print(f"  Wrote stats.json")
+        write_characters(characters, false_friends, shards=shards, binary=binary)
+        write_false_friends(false_friends)
+        write_lookup_indexes(
+            characters,
+            list(character_reading_entries(characters, jmdict))
+            + list(false_friend_reading_entries(false_friends)))
+        write_autocomplete(characters, character_reading_entries(characters, jmdict),
+                           OUTPUT_DIR / "autocomplete.idx")
+        write_homophones(homophones.build(), OUTPUT_DIR / "homophones.idx")
+        write_correspondences(characters, OUTPUT_DIR / "reading_correspondences.json")
+        write_variants(build_variant_tables(unihan, jmdict, cedict))
+        write_variant_clusters(variant_clusters)
+        write_stats(stats, {
+            "unihan": len(unihan),
+            "jmdict": len(jmdict),
+            "cedict": len(cedict),
+        })
         
         print("\n" + "="*60)
         print("PIPELINE COMPLETE")
@@ -1061,6 +1402,17 @@ def run_pipeline(download=False, process=True):
         print(f"  - characters.json ({len(characters)} entries)")
         print(f"  - false_friends.json ({len(false_friends)} entries)")
         print(f"  - stats.json")
+        print(f"  - reading_index.json")
+        print(f"  - radical_stroke.idx")
+        print(f"  - autocomplete.idx")
+        print(f"  - homophones.idx")
+        print(f"  - reading_correspondences.json")
+        print(f"  - variants.json")
+        print(f"  - variant_clusters.json")
+        if shards:
+            print(f"  - characters_manifest.json + characters/ shards")
+        if binary:
+            print(f"  - yomikae.bin")
         
 
 if __name__ == "__main__":
@@ -1070,8 +1422,13 @@ if __name__ == "__main__":
     parser.add_argument("--process", action="store_true", help="Process into app format")
     parser.add_argument("--all", action="store_true", help="Download and process")
     parser.add_argument("--ff-only", action="store_true", help="Only compile false friends (no external sources)")
+    parser.add_argument("--shards", action="store_true", help="Also write tiered character shards + manifest")
+    parser.add_argument("--binary", action="store_true", help="Also write the memory-mappable yomikae.bin store")
+    parser.add_argument("--progress", choices=MODES, help="Progress display (default: bar on a terminal, else log lines)")
     
     args = parser.parse_args()
+    if args.progress:
+        set_mode(args.progress)
     
     if args.ff_only:
         # Quick mode: just output false friends
@@ -1081,11 +1438,11 @@ if __name__ == "__main__":
             json.dump(false_friends, f, ensure_ascii=False, indent=2)
         print(f"Wrote {len(false_friends)} false friends to {OUTPUT_DIR}/false_friends.json")
     elif args.all:
-        run_pipeline(download=True, process=True)
+        run_pipeline(download=True, process=True, shards=args.shards, binary=args.binary)
     elif args.download:
         run_pipeline(download=True, process=False)
     elif args.process:
-        run_pipeline(download=False, process=True)
+        run_pipeline(download=False, process=True, shards=args.shards, binary=args.binary)
     else:
         # Default: just process (assume sources exist or will be partial)
-        run_pipeline(download=False, process=True)
+        run_pipeline(download=False, process=True, shards=args.shards, binary=args.binary)
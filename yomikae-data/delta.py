@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Delta Packages Between Builds
+
+Builds entry-level delta packages between two builds of the app data, so a
+data refresh ships only the records that changed instead of every JSON
+file. Records are keyed by a stable ID per artifact (the headword, not the
+positional jckv_NNNN ID), and each artifact delta lists removed keys,
+updated records, added records with their position, and the new order
+only when it cannot be inferred.
+
+apply_delta() turns build N plus a delta into build N+1 byte-identically:
+every artifact is re-serialized with the format detected when the delta
+was made and checked against the target SHA-256. Artifacts whose bytes
+cannot be reproduced from records (unknown formatting, duplicate keys) are
+shipped whole inside the package instead.
+
+Package layout: gzip-compressed JSON
+    {"format": "yomikae-delta", "format_version": 1,
+     "from_build": ..., "to_build": ..., "artifacts": {file name: delta}}
+
+Usage:
+    python delta.py release                       # snapshot output/, delta from last release
+    python delta.py diff OLD_DIR NEW_DIR -o update.ydelta
+    python delta.py apply BASE_DIR update.ydelta -o NEW_DIR
+    python delta.py info update.ydelta
+
+Output:
+    releases/<build>/...                     snapshots of the shipped artifacts
+    releases/deltas/<from>_<to>.ydelta       one package per consecutive pair
+    releases/index.json                      release order
+"""
+
+import gzip
+import hashlib
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+OUTPUT_DIR = Path("output")
+RELEASES_DIR = Path("releases")
+DELTAS_DIR = RELEASES_DIR / "deltas"
+RELEASE_INDEX = RELEASES_DIR / "index.json"
+
+FORMAT = "yomikae-delta"
+FORMAT_VERSION = 1
+
+# Shipped artifacts -> stable record key
+ARTIFACTS = {
+    "characters.json": "character",
+    "false_friends.json": "id",
+    "false_friends_merged.json": "characters",
+    "false_friends_expanded.json": "characters",
+}
+
+# json.dumps settings the pipeline writers use, tried in order
+SERIALIZATIONS = [
+    {"indent": 2},
+    {"indent": None, "separators": (",", ":")},
+    {"indent": None},
+]
+
+
+# =============================================================================
+# Helpers
+# =============================================================================
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_id(hashes: Dict[str, str]) -> str:
+    """Short content-derived build ID over every artifact's hash."""
+    h = hashlib.sha256()
+    for name in sorted(hashes):
+        h.update(f"{name}={hashes[name]}\n".encode())
+    return h.hexdigest()[:12]
+
+
+def artifact_hashes(directory: Path) -> Dict[str, str]:
+    return {name: sha256((directory / name).read_bytes())
+            for name in ARTIFACTS if (directory / name).exists()}
+
+
+def _serialize(document, serialization: dict) -> bytes:
+    kwargs = dict(serialization)
+    if kwargs.get("separators"):
+        kwargs["separators"] = tuple(kwargs["separators"])
+    return json.dumps(document, ensure_ascii=False, **kwargs).encode("utf-8")
+
+
+def _detect_serialization(document, data: bytes) -> Optional[dict]:
+    for serialization in SERIALIZATIONS:
+        if _serialize(document, serialization) == data:
+            return serialization
+    return None
+
+
+def _split_document(document):
+    """Return (records, list_field) for a bare list or a {"metadata", list} wrapper."""
+    if isinstance(document, list):
+        return document, None
+    if isinstance(document, dict):
+        fields = [k for k, v in document.items() if isinstance(v, list)]
+        if len(fields) == 1:
+            return document[fields[0]], fields[0]
+    return None, None
+
+
+def _keys(records: list, key: str) -> Optional[List[str]]:
+    """Record keys, or None if any record lacks a key or keys repeat."""
+    keys = []
+    for record in records:
+        if not isinstance(record, dict) or key not in record:
+            return None
+        keys.append(record[key])
+    return keys if len(set(keys)) == len(keys) else None
+
+
+def _record_json(record) -> str:
+    # Not ==: that ignores key order and equates 1, 1.0 and True, all of
+    # which change the serialized bytes
+    return json.dumps(record, ensure_ascii=False)
+
+
+# =============================================================================
+# Diff
+# =============================================================================
+
+def diff_artifact(old_data: Optional[bytes], new_data: Optional[bytes], key: str) -> dict:
+    """Delta for one artifact file (None = file absent in that build)."""
+    if new_data is None:
+        return {"mode": "delete"}
+    target = {"to_sha256": sha256(new_data)}
+    replace = {"mode": "replace", **target, "content": new_data.decode("utf-8")}
+    if old_data is None:
+        return replace
+
+    old_doc = json.loads(old_data)
+    new_doc = json.loads(new_data)
+    serialization = _detect_serialization(new_doc, new_data)
+    old_records, old_field = _split_document(old_doc)
+    new_records, new_field = _split_document(new_doc)
+    old_keys = _keys(old_records, key) if old_records is not None else None
+    new_keys = _keys(new_records, key) if new_records is not None else None
+    if serialization is None or old_field != new_field or old_keys is None or new_keys is None:
+        return replace
+
+    old_by_key = dict(zip(old_keys, old_records))
+    new_key_set = set(new_keys)
+    removed = [k for k in old_keys if k not in new_key_set]
+    updated = []
+    added = []
+    for position, (k, record) in enumerate(zip(new_keys, new_records)):
+        if k not in old_by_key:
+            added.append([position, record])
+        elif _record_json(old_by_key[k]) != _record_json(record):
+            updated.append(record)
+
+    delta = {
+        "mode": "records",
+        "from_sha256": sha256(old_data),
+        **target,
+        "key": key,
+        "serialization": serialization,
+        "removed": removed,
+        "updated": updated,
+        "added": added,
+        "order": None,
+    }
+    if new_field is not None:
+        delta["list_field"] = new_field
+        delta["document"] = {k: v for k, v in new_doc.items() if k != new_field}
+        delta["field_order"] = list(new_doc)
+
+    # Ship the full key order only if replaying the edit does not reproduce it
+    if _apply_records(old_records, delta, key) != new_records:
+        delta["order"] = new_keys
+    return delta
+
+
+def make_delta(old_dir: Path, new_dir: Path) -> dict:
+    """Delta package between two build directories."""
+    old_hashes = artifact_hashes(old_dir)
+    new_hashes = artifact_hashes(new_dir)
+    artifacts = {}
+    for name, key in ARTIFACTS.items():
+        if old_hashes.get(name) == new_hashes.get(name):
+            continue
+        old_path, new_path = old_dir / name, new_dir / name
+        artifacts[name] = diff_artifact(
+            old_path.read_bytes() if old_path.exists() else None,
+            new_path.read_bytes() if new_path.exists() else None,
+            key)
+    return {
+        "format": FORMAT,
+        "format_version": FORMAT_VERSION,
+        "from_build": build_id(old_hashes),
+        "to_build": build_id(new_hashes),
+        "artifacts": artifacts,
+    }
+
+
+def write_delta(package: dict, path: Path):
+    body = json.dumps(package, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # mtime=0 keeps the package itself reproducible
+    with open(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0,
+                                                compresslevel=9) as f:
+        f.write(body)
+
+
+def read_delta(path: Path) -> dict:
+    with gzip.open(path, "rb") as f:
+        package = json.loads(f.read())
+    if package.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a Yomikae delta package")
+    if package.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported delta version {package.get('format_version')} "
+                         f"(expected {FORMAT_VERSION})")
+    return package
+
+
+# =============================================================================
+# Apply
+# =============================================================================
+
+def _apply_records(old_records: list, delta: dict, key: str) -> list:
+    removed = set(delta["removed"])
+    updated = {r[key]: r for r in delta["updated"]}
+    records = [updated.get(r[key], r) for r in old_records if r[key] not in removed]
+    for position, record in delta["added"]:
+        records.insert(position, record)
+    if delta["order"] is not None:
+        by_key = {r[key]: r for r in records}
+        records = [by_key[k] for k in delta["order"]]
+    return records
+
+
+def apply_artifact(old_data: Optional[bytes], delta: dict) -> Optional[bytes]:
+    """New artifact bytes (None = delete). Raises ValueError on a base or result mismatch."""
+    mode = delta["mode"]
+    if mode == "delete":
+        return None
+    if mode == "replace":
+        data = delta["content"].encode("utf-8")
+    else:
+        if old_data is None or sha256(old_data) != delta["from_sha256"]:
+            raise ValueError("base file does not match the build this delta was made from")
+        old_records, _ = _split_document(json.loads(old_data))
+        records = _apply_records(old_records, delta, delta["key"])
+        if "list_field" in delta:
+            document = {k: records if k == delta["list_field"] else delta["document"][k]
+                        for k in delta["field_order"]}
+        else:
+            document = records
+        data = _serialize(document, delta["serialization"])
+    if sha256(data) != delta["to_sha256"]:
+        raise ValueError("result does not match the target build")
+    return data
+
+
+def apply_delta(base_dir: Path, package: dict, output_dir: Path):
+    """Write build N+1 to output_dir from build N in base_dir plus a delta package."""
+    if build_id(artifact_hashes(base_dir)) != package["from_build"]:
+        raise ValueError(f"{base_dir} is not build {package['from_build']}")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in ARTIFACTS:
+        base_path = base_dir / name
+        old_data = base_path.read_bytes() if base_path.exists() else None
+        if name in package["artifacts"]:
+            try:
+                data = apply_artifact(old_data, package["artifacts"][name])
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}") from None
+        else:
+            data = old_data
+        target = output_dir / name
+        if data is None:
+            target.unlink(missing_ok=True)
+        else:
+            target.write_bytes(data)
+
+
+# =============================================================================
+# Releases
+# =============================================================================
+
+def _load_release_index() -> list:
+    if RELEASE_INDEX.exists():
+        with open(RELEASE_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)["releases"]
+    return []
+
+
+def release(output_dir: Path = OUTPUT_DIR) -> Optional[Path]:
+    """
+    Snapshot the shipped artifacts in output_dir as a new release and write
+    the delta from the previous release. Returns the delta path, if any.
+    """
+    hashes = artifact_hashes(output_dir)
+    if not hashes:
+        print(f"No artifacts found in {output_dir}")
+        return None
+    new_build = build_id(hashes)
+    releases = _load_release_index()
+    if releases and releases[-1] == new_build:
+        print(f"Build {new_build} is already the latest release")
+        return None
+
+    release_dir = RELEASES_DIR / new_build
+    release_dir.mkdir(parents=True, exist_ok=True)
+    for name in hashes:
+        shutil.copy2(output_dir / name, release_dir / name)
+
+    delta_path = None
+    if releases:
+        previous = releases[-1]
+        package = make_delta(RELEASES_DIR / previous, release_dir)
+        delta_path = DELTAS_DIR / f"{previous}_{new_build}.ydelta"
+        write_delta(package, delta_path)
+
+        # Never publish a delta that does not reproduce the release
+        check_dir = RELEASES_DIR / ".verify"
+        shutil.rmtree(check_dir, ignore_errors=True)
+        apply_delta(RELEASES_DIR / previous, read_delta(delta_path), check_dir)
+        shutil.rmtree(check_dir)
+        print(f"  Wrote {delta_path} ({delta_path.stat().st_size / 1024:.1f} KB)")
+
+    releases.append(new_build)
+    with open(RELEASE_INDEX, "w", encoding="utf-8") as f:
+        json.dump({"version": FORMAT_VERSION, "releases": releases}, f, indent=2)
+    print(f"  Released build {new_build}")
+    return delta_path
+
+
+def print_summary(package: dict, path: Optional[Path] = None):
+    print(f"Delta {package['from_build']} -> {package['to_build']}"
+          + (f" ({path.stat().st_size / 1024:.1f} KB)" if path else ""))
+    for name, delta in package["artifacts"].items():
+        if delta["mode"] == "records":
+            print(f"  {name}: +{len(delta['added'])} ~{len(delta['updated'])} "
+                  f"-{len(delta['removed'])}{' (reordered)' if delta['order'] else ''}")
+        else:
+            print(f"  {name}: {delta['mode']}")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and apply data delta packages")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("release", help="Snapshot output/ and write the delta from the last release")
+    p.add_argument("--output-dir", type=str, default=str(OUTPUT_DIR))
+
+    p = sub.add_parser("diff", help="Delta between two build directories")
+    p.add_argument("old_dir")
+    p.add_argument("new_dir")
+    p.add_argument("-o", "--output", required=True, help="Delta package path")
+
+    p = sub.add_parser("apply", help="Apply a delta to a build directory")
+    p.add_argument("base_dir")
+    p.add_argument("delta")
+    p.add_argument("-o", "--output", required=True, help="Directory for the new build")
+
+    p = sub.add_parser("info", help="Summarize a delta package")
+    p.add_argument("delta")
+
+    args = parser.parse_args()
+
+    if args.command == "release":
+        release(Path(args.output_dir))
+    elif args.command == "diff":
+        package = make_delta(Path(args.old_dir), Path(args.new_dir))
+        write_delta(package, Path(args.output))
+        print_summary(package, Path(args.output))
+    elif args.command == "apply":
+        package = read_delta(Path(args.delta))
+        apply_delta(Path(args.base_dir), package, Path(args.output))
+        print(f"Applied {package['from_build']} -> {package['to_build']} into {args.output}")
+    elif args.command == "info":
+        print_summary(read_delta(Path(args.delta)), Path(args.delta))
+
+
+if __name__ == "__main__":
+    main()
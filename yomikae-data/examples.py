@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Example Sentence Mining
+
+Finds example sentences for false friends in a local Tatoeba-style corpus:
+    sources/sentences.csv   id <TAB> lang <TAB> text   (jpn, cmn, eng, ...)
+    sources/links.csv       id <TAB> translation id    (optional)
+Both may also be .gz / .bz2 compressed.
+
+The corpus is streamed in chunks scanned by worker processes. Each worker
+matches every headword at once with an Aho-Corasick automaton (Chinese
+sentences and headwords are variant-folded first when output/variants.json
+exists). Memory stays bounded regardless of corpus size:
+    - posting lists are compact u32 arrays, capped per headword
+    - only the K shortest candidate sentences per headword and language are
+      kept, not the matched text
+    - English sentences are remembered as a bitmap of IDs
+A second pass over links.csv and a third over the English sentences attach
+translations to just the chosen candidates.
+
+The example per headword and language is the shortest sentence that passes
+the quality filter, preferring one with an English translation.
+Single-character headwords only count where the character is a word of its
+own: in Japanese when no Han ideograph sits on either side (天が matches,
+天気 does not), in Chinese when CEDICT longest-match segmentation leaves it
+as its own token (我每天都在 is 我/每天/都/在, so 天 does not match). Without
+a CEDICT word list, Chinese single characters match anywhere.
+
+Usage:
+    python examples.py                      # mine for output/false_friends_expanded.json
+    python examples.py --sentences sources/sentences.csv --jobs 8
+    python examples.py --cedict sources/cedict_1_0_ts_utf-8_mdbg.zip
+
+Output:
+    output/examples.json   - headword -> {"jpn": {...}, "cmn": {...}}
+    output/examples.idx    - headword -> sentence IDs per language (see indexes.py)
+"""
+
+import bz2
+import gzip
+import heapq
+import json
+import os
+import re
+import zipfile
+from array import array
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from indexes import write_indexes
+from variants import VARIANTS_PATH, VariantTables
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+SOURCES_DIR = Path("sources")
+OUTPUT_DIR = Path("output")
+SENTENCE_PATHS = [SOURCES_DIR / name for name in
+                  ("sentences.csv", "sentences.tsv", "sentences.csv.bz2", "sentences.csv.gz")]
+LINK_PATHS = [SOURCES_DIR / name for name in ("links.csv", "links.csv.bz2", "links.csv.gz")]
+EXAMPLES_PATH = OUTPUT_DIR / "examples.json"
+EXAMPLE_INDEX_PATH = OUTPUT_DIR / "examples.idx"
+CEDICT_PATH = SOURCES_DIR / "cedict_1_0_ts_utf-8_mdbg.zip"
+
+LANGUAGES = ["jpn", "cmn"]
+TRANSLATION_LANGUAGE = "eng"
+
+CHUNK_LINES = 20000
+CANDIDATES_PER_KEY = 5        # shortest sentences kept per (headword, language)
+MAX_POSTINGS = 2000           # sentence IDs kept per headword and language
+
+MIN_LENGTH = 4
+MAX_LENGTH = 40
+SENTENCE_END = "。！？!?．.」』"
+_LATIN_OR_DIGIT_RE = re.compile(r"[A-Za-z0-9Ａ-Ｚａ-ｚ０-９]")
+_HAN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\U00020000-\U0003134f々〆]")
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix == ".bz2":
+        return bz2.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _first_existing(paths: List[Path]) -> Optional[Path]:
+    return next((p for p in paths if p.exists()), None)
+
+
+# =============================================================================
+# Aho-Corasick Matcher
+# =============================================================================
+
+class MultiPatternMatcher:
+    """All occurrences of many patterns in one left-to-right pass (Aho-Corasick)."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for index, pattern in enumerate(patterns):
+            if pattern:
+                self._add(pattern, index)
+        self._link()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(index)
+
+    def _link(self):
+        queue = list(self.goto[0].values())
+        for node in queue:  # breadth-first; the list grows while iterating
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(ch, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    def find(self, text: str) -> set:
+        """Indices of every pattern that occurs in text."""
+        goto, fail, out = self.goto, self.fail, self.out
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+# =============================================================================
+# Corpus Scan (worker side)
+# =============================================================================
+
+def is_good_sentence(text: str) -> bool:
+    return (MIN_LENGTH <= len(text) <= MAX_LENGTH
+            and text[-1] in SENTENCE_END
+            and not _LATIN_OR_DIGIT_RE.search(text))
+
+
+_worker = {}
+
+
+def _init_worker(patterns: Dict[str, List[str]], fold_table: Optional[dict],
+                 words: Optional[frozenset] = None):
+    _worker["matchers"] = {lang: MultiPatternMatcher(p) for lang, p in patterns.items()}
+    _worker["singles"] = {lang: {i: p for i, p in enumerate(ps) if len(p) == 1}
+                          for lang, ps in patterns.items()}
+    _worker["fold"] = fold_table
+    _worker["words"] = words
+    _worker["max_word"] = max(map(len, words), default=0) if words else 0
+
+
+def _stands_alone(text: str, ch: str) -> bool:
+    """True if `ch` occurs in Japanese text with no Han ideograph directly beside it."""
+    start = text.find(ch)
+    while start >= 0:
+        before = text[start - 1] if start else ""
+        after = text[start + 1:start + 2]
+        if not _HAN_RE.match(before) and not _HAN_RE.match(after):
+            return True
+        start = text.find(ch, start + 1)
+    return False
+
+
+def _is_token(text: str, ch: str, words: frozenset, max_word: int) -> bool:
+    """True if forward longest-match over `words` leaves `ch` as a token of its own."""
+    i = 0
+    while i < len(text):
+        step = 1
+        for length in range(min(max_word, len(text) - i), 1, -1):
+            if text[i:i + length] in words:
+                step = length
+                break
+        if step == 1 and text[i] == ch:
+            return True
+        i += step
+    return False
+
+
+def _is_word(lang: str, text: str, ch: str) -> bool:
+    if lang == "jpn":
+        return _stands_alone(text, ch)
+    words = _worker["words"]
+    if not words:
+        return True
+    return _is_token(text, ch, words, _worker["max_word"])
+
+
+def _scan_chunk(lines: List[str]) -> dict:
+    """
+    Match one chunk of corpus lines. Returns postings per language, the
+    shortest good candidates per (language, pattern) and English IDs.
+    """
+    matchers = _worker["matchers"]
+    singles = _worker["singles"]
+    fold = _worker["fold"]
+    postings = {lang: {} for lang in LANGUAGES}
+    best = {}
+    english = array("I")
+
+    for line in lines:
+        parts = line.rstrip("\n").split("\t")
+        if len(parts) < 3 or not parts[0].isdigit():
+            continue
+        sid, lang, text = int(parts[0]), parts[1], parts[2]
+        if lang == TRANSLATION_LANGUAGE:
+            english.append(sid)
+            continue
+        matcher = matchers.get(lang)
+        if matcher is None:
+            continue
+        haystack = text.translate(fold) if fold and lang == "cmn" else text
+        found = matcher.find(haystack)
+        single = singles[lang]
+        found = {i for i in found if i not in single or _is_word(lang, haystack, single[i])}
+        if not found:
+            continue
+        good = is_good_sentence(text)
+        for index in found:
+            postings[lang].setdefault(index, array("I")).append(sid)
+            if good:
+                heap = best.setdefault((lang, index), [])
+                item = (-len(text), -sid, text)  # max-heap on length keeps the K shortest
+                if len(heap) < CANDIDATES_PER_KEY:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+    return {"postings": postings, "best": best, "english": english}
+
+
+def _read_chunks(path: Path, chunk_lines: int = CHUNK_LINES):
+    chunk = []
+    with _open_text(path) as f:
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_lines:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+# =============================================================================
+# Mining
+# =============================================================================
+
+def _set_bit(bitmap: bytearray, n: int):
+    byte = n >> 3
+    if byte >= len(bitmap):
+        bitmap.extend(bytes(byte + 1 - len(bitmap) + (1 << 16)))
+    bitmap[byte] |= 1 << (n & 7)
+
+
+def _has_bit(bitmap: bytearray, n: int) -> bool:
+    byte = n >> 3
+    return byte < len(bitmap) and bool(bitmap[byte] & (1 << (n & 7)))
+
+
+def mine_examples(headwords: List[dict], sentences_path: Path,
+                  links_path: Optional[Path] = None,
+                  variants: Optional[VariantTables] = None,
+                  jobs: Optional[int] = None,
+                  words: Optional[Iterable[str]] = None) -> dict:
+    """
+    Mine examples for `headwords` ({"jpn": japanese form, "cmn": chinese form}).
+    `words` are Chinese headwords (e.g. CEDICT's) used to segment Chinese
+    sentences around single-character headwords.
+
+    Returns {"examples": {jpn headword: {lang: example}}, "postings":
+    {lang: {headword: array of IDs}}}.
+    """
+    fold = variants.translations["fold"] if variants else None
+    patterns = {
+        "jpn": [h["jpn"] for h in headwords],
+        "cmn": [h["cmn"].translate(fold) if fold else h["cmn"] for h in headwords],
+    }
+    # Only multi-character words change the segmentation
+    if words is not None:
+        words = frozenset(w.translate(fold) if fold else w for w in words if len(w) > 1)
+
+    postings = {lang: {} for lang in LANGUAGES}
+    best = {}
+    english = bytearray()
+    scanned = 0
+
+    jobs = jobs or os.cpu_count() or 1
+    chunks = _read_chunks(sentences_path)
+    if jobs > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(jobs, _init_worker, (patterns, fold, words))
+        results = pool.imap(_scan_chunk, chunks)
+    else:
+        pool = None
+        _init_worker(patterns, fold, words)
+        results = map(_scan_chunk, chunks)
+
+    try:
+        for result in results:
+            scanned += 1
+            for lang, by_index in result["postings"].items():
+                for index, ids in by_index.items():
+                    target = postings[lang].setdefault(index, array("I"))
+                    room = MAX_POSTINGS - len(target)
+                    if room > 0:
+                        target.extend(ids[:room])
+            for key, items in result["best"].items():
+                heap = best.setdefault(key, [])
+                for item in items:
+                    if len(heap) < CANDIDATES_PER_KEY:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+            for sid in result["english"]:
+                _set_bit(english, sid)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    print(f"  Scanned {scanned} chunks of {sentences_path.name}")
+
+    # Pass 2: translations, only for the kept candidates
+    candidate_ids = {-item[1] for heap in best.values() for item in heap}
+    translation_id = {}
+    if links_path and links_path.exists() and candidate_ids:
+        with _open_text(links_path) as f:
+            for line in f:
+                parts = line.split("\t")
+                if len(parts) < 2:
+                    continue
+                source = int(parts[0])
+                if source in candidate_ids and source not in translation_id:
+                    target = int(parts[1])
+                    if _has_bit(english, target):
+                        translation_id[source] = target
+
+    # Pass 3: English text for the chosen translations
+    translation_text = {}
+    wanted = set(translation_id.values())
+    if wanted:
+        with _open_text(sentences_path) as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) >= 3 and parts[1] == TRANSLATION_LANGUAGE and parts[0].isdigit():
+                    sid = int(parts[0])
+                    if sid in wanted:
+                        translation_text[sid] = parts[2]
+
+    examples = {}
+    for (lang, index), heap in best.items():
+        # Translated first, then shortest, then lowest ID
+        ranked = sorted((-neg_sid not in translation_id, -neg_len, -neg_sid, text)
+                        for neg_len, neg_sid, text in heap)
+        _, _, sid, text = ranked[0]
+        eng = translation_text.get(translation_id.get(sid), "")
+        examples.setdefault(headwords[index]["jpn"], {})[lang] = {
+            "id": sid, "text": text, "translation": eng}
+
+    index_postings = {
+        lang: {headwords[i]["jpn"]: ids for i, ids in by_index.items()}
+        for lang, by_index in postings.items()
+    }
+    print(f"  Found examples for {len(examples)} of {len(headwords)} headwords")
+    return {"examples": dict(sorted(examples.items())), "postings": index_postings}
+
+
+def headwords_for(false_friends) -> List[dict]:
+    """Japanese/Chinese forms to search for, one per false friend headword."""
+    seen = {}
+    for ff in false_friends:
+        if isinstance(ff, dict):
+            jpn, cmn = ff.get("characters", ""), ff.get("cn_characters", "")
+        else:
+            jpn, cmn = ff.characters, ff.cn_characters
+        if jpn and jpn not in seen:
+            seen[jpn] = {"jpn": jpn, "cmn": cmn or jpn}
+    return list(seen.values())
+
+
+def load_cedict_words(path: Path) -> set:
+    """Traditional and simplified headwords from a CC-CEDICT zip."""
+    words = set()
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if not (name.endswith(".txt") or name.endswith(".u8")):
+                continue
+            with zf.open(name) as f:
+                for line in f:
+                    if line.startswith(b"#"):
+                        continue
+                    parts = line.decode("utf-8").split(" ", 2)
+                    if len(parts) == 3:
+                        words.update(parts[:2])
+    return words
+
+
+def write_examples(result: dict, output_path: Path = EXAMPLES_PATH,
+                   index_path: Path = EXAMPLE_INDEX_PATH):
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "examples": result["examples"]}, f, ensure_ascii=False, indent=2)
+    write_indexes(index_path, result["postings"], {"id": "tatoeba_sentence_id"})
+    print(f"  Wrote {output_path.name} and {index_path.name}")
+
+
+def apply_examples(false_friends: list, examples: dict) -> list:
+    """
+    Copies of `false_friends` with empty jp_example / cn_example fields
+    filled from mined examples. Curated sentences are never replaced.
+    """
+    result = []
+    for ff in false_friends:
+        found = examples.get(ff.characters, {})
+        changes = {}
+        if not ff.jp_example and "jpn" in found:
+            changes["jp_example"] = found["jpn"]["text"]
+            changes["jp_example_translation"] = found["jpn"]["translation"]
+        if not ff.cn_example and "cmn" in found:
+            changes["cn_example"] = found["cmn"]["text"]
+            changes["cn_example_translation"] = found["cmn"]["translation"]
+        result.append(replace(ff, **changes) if changes else ff)
+    return result
+
+
+def load_examples(path: Path = EXAMPLES_PATH) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["examples"]
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mine example sentences for false friends")
+    parser.add_argument("--sentences", type=str, help="Tatoeba-style sentences file")
+    parser.add_argument("--links", type=str, help="Tatoeba-style links file")
+    parser.add_argument("--false-friends", type=str,
+                        default=str(OUTPUT_DIR / "false_friends_expanded.json"),
+                        help="False friends JSON whose headwords to search for")
+    parser.add_argument("--cedict", type=str, default=str(CEDICT_PATH),
+                        help="CC-CEDICT zip used to segment Chinese sentences")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes")
+    args = parser.parse_args()
+
+    sentences_path = Path(args.sentences) if args.sentences else _first_existing(SENTENCE_PATHS)
+    if not sentences_path or not sentences_path.exists():
+        print("No sentence corpus found. Place Tatoeba sentences.csv under sources/")
+        return
+    links_path = Path(args.links) if args.links else _first_existing(LINK_PATHS)
+
+    with open(args.false_friends, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    false_friends = data["false_friends"] if isinstance(data, dict) else data
+
+    cedict_path = Path(args.cedict)
+    words = load_cedict_words(cedict_path) if cedict_path.exists() else None
+    if words is None:
+        print(f"  Note: {cedict_path} not found, so Chinese single characters match anywhere")
+
+    result = mine_examples(headwords_for(false_friends), sentences_path, links_path,
+                           VariantTables.load(VARIANTS_PATH), args.jobs, words)
+    OUTPUT_DIR.mkdir(exist_ok=True)
+    write_examples(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,25 +11,33 @@ Usage:
     python expand_false_friends.py --jckv path/to/JCKV.xlsx
     python expand_false_friends.py --auto-detect
     python expand_false_friends.py --merge
+    python expand_false_friends.py --jckv JCKV.xlsx --examples output/examples.json
 
 Output:
     output/false_friends_expanded.json
+    output/false_friends_expanded_reading_index.json
 """
 
+import importlib.util
 import json
 import re
 import os
 from pathlib import Path
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, fields
+from json.encoder import encode_basestring
+from operator import attrgetter
 from typing import Optional, List
-from collections import defaultdict
 
-try:
-    import openpyxl
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-    print("Note: Install openpyxl for Excel support: pip install openpyxl")
+from kana import build_reading_index, write_reading_index
+from pinyin import normalize_column
+from progress import MODES, Progress, set_mode
+from stats import StatsCollector
+from variants import CLUSTERS_PATH, VARIANTS_PATH, VariantClusters, VariantTables
+
+# openpyxl is only needed for --jckv; checked here, imported on use
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+# orjson is an optional faster writer for save_false_friends
+HAS_ORJSON = importlib.util.find_spec("orjson") is not None
 
 
 # =============================================================================
@@ -50,7 +58,9 @@ class FalseFriend:
     jp_example: str = ""
     jp_example_translation: str = ""
 
-    cn_pinyin: str = ""
+    cn_pinyin: str = ""  # Tone marks (e.g., "miǎnqiǎng")
+    cn_pinyin_numbered: str = ""  # e.g., "mian3 qiang3"
+    cn_pinyin_toneless: str = ""  # Search key, e.g., "mianqiang"
     cn_characters: str = ""  # Chinese simplified form if different from JP
     cn_meanings_simplified: List[str] = field(default_factory=list)
     cn_meanings_traditional: List[str] = field(default_factory=list)
@@ -85,7 +95,24 @@ def parse_meaning_text(text: str) -> str:
     return text.strip()
 
 
-def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
+def fill_pinyin_forms(false_friends: List[FalseFriend], remark: bool = False):
+    """
+    Populate numbered/toneless pinyin for a whole list in one pass.
+
+    With remark=True, cn_pinyin itself is replaced by the tone-marked form
+    (JCKV ships numbered pinyin like "yi4fan1").
+    """
+    marked, numbered, toneless = normalize_column([ff.cn_pinyin for ff in false_friends])
+    for ff, mark, num, plain in zip(false_friends, marked, numbered, toneless):
+        if remark:
+            ff.cn_pinyin = mark
+        if remark or not ff.cn_pinyin_numbered:
+            ff.cn_pinyin_numbered = num
+        if remark or not ff.cn_pinyin_toneless:
+            ff.cn_pinyin_toneless = plain
+
+
+def convert_jckv_database(excel_path: str, variants: Optional[VariantTables] = None) -> List[FalseFriend]:
     """
     Convert Matsushita JCKV (日中対照漢字語データベース) v3.0 to FalseFriend objects.
 
@@ -107,15 +134,20 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
     - Col 13: 日本語と中国語に共通の意味 → shared_meanings
     - Col 15: 日本語のみに存在する意味 → jp_only_meanings
     - Col 17: 中国語のみに存在する意味 → cn_only_meanings
+
+    With `variants` (output/variants.json from data_pipeline.py), the Chinese
+    form is compared to the headword across scripts, so 時間/时间 counts as
+    a script-only difference rather than a different written word.
     """
     if not HAS_OPENPYXL:
         raise ImportError("openpyxl required: pip install openpyxl")
+    import openpyxl
 
     wb = openpyxl.load_workbook(excel_path, read_only=True)
     ws = wb.active
 
     false_friends = []
-    stats = {'＞': 0, '＜': 0, '＞＜': 0, '≠': 0, 'skipped_same': 0, 'skipped_no_cn': 0, 'hiragana_only': 0}
+    stats = StatsCollector()
 
     # Column indices (0-based) based on actual JCKV structure
     COL_HEADWORD = 2        # 見出し語彙素 (kanji headword) - USE THIS FIRST
@@ -141,7 +173,9 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
     print(f"Processing {len(rows)} rows from JCKV...")
 
     entry_num = 0
+    progress = Progress("JCKV", total=len(rows), unit="rows")
     for row_idx, row in enumerate(rows, start=2):
+        progress.update()
         try:
             # Skip empty rows
             if not row or len(row) <= COL_PATTERN:
@@ -151,10 +185,10 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
 
             # Skip same meaning (＝) and no Chinese equivalent (φ)
             if pattern == '＝':
-                stats['skipped_same'] += 1
+                stats.count('skipped_same')
                 continue
             if pattern == 'φ':
-                stats['skipped_no_cn'] += 1
+                stats.count('skipped_no_cn')
                 continue
 
             # Only process our target patterns
@@ -180,17 +214,17 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
 
             # Track entries that only have hiragana (for statistics)
             if not headword or headword == '--':
-                stats['hiragana_only'] += 1
+                stats.count('hiragana_only')
 
             # Skip if no Chinese equivalent
             if cn_chars == '--' or not cn_chars:
-                stats['skipped_no_cn'] += 1
+                stats.count('skipped_no_cn')
                 continue
 
             # Get pattern info
             pattern_info = PATTERN_MAP[pattern]
             entry_num += 1
-            stats[pattern] += 1
+            stats.count(pattern)
 
             # Clean meaning texts (strip whitespace and 'nan')
             shared_meaning = parse_meaning_text(shared_meaning_raw)
@@ -234,6 +268,11 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
 
             # Store Chinese characters (may differ from Japanese due to simplification)
             cn_characters = cn_chars if cn_chars and cn_chars != '--' and cn_chars != characters else ""
+            if cn_characters and variants:
+                if variants.same_word(cn_characters, characters):
+                    stats.count('script_variant')
+                else:
+                    stats.count('different_form')
 
             ff = FalseFriend(
                 id=f"jckv_{entry_num:04d}",
@@ -260,21 +299,28 @@ def convert_jckv_database(excel_path: str) -> List[FalseFriend]:
             false_friends.append(ff)
 
         except Exception as e:
-            print(f"Error processing row {row_idx}: {e}")
+            progress.error(f"row {row_idx}", e)
             continue
+    progress.finish()
+
+    # JCKV pinyin is numbered; store all three forms
+    fill_pinyin_forms(false_friends, remark=True)
 
     # Print statistics
     print(f"\n=== JCKV Extraction Statistics ===")
     print(f"Total false friends extracted: {len(false_friends)}")
-    print(f"  ≠ (completely different, critical): {stats['≠']}")
-    print(f"  ＞ (JP has extra meanings, important): {stats['＞']}")
-    print(f"  ＜ (CN has extra meanings, important): {stats['＜']}")
-    print(f"  ＞＜ (both have unique, important): {stats['＞＜']}")
+    print(f"  ≠ (completely different, critical): {stats.counters['≠']}")
+    print(f"  ＞ (JP has extra meanings, important): {stats.counters['＞']}")
+    print(f"  ＜ (CN has extra meanings, important): {stats.counters['＜']}")
+    print(f"  ＞＜ (both have unique, important): {stats.counters['＞＜']}")
     print(f"Skipped:")
-    print(f"  ＝ (same meaning): {stats['skipped_same']}")
-    print(f"  φ/-- (no Chinese equivalent): {stats['skipped_no_cn']}")
+    print(f"  ＝ (same meaning): {stats.counters['skipped_same']}")
+    print(f"  φ/-- (no Chinese equivalent): {stats.counters['skipped_no_cn']}")
     print(f"Notes:")
-    print(f"  Entries with hiragana fallback (no kanji headword): {stats['hiragana_only']}")
+    print(f"  Entries with hiragana fallback (no kanji headword): {stats.counters['hiragana_only']}")
+    if variants:
+        print(f"  Chinese form differs only by script (時間/时间): {stats.counters['script_variant']}")
+        print(f"  Chinese form is a different written word: {stats.counters['different_form']}")
 
     return false_friends
 
@@ -323,6 +369,59 @@ def compute_meaning_similarity(jp_meanings: List[str], cn_meanings: List[str]) -
     return len(intersection) / len(union) if union else 0.5
 
 
+def score_shared_words(
+    jp_meanings: dict,
+    cn_meanings: dict,
+    words,
+    threshold: float = 0.3
+) -> List[dict]:
+    """
+    Score shared words; returns a candidate record for each one below the
+    threshold. Records are plain dicts so shard workers can write them out.
+    """
+    scored = []
+    for word in words:
+        jp = jp_meanings[word]
+        cn = cn_meanings[word]
+        similarity = compute_meaning_similarity(jp, cn)
+        if similarity < threshold:
+            scored.append({"characters": word, "jp_meanings": jp,
+                           "cn_meanings": cn, "similarity": similarity})
+    return scored
+
+
+def candidate_rank_key(candidate: dict):
+    """Most different first; ties by headword so every run ranks identically."""
+    return (candidate["similarity"], candidate["characters"])
+
+
+def rank_auto_candidates(scored) -> List[FalseFriend]:
+    """Turn scored candidates into ranked FalseFriend entries with stable IDs."""
+    candidates = []
+    for i, c in enumerate(sorted(scored, key=candidate_rank_key)):
+        similarity = c["similarity"]
+        # Potential false friend
+        severity = "critical" if similarity < 0.1 else "important" if similarity < 0.2 else "subtle"
+        candidates.append(FalseFriend(
+            id=f"auto_{i:04d}",
+            characters=c["characters"],
+            type=4 if similarity < 0.1 else 3,
+            category="true_divergence",
+            severity=severity,
+            affects="both",
+            jp_reading="",
+            jp_meanings=c["jp_meanings"],
+            cn_pinyin="",
+            cn_meanings_simplified=c["cn_meanings"],
+            cn_meanings_traditional=c["cn_meanings"],
+            explanation=f"Auto-detected: meaning similarity {similarity:.2f}",
+            source="auto",
+            confidence=1.0 - similarity,
+            needs_review=True
+        ))
+    return candidates
+
+
 def auto_detect_false_friends(
     jmdict_path: str,
     cedict_path: str,
@@ -333,46 +432,18 @@ def auto_detect_false_friends(
     
     Args:
         threshold: Maximum similarity to be considered a false friend (0-1)
+
+    See auto_detect_shards.py for the same detection split across processes
+    or machines.
     """
     jp_meanings = load_jmdict_meanings(jmdict_path)
     cn_meanings = load_cedict_meanings(cedict_path)
     
-    candidates = []
-    
     # Find shared characters/words
     shared = set(jp_meanings.keys()) & set(cn_meanings.keys())
     
-    for word in shared:
-        jp = jp_meanings[word]
-        cn = cn_meanings[word]
-        
-        similarity = compute_meaning_similarity(jp, cn)
-        
-        if similarity < threshold:
-            # Potential false friend
-            severity = "critical" if similarity < 0.1 else "important" if similarity < 0.2 else "subtle"
-            
-            ff = FalseFriend(
-                id=f"auto_{len(candidates):04d}",
-                characters=word,
-                type=4 if similarity < 0.1 else 3,
-                category="true_divergence",
-                severity=severity,
-                affects="both",
-                jp_reading="",
-                jp_meanings=jp,
-                cn_pinyin="",
-                cn_meanings_simplified=cn,
-                cn_meanings_traditional=cn,
-                explanation=f"Auto-detected: meaning similarity {similarity:.2f}",
-                source="auto",
-                confidence=1.0 - similarity,
-                needs_review=True
-            )
-            candidates.append(ff)
-    
-    # Sort by confidence (most different first)
-    candidates.sort(key=lambda x: x.confidence, reverse=True)
+    # Sorted by confidence (most different first)
+    candidates = rank_auto_candidates(score_shared_words(jp_meanings, cn_meanings, shared, threshold))
     
     print(f"Auto-detected {len(candidates)} potential false friends")
     return candidates
@@ -383,76 +454,61 @@ def auto_detect_false_friends(
 # =============================================================================
 
 def load_curated_false_friends(json_path: str) -> List[FalseFriend]:
-    """Load our curated false friends."""
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    entries = data.get('false_friends', data)  # Handle both formats
+    """Load our curated false friends (see false_friend_loader.py)."""
+    # Imported here: false_friend_loader imports this module
+    from false_friend_loader import load_false_friends
 
-    false_friends = []
-    for entry in entries:
-        ff = FalseFriend(
-            id=entry['id'],
-            characters=entry['characters'],
-            type=entry.get('type', 4),
-            category=entry.get('category', 'true_divergence'),
-            severity=entry.get('severity', 'important'),
-            affects=entry.get('affects', 'both'),
-            jp_reading=entry.get('jp_reading', ''),
-            jp_meanings=entry.get('jp_meanings', []),
-            jp_example=entry.get('jp_example', ''),
-            jp_example_translation=entry.get('jp_example_translation', ''),
-            cn_pinyin=entry.get('cn_pinyin', ''),
-            cn_characters=entry.get('cn_characters', ''),
-            cn_meanings_simplified=entry.get('cn_meanings_simplified', entry.get('cn_meanings', [])),
-            cn_meanings_traditional=entry.get('cn_meanings_traditional', entry.get('cn_meanings', [])),
-            cn_example=entry.get('cn_example', ''),
-            cn_example_translation=entry.get('cn_example_translation', ''),
-            explanation=entry.get('explanation', ''),
-            mnemonic_tip=entry.get('mnemonic_tip', ''),
-            traditional_note=entry.get('traditional_note', ''),
-            merged_from=entry.get('merged_from', []),
-            shared_meanings=entry.get('shared_meanings', []),
-            jp_only_meanings=entry.get('jp_only_meanings', []),
-            cn_only_meanings=entry.get('cn_only_meanings', []),
-            source='curated',
-            confidence=1.0,
-            needs_review=False
-        )
-        false_friends.append(ff)
-
-    return false_friends
+    # Fills forms missing from older files without touching curated display pinyin
+    return load_false_friends(json_path, source='curated')
 
 
 def merge_false_friends(
     curated: List[FalseFriend],
     jckv: List[FalseFriend],
-    auto: List[FalseFriend]
+    auto: List[FalseFriend],
+    clusters: Optional[VariantClusters] = None
 ) -> List[FalseFriend]:
     """
     Merge false friends from multiple sources.
     Priority: curated > jckv > auto
+    With variant clusters (output/variant_clusters.json), variant spellings
+    of one word (國語 / 国語) are matched too; headwords that only share a
+    cluster key are kept apart.
     """
     merged = {}
+    # Cluster key -> headwords already in `merged`
+    spellings = {}
+    
+    def slot(characters: str) -> str:
+        """The merged key for a headword: an existing variant spelling, or itself."""
+        if characters in merged or clusters is None:
+            return characters
+        candidates = spellings.setdefault(clusters.key(characters), [])
+        for other in candidates:
+            if clusters.same_word(other, characters):
+                return other
+        candidates.append(characters)
+        return characters
     
     # Add auto-detected first (lowest priority)
     for ff in auto:
-        merged[ff.characters] = ff
+        merged[slot(ff.characters)] = ff
     
     # Add JCKV (overwrites auto)
     for ff in jckv:
-        if ff.characters in merged:
+        k = slot(ff.characters)
+        if k in merged:
             # Keep some auto data if JCKV is missing it
-            existing = merged[ff.characters]
+            existing = merged[k]
             if not ff.jp_reading and existing.jp_reading:
                 ff.jp_reading = existing.jp_reading
             if not ff.cn_pinyin and existing.cn_pinyin:
                 ff.cn_pinyin = existing.cn_pinyin
-        merged[ff.characters] = ff
+        merged[k] = ff
     
     # Add curated (highest priority, overwrites everything)
     for ff in curated:
-        merged[ff.characters] = ff
+        merged[slot(ff.characters)] = ff
     
     # Sort by severity (critical first) then alphabetically
     severity_order = {'critical': 0, 'important': 1, 'subtle': 2}
@@ -465,59 +521,167 @@ def merge_false_friends(
     return result
 
 
-def save_false_friends(false_friends: List[FalseFriend], output_path: str):
-    """Save false friends to JSON in the format expected by the Swift app."""
-    # Count statistics
-    stats = {
-        'total': len(false_friends),
-        'by_severity': defaultdict(int),
-        'by_source': defaultdict(int),
-        'by_category': defaultdict(int),
-        'needs_review': 0
+# =============================================================================
+# Serialization
+# =============================================================================
+
+# Pipeline metadata that is not part of the Swift FalseFriend model
+NON_SWIFT_FIELDS = ('source', 'confidence', 'needs_review')
+SWIFT_FIELDS = [f.name for f in fields(FalseFriend) if f.name not in NON_SWIFT_FIELDS]
+JSON_BACKENDS = ['stdlib', 'orjson']
+
+# Categories dict expected by Swift FalseFriendsMetadata
+CATEGORIES = {
+    "true_divergence": "Meanings evolved differently over centuries in both languages",
+    "simplification_merge": "Confusion exists because Simplified Chinese merged distinct Traditional characters",
+    "japanese_coinage": "Word invented/repurposed in Meiji-era Japan, borrowed back to China",
+    "scope_difference": "Same core meaning but different range of usage"
+}
+
+# Entries sit at depth 2 of the indent=2 document, their fields at depth 3
+_ENTRY_INDENT = ' ' * 4
+_FIELD_INDENT = ' ' * 6
+_ITEM_INDENT = ' ' * 8
+_FIELD_PREFIXES = [f'\n{_FIELD_INDENT}{encode_basestring(name)}: ' for name in SWIFT_FIELDS]
+_swift_values = attrgetter(*SWIFT_FIELDS)
+
+
+def swift_metadata(total_entries: int) -> dict:
+    return {
+        'version': '3.0',
+        'description': 'Expanded false friends database',
+        'total_entries': total_entries,
+        'categories': CATEGORIES
     }
 
+
+def swift_document(false_friends: List[FalseFriend], stats: Optional[StatsCollector] = None) -> dict:
+    """
+    The document save_false_friends writes, as plain dicts (lists shared,
+    not copied). Entries are fed to `stats` on the way.
+    """
+    entries = []
     for ff in false_friends:
-        stats['by_severity'][ff.severity] += 1
-        stats['by_source'][ff.source] += 1
-        stats['by_category'][ff.category] += 1
-        if ff.needs_review:
-            stats['needs_review'] += 1
-
-    # Categories dict expected by Swift FalseFriendsMetadata
-    categories = {
-        "true_divergence": "Meanings evolved differently over centuries in both languages",
-        "simplification_merge": "Confusion exists because Simplified Chinese merged distinct Traditional characters",
-        "japanese_coinage": "Word invented/repurposed in Meiji-era Japan, borrowed back to China",
-        "scope_difference": "Same core meaning but different range of usage"
-    }
+        entries.append(dict(zip(SWIFT_FIELDS, _swift_values(ff))))
+        if stats is not None:
+            stats.add_false_friend(ff)
+    return {'metadata': swift_metadata(len(false_friends)), 'false_friends': entries}
+
+
+def _encode_field(value) -> str:
+    """One field value exactly as json.dump(indent=2, ensure_ascii=False) writes it at depth 3."""
+    if type(value) is str:
+        return encode_basestring(value)
+    if type(value) is list:
+        if not value:
+            return '[]'
+        if all(type(item) is str for item in value):
+            items = f',\n{_ITEM_INDENT}'.join(map(encode_basestring, value))
+            return f'[\n{_ITEM_INDENT}{items}\n{_FIELD_INDENT}]'
+    # ints, bools and anything unusual: let json format it, then shift it to this depth
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + _FIELD_INDENT)
+
+
+def write_swift_json(f, false_friends: List[FalseFriend], stats: Optional[StatsCollector] = None):
+    """
+    Stream the Swift document to a text file without building per-entry
+    dicts, feeding each entry to `stats` as it is written. Output is
+    byte-identical to json.dump(swift_document(...), f, ensure_ascii=False,
+    indent=2).
+    """
+    head = json.dumps({'metadata': swift_metadata(len(false_friends))}, ensure_ascii=False, indent=2)
+    # Reopen the object after "metadata" by dropping its closing "\n}"
+    f.write(head[:-2])
+    if not false_friends:
+        f.write(',\n  "false_friends": []\n}')
+        return
+    f.write(',\n  "false_friends": [\n')
+    separator = ''
+    for ff in false_friends:
+        body = ','.join([prefix + _encode_field(value)
+                        for prefix, value in zip(_FIELD_PREFIXES, _swift_values(ff))])
+        f.write(f'{separator}{_ENTRY_INDENT}{{{body}\n{_ENTRY_INDENT}}}')
+        separator = ',\n'
+        if stats is not None:
+            stats.add_false_friend(ff)
+    f.write('\n  ]\n}')
 
-    # Convert FalseFriend objects to dicts, excluding metadata fields not in Swift model
-    def to_swift_dict(ff: FalseFriend) -> dict:
-        d = asdict(ff)
-        # Remove fields not in the Swift FalseFriend model
-        d.pop('source', None)
-        d.pop('confidence', None)
-        d.pop('needs_review', None)
-        return d
-
-    output = {
-        'metadata': {
-            'version': '3.0',
-            'description': 'Expanded false friends database',
-            'total_entries': len(false_friends),
-            'categories': categories
-        },
-        'false_friends': [to_swift_dict(ff) for ff in false_friends]
-    }
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+def save_false_friends(false_friends: List[FalseFriend], output_path: str,
+                       backend: str = 'stdlib') -> StatsCollector:
+    """
+    Save false friends to JSON in the format expected by the Swift app.
+
+    backend 'orjson' writes the same JSON through orjson when it is
+    installed (falling back to the stdlib writer otherwise); only the
+    default writer is guaranteed byte-identical across versions. Returns
+    the StatsCollector filled while the entries were written.
+    """
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend {backend!r} (expected one of {JSON_BACKENDS})")
+    # Counted while the entries are written
+    stats = StatsCollector()
+
+    if backend == 'orjson' and not HAS_ORJSON:
+        print("Note: orjson not installed, using the stdlib writer: pip install orjson")
+        backend = 'stdlib'
+    if backend == 'orjson':
+        import orjson
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(swift_document(false_friends, stats), option=orjson.OPT_INDENT_2))
+    else:
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            write_swift_json(f, false_friends, stats)
 
     print(f"Saved {len(false_friends)} entries to {output_path}")
-    print(f"Statistics: {dict(stats['by_severity'])}")
-    print(f"  By category: {dict(stats['by_category'])}")
-    print(f"  By source: {dict(stats['by_source'])}")
-    print(f"  Needs review: {stats['needs_review']}")
+    print(f"Statistics: {stats.histogram('ff_severity')}")
+    print(f"  By category: {stats.histogram('ff_category')}")
+    print(f"  By source: {stats.histogram('ff_source')}")
+    print(f"  Needs review: {stats.counters['ff_needs_review']}")
+    return stats
+
+
+def run_save_benchmark(false_friends: List[FalseFriend], repeat: int = 5):
+    """Time the asdict + json.dump writer this replaced against the current backends."""
+    import io
+    import time
+
+    def asdict_dump():
+        entries = []
+        for ff in false_friends:
+            d = asdict(ff)
+            for name in NON_SWIFT_FIELDS:
+                d.pop(name, None)
+            entries.append(d)
+        buf = io.StringIO()
+        json.dump({'metadata': swift_metadata(len(false_friends)), 'false_friends': entries},
+                  buf, ensure_ascii=False, indent=2)
+        return buf.getvalue().encode('utf-8')
+
+    def streaming():
+        buf = io.StringIO()
+        write_swift_json(buf, false_friends)
+        return buf.getvalue().encode('utf-8')
+
+    writers = [('asdict + json.dump', asdict_dump), ('streaming (stdlib)', streaming)]
+    if HAS_ORJSON:
+        import orjson
+        writers.append(('orjson', lambda: orjson.dumps(swift_document(false_friends),
+                                                        option=orjson.OPT_INDENT_2)))
+
+    reference = asdict_dump()
+    print(f"\n=== save_false_friends benchmark ({len(false_friends)} entries, "
+          f"{len(reference) / 1024:.0f} KB, best of {repeat}) ===")
+    for name, writer in writers:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            data = writer()
+            best = min(best, time.perf_counter() - start)
+        same = 'identical' if data == reference else 'differs'
+        print(f"  {name:22}{best * 1000:>9.1f} ms   {same}")
+    if not HAS_ORJSON:
+        print("  (orjson not installed)")
 
 
 # =============================================================================
@@ -535,10 +699,30 @@ def main():
                         help='Auto-detect from JMDict/CEDICT')
     parser.add_argument('--jmdict', type=str, help='Path to JMDict data')
     parser.add_argument('--cedict', type=str, help='Path to CEDICT data')
+    parser.add_argument('--shards', type=int,
+                        help='Auto-detect in N shards across processes (see auto_detect_shards.py)')
+    parser.add_argument('--jobs', type=int, help='Worker processes for --shards')
+    parser.add_argument('--reduce-only', action='store_true',
+                        help='With --shards: merge existing shard parts instead of scoring')
     parser.add_argument('--output', type=str, default='output/false_friends_expanded.json',
                         help='Output path')
+    parser.add_argument('--examples', type=str,
+                        help='Fill empty example fields from examples.json (see examples.py)')
+    parser.add_argument('--string-table', action='store_true',
+                        help='Also write <output>.strtab.json (see string_table.py)')
+    parser.add_argument('--progress', choices=MODES,
+                        help='Progress display (default: bar on a terminal, else log lines)')
+    parser.add_argument('--json-backend', choices=JSON_BACKENDS, default='stdlib',
+                        help='Writer for the output JSON (orjson is optional and faster)')
+    parser.add_argument('--benchmark-save', action='store_true',
+                        help='Time the output writers on the merged entries instead of saving')
     
     args = parser.parse_args()
+    if args.jckv and not HAS_OPENPYXL:
+        # Carrying on would overwrite --output without the JCKV entries
+        parser.error("--jckv needs openpyxl: pip install openpyxl")
+    if args.progress:
+        set_mode(args.progress)
     
     # Load curated
     curated = []
@@ -549,18 +733,41 @@ def main():
     # Load JCKV
     jckv = []
     if args.jckv and os.path.exists(args.jckv):
-        jckv = convert_jckv_database(args.jckv)
+        jckv = convert_jckv_database(args.jckv, VariantTables.load(VARIANTS_PATH))
     
     # Auto-detect
     auto = []
-    if args.auto_detect and args.jmdict and args.cedict:
-        auto = auto_detect_false_friends(args.jmdict, args.cedict)
+    if args.auto_detect and args.shards and args.reduce_only:
+        from auto_detect_shards import reduce_shards
+        auto = reduce_shards(args.shards)
+    elif args.auto_detect and args.jmdict and args.cedict:
+        if args.shards:
+            from auto_detect_shards import auto_detect_sharded
+            auto = auto_detect_sharded(args.jmdict, args.cedict, args.shards, args.jobs)
+        else:
+            auto = auto_detect_false_friends(args.jmdict, args.cedict)
     
     # Merge
     if curated or jckv or auto:
-        merged = merge_false_friends(curated, jckv, auto)
+        merged = merge_false_friends(curated, jckv, auto, VariantClusters.load(CLUSTERS_PATH))
+        if args.examples:
+            from examples import apply_examples, load_examples
+            merged = apply_examples(merged, load_examples(Path(args.examples)))
+        if args.benchmark_save:
+            run_save_benchmark(merged)
+            return
         os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
-        save_false_friends(merged, args.output)
+        save_false_friends(merged, args.output, args.json_backend)
+        if args.string_table:
+            import string_table
+            strtab = string_table.strtab_path(Path(args.output))
+            string_table.save(swift_document(merged), strtab)
+            print(f"Saved string-table form to {strtab}")
+
+        # Reading index (kana/romaji -> false friend IDs) next to the output
+        output_path = Path(args.output)
+        reading_index = build_reading_index((ff.id, [ff.jp_reading]) for ff in merged)
+        write_reading_index(reading_index, output_path.with_name(f"{output_path.stem}_reading_index.json"))
     else:
         print("No data to process. Provide --jckv, --curated, or --auto-detect")
 
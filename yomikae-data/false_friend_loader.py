@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Streaming False-Friend Loader
+
+Loads the curated, JCKV, merged and expanded false-friend JSON files
+(either {"metadata": ..., "false_friends": [...]} or a bare list) into
+FalseFriend objects without json.load-ing the whole document first:
+
+    stream  the file is read in CHUNK_SIZE pieces and each entry object is
+            decoded on its own with JSONDecoder.raw_decode, so only one
+            chunk and the finished FalseFriends are held at a time
+    plan    the key -> attribute mapping, loader defaults and fallbacks
+            (cn_meanings for the simplified/traditional lists) are worked
+            out once per field selection; an entry whose keys are all
+            known is copied into a fresh defaults dict in one update() and
+            becomes the instance's __dict__
+    subset  fields= keeps only the named fields (the rest get loader
+            defaults); ids= yields only those entries and stops reading
+            once all of them have been seen
+
+A full load is no faster than json.load plus per-field construction (the
+pinyin filling dominates both, and per-entry decoding costs about what one
+json.load does). What the loader buys is a lower peak, since the parsed
+document is never held whole, and partial loads that skip work: --benchmark
+prints time and peak memory for each relative to the json.load baseline.
+
+load_curated_false_friends() in expand_false_friends.py is built on this.
+
+Usage:
+    python false_friend_loader.py output/false_friends_merged.json --benchmark
+    python false_friend_loader.py output/false_friends_merged.json --ids ff_001 jckv_0042
+
+Output:
+    none
+"""
+
+import json
+import re
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from expand_false_friends import FalseFriend, fill_pinyin_forms
+
+
+CHUNK_SIZE = 1 << 16
+
+# Pipeline metadata, set by the caller rather than read from the file
+METADATA_FIELDS = ("source", "confidence", "needs_review")
+REQUIRED_FIELDS = ("id", "characters")
+# Defaults for fields the dataclass requires but older files may omit
+LOADER_DEFAULTS = {
+    "type": 4,
+    "category": "true_divergence",
+    "severity": "important",
+    "affects": "both",
+    "jp_reading": "",
+}
+# Older files have a single cn_meanings list
+FALLBACK_KEYS = {
+    "cn_meanings_simplified": "cn_meanings",
+    "cn_meanings_traditional": "cn_meanings",
+}
+
+_WHITESPACE = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+# =============================================================================
+# Field plan
+# =============================================================================
+
+class FieldPlan:
+    """How entry dicts become FalseFriend attributes, for one field selection."""
+
+    def __init__(self, fields: Optional[Iterable[str]] = None, source: str = "curated",
+                 confidence: float = 1.0, needs_review: bool = False):
+        names = [f.name for f in dataclass_fields(FalseFriend)]
+        loadable = [name for name in names if name not in METADATA_FIELDS]
+        if fields is None:
+            selected = list(loadable)
+        else:
+            unknown = set(fields) - set(loadable)
+            if unknown:
+                raise ValueError(f"Unknown FalseFriend fields: {sorted(unknown)}")
+            selected = [name for name in loadable if name in set(fields) | set(REQUIRED_FIELDS)]
+        self.selected = selected
+        self.selected_set = frozenset(selected)
+        self.all_fields = fields is None
+
+        # Immutable defaults are shared; list defaults are created per entry
+        self.defaults = {}
+        self.list_fields = []
+        for f in dataclass_fields(FalseFriend):
+            if f.name in REQUIRED_FIELDS:
+                continue
+            if f.name in METADATA_FIELDS:
+                value = {"source": source, "confidence": confidence,
+                         "needs_review": needs_review}[f.name]
+            elif f.name in LOADER_DEFAULTS:
+                value = LOADER_DEFAULTS[f.name]
+            elif getattr(f.type, "__origin__", None) is list:
+                self.list_fields.append(f.name)
+                value = None
+            else:
+                value = f.default
+            self.defaults[f.name] = value
+        # Field order of the dataclass, with id/characters first as in the files
+        self.defaults = {**{name: None for name in REQUIRED_FIELDS}, **self.defaults}
+        self.fallbacks = {name: key for name, key in FALLBACK_KEYS.items() if name in self.selected_set}
+
+    def build(self, entry: dict) -> FalseFriend:
+        for name in REQUIRED_FIELDS:
+            if name not in entry:
+                raise KeyError(name)
+        values = dict(self.defaults)
+        for name in self.list_fields:
+            values[name] = []
+        if self.all_fields and entry.keys() <= self.selected_set:
+            values.update(entry)
+        else:
+            for name in self.selected:
+                if name in entry:
+                    values[name] = entry[name]
+                elif name in self.fallbacks and self.fallbacks[name] in entry:
+                    values[name] = entry[self.fallbacks[name]]
+        ff = FalseFriend.__new__(FalseFriend)
+        ff.__dict__ = values
+        return ff
+
+
+# =============================================================================
+# Streaming
+# =============================================================================
+
+class _JSONStream:
+    """Just enough of a pull parser to walk to the entry array and decode each entry."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r}, found {found or 'end of file'!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Value runs past the buffer: read more and retry, unless there is no more
+                if self._fill():
+                    continue
+                raise
+            # A bare number could continue in the next chunk
+            if end == len(self.buf) and not isinstance(value, (dict, list, str)) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def array(self) -> Iterator:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' in entry array, found {char or 'end of file'!r}")
+
+
+def iter_entries(f) -> Iterator[dict]:
+    """Raw entry dicts from an open text file, one at a time."""
+    stream = _JSONStream(f)
+    if stream.peek() == "[":
+        yield from stream.array()
+        return
+    stream.expect("{")
+    while stream.peek() != "}":
+        key = stream.value()
+        stream.expect(":")
+        if key == "false_friends":
+            yield from stream.array()
+            return
+        stream.value()
+        if stream.peek() == ",":
+            stream.pos += 1
+
+
+def iter_false_friends(path, fields: Optional[Iterable[str]] = None,
+                       ids: Optional[Iterable[str]] = None,
+                       plan: Optional[FieldPlan] = None) -> Iterator[FalseFriend]:
+    """FalseFriends from a JSON file in file order, optionally a subset of fields and IDs."""
+    plan = plan or FieldPlan(fields)
+    wanted = set(ids) if ids is not None else None
+    with open(path, "r", encoding="utf-8") as f:
+        for entry in iter_entries(f):
+            if wanted is not None:
+                if entry.get("id") not in wanted:
+                    continue
+                wanted.discard(entry["id"])
+            yield plan.build(entry)
+            if wanted is not None and not wanted:
+                return
+
+
+def load_false_friends(path, fields: Optional[Iterable[str]] = None,
+                       ids: Optional[Iterable[str]] = None, source: str = "curated",
+                       fill_pinyin: bool = True) -> List[FalseFriend]:
+    """
+    All (or the selected) entries of a false-friend JSON file.
+
+    Pipeline metadata is not in the files: every entry gets `source`,
+    confidence 1.0 and needs_review False. With fill_pinyin, numbered and
+    toneless pinyin missing from older files are derived from cn_pinyin.
+    """
+    plan = FieldPlan(fields, source=source)
+    false_friends = list(iter_false_friends(path, ids=ids, plan=plan))
+    if fill_pinyin and "cn_pinyin" in plan.selected_set:
+        fill_pinyin_forms(false_friends)
+    return false_friends
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _load_with_json(path) -> List[FalseFriend]:
+    """The json.load + per-field .get() loader this replaced, kept as the baseline."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    false_friends = []
+    entries = data if isinstance(data, list) else data["false_friends"]
+    for entry in entries:
+        false_friends.append(FalseFriend(
+            id=entry["id"],
+            characters=entry["characters"],
+            type=entry.get("type", 4),
+            category=entry.get("category", "true_divergence"),
+            severity=entry.get("severity", "important"),
+            affects=entry.get("affects", "both"),
+            jp_reading=entry.get("jp_reading", ""),
+            jp_meanings=entry.get("jp_meanings", []),
+            jp_example=entry.get("jp_example", ""),
+            jp_example_translation=entry.get("jp_example_translation", ""),
+            cn_pinyin=entry.get("cn_pinyin", ""),
+            cn_pinyin_numbered=entry.get("cn_pinyin_numbered", ""),
+            cn_pinyin_toneless=entry.get("cn_pinyin_toneless", ""),
+            cn_characters=entry.get("cn_characters", ""),
+            cn_meanings_simplified=entry.get("cn_meanings_simplified", entry.get("cn_meanings", [])),
+            cn_meanings_traditional=entry.get("cn_meanings_traditional", entry.get("cn_meanings", [])),
+            cn_example=entry.get("cn_example", ""),
+            cn_example_translation=entry.get("cn_example_translation", ""),
+            explanation=entry.get("explanation", ""),
+            mnemonic_tip=entry.get("mnemonic_tip", ""),
+            traditional_note=entry.get("traditional_note", ""),
+            merged_from=entry.get("merged_from", []),
+            shared_meanings=entry.get("shared_meanings", []),
+            jp_only_meanings=entry.get("jp_only_meanings", []),
+            cn_only_meanings=entry.get("cn_only_meanings", []),
+            source="curated",
+            confidence=1.0,
+            needs_review=False
+        ))
+    fill_pinyin_forms(false_friends)
+    return false_friends
+
+
+def run_benchmark(path: Path, repeat: int = 5):
+    import time
+    import tracemalloc
+
+    baseline = _load_with_json(path)
+    ids = [ff.id for ff in baseline]
+    loaders = [
+        ("json.load + .get()", lambda: _load_with_json(path), True),
+        ("streaming, all fields", lambda: load_false_friends(path), True),
+        ("3 fields", lambda: load_false_friends(path, fields=["severity"]), False),
+        ("first 10 IDs", lambda: load_false_friends(path, ids=ids[:10]), False),
+        ("last 10 IDs", lambda: load_false_friends(path, ids=ids[-10:]), False),
+    ]
+
+    print(f"\n=== False-friend loading: {Path(path).name} ({len(baseline)} entries, "
+          f"{Path(path).stat().st_size / 1024:.0f} KB, best of {repeat}) ===")
+    print(f"{'':24}{'ms':>9}{'x time':>8}{'peak MB':>10}{'x peak':>8}{'entries':>9}"
+          f"  same as baseline")
+    base_time = base_peak = None
+    for name, load, compare in loaders:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = load()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        load()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        same = (result == baseline) if compare else "-"
+        if base_time is None:
+            base_time, base_peak = best, peak
+        print(f"{name:24}{best * 1000:>9.1f}{best / base_time:>8.2f}{peak / 1e6:>10.1f}"
+              f"{peak / base_peak:>8.2f}{len(result):>9}  {same}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stream false friends out of a JSON file")
+    parser.add_argument("path", type=str, help="Curated, JCKV, merged or expanded JSON")
+    parser.add_argument("--ids", nargs="+", help="Load only these entries")
+    parser.add_argument("--fields", nargs="+", help="Load only these fields")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare against json.load + per-field construction")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(Path(args.path), args.repeat)
+    else:
+        from dataclasses import asdict
+
+        for ff in load_false_friends(args.path, fields=args.fields, ids=args.ids):
+            print(json.dumps(asdict(ff), ensure_ascii=False))
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Compact Headword Store
+
+Read-only mapping from dictionary headwords (any length) to entries, used
+by parse_jmdict and parse_cedict in place of plain dicts. A dict of
+per-headword entry dicts costs ~600 bytes per headword, which is why the
+parsers used to drop everything longer than 4 characters; this store keeps
+every headword in a fraction of that:
+
+    keys     sorted, front-coded in blocks of BLOCK_SIZE: each block keeps
+             its first key whole and every other key as (length of the
+             prefix shared with the previous key, remaining characters),
+             so 四字熟語 variants and long compounds share their prefixes
+    entries  one string holding every distinct entry, fields separated by
+             FIELD_SEP and list items by ITEM_SEP, with offsets in an array;
+             headwords that share an entry (CEDICT traditional/simplified,
+             JMdict kanji spellings) point at the same one
+
+It implements collections.abc.Mapping, so existing callers (`in`, [],
+.get, .keys, .values) work unchanged; entries are decoded into fresh
+dicts on access. Exact lookup is a bisect over block heads plus a scan of
+at most one block; prefix() walks keys in order from the first match.
+Consecutive lookups in sorted order (compile_characters) reuse the last
+decoded block.
+
+Usage:
+    python headword_store.py sources/cedict_1_0_ts_utf-8_mdbg.zip 中国      # prefix search
+
+Output:
+    none (in-memory; pickles with the build cache)
+"""
+
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+BLOCK_SIZE = 16
+FIELD_SEP = "\x1f"
+ITEM_SEP = "\x1e"
+KEY_SEP = "\x1d"
+# Shared-prefix lengths are stored as chr(SHARED_BASE + n), clear of KEY_SEP
+SHARED_BASE = 0x20
+
+
+class HeadwordStoreBuilder:
+    """
+    Collects headwords and entries, encoding each entry as it arrives.
+
+    list_fields are stored as lists, all other fields as strings. Adding a
+    headword twice keeps the last entry, like assigning into a dict.
+    """
+
+    def __init__(self, fields: List[str], list_fields: Tuple[str, ...] = ()):
+        self.fields = list(fields)
+        self.list_fields = set(list_fields)
+        self._entries: List[str] = []
+        self._entry_ids: Dict[str, int] = {}
+        self._keys: Dict[str, int] = {}
+
+    def _encode(self, entry: dict) -> str:
+        parts = []
+        for name in self.fields:
+            value = entry.get(name)
+            if name in self.list_fields:
+                value = value or []
+                if any(ITEM_SEP in item for item in value):
+                    raise ValueError(f"Separator character in {name!r}: {value!r}")
+                value = ITEM_SEP.join(value)
+            elif value is None:
+                value = ""
+            if FIELD_SEP in value or (name not in self.list_fields and ITEM_SEP in value):
+                raise ValueError(f"Separator character in {name!r}: {value!r}")
+            parts.append(value)
+        return FIELD_SEP.join(parts)
+
+    def add(self, headwords, entry: dict):
+        """Map one or more headwords to entry."""
+        text = self._encode(entry)
+        entry_id = self._entry_ids.get(text)
+        if entry_id is None:
+            entry_id = self._entry_ids[text] = len(self._entries)
+            self._entries.append(text)
+        if isinstance(headwords, str):
+            headwords = [headwords]
+        for headword in headwords:
+            if KEY_SEP in headword:
+                raise ValueError(f"Separator character in headword {headword!r}")
+            self._keys[headword] = entry_id
+
+    def __len__(self):
+        return len(self._keys)
+
+    def build(self) -> "HeadwordStore":
+        keys = sorted(self._keys)
+        # Renumber entries in first-use order and drop ones no key points at
+        # (overwritten duplicates)
+        remap = {}
+        entries = []
+        value_ids = array("I")
+        for key in keys:
+            old = self._keys[key]
+            new = remap.get(old)
+            if new is None:
+                new = remap[old] = len(entries)
+                entries.append(self._entries[old])
+            value_ids.append(new)
+
+        offsets = array("I", [0])
+        for text in entries:
+            offsets.append(offsets[-1] + len(text))
+
+        heads, blocks = [], []
+        for start in range(0, len(keys), BLOCK_SIZE):
+            chunk = keys[start:start + BLOCK_SIZE]
+            heads.append(chunk[0])
+            parts = []
+            previous = chunk[0]
+            for key in chunk[1:]:
+                shared = 0
+                limit = min(len(previous), len(key))
+                while shared < limit and previous[shared] == key[shared]:
+                    shared += 1
+                parts.append(chr(SHARED_BASE + shared) + key[shared:])
+                previous = key
+            blocks.append(KEY_SEP.join(parts))
+
+        self._entries, self._entry_ids, self._keys = [], {}, {}
+        return HeadwordStore(self.fields, sorted(self.list_fields), heads, blocks,
+                             value_ids, "".join(entries), offsets)
+
+
+class HeadwordStore(Mapping):
+    def __init__(self, fields, list_fields, heads, blocks, value_ids, entry_text, offsets):
+        self.fields = fields
+        self.list_fields = list_fields
+        self._heads = heads
+        self._blocks = blocks
+        self._value_ids = value_ids
+        self._entry_text = entry_text
+        self._offsets = offsets
+        self._list_mask = [name in set(list_fields) for name in fields]
+        self._cached_block = (-1, None)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_cached_block"] = (-1, None)
+        return state
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+
+    def _block_keys(self, block: int) -> List[str]:
+        cached_block, keys = self._cached_block
+        if cached_block == block:
+            return keys
+        keys = [self._heads[block]]
+        text = self._blocks[block]
+        if text:
+            previous = keys[0]
+            for part in text.split(KEY_SEP):
+                previous = previous[:ord(part[0]) - SHARED_BASE] + part[1:]
+                keys.append(previous)
+        self._cached_block = (block, keys)
+        return keys
+
+    def _rank(self, key: str) -> Optional[int]:
+        """Position of key in sorted order, or None."""
+        block = bisect_right(self._heads, key) - 1
+        if block < 0:
+            return None
+        keys = self._block_keys(block)
+        for i, candidate in enumerate(keys):
+            if candidate == key:
+                return block * BLOCK_SIZE + i
+        return None
+
+    def __len__(self) -> int:
+        return len(self._value_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        for block in range(len(self._heads)):
+            yield from self._block_keys(block)
+
+    def __contains__(self, key) -> bool:
+        return isinstance(key, str) and self._rank(key) is not None
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # -------------------------------------------------------------------------
+
+    def _entry(self, value_id: int) -> dict:
+        text = self._entry_text[self._offsets[value_id]:self._offsets[value_id + 1]]
+        entry = {}
+        for name, is_list, value in zip(self.fields, self._list_mask, text.split(FIELD_SEP)):
+            entry[name] = (value.split(ITEM_SEP) if value else []) if is_list else value
+        return entry
+
+    def __getitem__(self, key: str) -> dict:
+        rank = self._rank(key) if isinstance(key, str) else None
+        if rank is None:
+            raise KeyError(key)
+        return self._entry(self._value_ids[rank])
+
+    # -------------------------------------------------------------------------
+    # Prefix search
+    # -------------------------------------------------------------------------
+
+    def prefix(self, prefix: str, limit: Optional[int] = None) -> Iterator[str]:
+        """Headwords starting with prefix, in sorted order."""
+        block = max(0, bisect_right(self._heads, prefix) - 1)
+        found = 0
+        for b in range(block, len(self._heads)):
+            for key in self._block_keys(b):
+                if key < prefix:
+                    continue
+                if not key.startswith(prefix):
+                    return
+                yield key
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def prefixes_of(self, text: str) -> List[str]:
+        """Headwords that are prefixes of text (longest-match tokenizing)."""
+        return [text[:n] for n in range(1, len(text) + 1) if text[:n] in self]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from pathlib import Path
+
+    import data_pipeline
+
+    start = time.perf_counter()
+    store = data_pipeline.parse_cedict(Path(sys.argv[1]))
+    print(f"Loaded {len(store)} headwords in {time.perf_counter() - start:.1f}s")
+    for query in sys.argv[2:]:
+        matches = list(store.prefix(query, limit=20))
+        print(f"{query}: {' '.join(matches) if matches else '(none)'}")
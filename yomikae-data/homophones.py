@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Homophone Indexes
+
+Reverse reading indexes over the compiled characters, so "every character
+read shī" or "every character with on'yomi シ" is one lookup instead of a
+scan:
+    pinyin_toneless  shi  -> 是 十 时 事 师 诗 ...
+    pinyin           shī  -> 师 诗 施 失 ...
+    onyomi           シ   -> 子 四 市 ...   (katakana keys)
+
+compile_characters() feeds each finished single-character entry to a
+HomophoneCollector as it goes, so the indexes come out of the same pass
+that builds the entries. Posting lists hold code points ordered most
+common first (frequency_rank, then stroke count, as for the shards) and
+ship as an indexes.py posting-list file.
+
+Usage:
+    python homophones.py shi shī シ              # look up readings
+
+Output:
+    output/homophones.idx
+"""
+
+from pathlib import Path
+from typing import Dict, List
+
+from indexes import IndexFile, write_indexes
+from kana import extract_readings, to_katakana
+from pinyin import parse_pinyin, to_marked, to_toneless
+from ranking import commonness_key
+
+
+OUTPUT_DIR = Path("output")
+HOMOPHONES_PATH = OUTPUT_DIR / "homophones.idx"
+
+INDEX_NAMES = ["pinyin_toneless", "pinyin", "onyomi"]
+
+
+class HomophoneCollector:
+    """Accumulates reading -> characters while compile_characters() runs."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, list]] = {name: {} for name in INDEX_NAMES}
+        self._onyomi_memo: Dict[str, List[str]] = {}
+
+    def _onyomi_keys(self, raw: str) -> List[str]:
+        keys = self._onyomi_memo.get(raw)
+        if keys is None:
+            keys = self._onyomi_memo[raw] = [to_katakana(k) for k in extract_readings(raw)]
+        return keys
+
+    def add(self, entry: dict):
+        """Record one compiled entry; multi-character words are skipped."""
+        char = entry["character"]
+        if len(char) != 1:
+            return
+        item = (commonness_key(entry), ord(char))
+        chinese = entry.get("chinese") or {}
+        japanese = entry.get("japanese") or {}
+        keys = {
+            "pinyin_toneless": {r.lower() for r in chinese.get("pinyin_toneless") or [] if r},
+            "pinyin": {r.lower() for r in chinese.get("pinyin") or [] if r},
+            "onyomi": {k for raw in japanese.get("onyomi") or [] for k in self._onyomi_keys(raw)},
+        }
+        for name, readings in keys.items():
+            table = self.postings[name]
+            for reading in readings:
+                table.setdefault(reading, []).append(item)
+
+    def build(self) -> Dict[str, Dict[str, List[int]]]:
+        """{index name: {reading: [code points, most common first]}}."""
+        return {
+            name: {reading: [cp for _, cp in sorted(items)] for reading, items in table.items()}
+            for name, table in self.postings.items()
+        }
+
+
+def write_homophones(indexes: Dict[str, Dict[str, List[int]]],
+                     output_path: Path = HOMOPHONES_PATH):
+    """Write HomophoneCollector.build() output."""
+    write_indexes(output_path, indexes, {"id": "codepoint", "order": "frequency"})
+    sizes = ", ".join(f"{name} {len(indexes[name])}" for name in INDEX_NAMES)
+    print(f"  Wrote {Path(output_path).name} ({sizes} readings)")
+
+
+class Homophones:
+    """Reader for homophones.idx."""
+
+    def __init__(self, path: Path = HOMOPHONES_PATH):
+        self.file = IndexFile(Path(path))
+
+    def lookup(self, reading: str) -> List[str]:
+        """
+        Characters sharing a reading, most common first. Kana is matched
+        against on'yomi, tone-marked or numbered pinyin against toned pinyin,
+        plain Latin against toneless pinyin.
+        """
+        reading = reading.strip()
+        if not reading:
+            return []
+        kana = extract_readings(reading) if not reading.isascii() else []
+        toned = any(ch.isdigit() for ch in reading) or any(
+            isinstance(item, tuple) and item[1] != 5 for item in parse_pinyin(reading))
+        if kana and all(not ch.isascii() for ch in reading):
+            index, key = "onyomi", to_katakana(kana[0])
+        elif toned:
+            index, key = "pinyin", to_marked(reading).lower()
+        else:
+            # "lü" and "lv" both fold to the stored "lv"
+            index, key = "pinyin_toneless", to_toneless(reading)
+        return [chr(cp) for cp in self.file[index].get(key)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Look up characters by shared reading")
+    parser.add_argument("readings", nargs="+")
+    parser.add_argument("--path", type=str, default=str(HOMOPHONES_PATH))
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args()
+
+    homophones = Homophones(Path(args.path))
+    for reading in args.readings:
+        chars = homophones.lookup(reading)
+        print(f"{reading}: {''.join(chars[:args.limit])}"
+              + (f" (+{len(chars) - args.limit})" if len(chars) > args.limit else ""))
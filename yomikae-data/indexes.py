@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Posting-List Index Files
+
+Compact inverted indexes (key -> sorted list of u32 IDs) shared by the
+pipeline's lookup artifacts. One file can hold several named indexes.
+
+Layout (little-endian):
+    magic "YMKI" | u32 format version | u32 header length | header JSON
+    per index:
+        keys      int keys: u32[count]  /  str keys: u32 offsets[count + 1] + UTF-8 blob
+        postings  u32 offsets[count + 1] | u32 IDs
+
+Keys are stored sorted, so exact lookups and key ranges (stroke 5-8) or key
+prefixes (search-as-you-type) are a binary search. Posting lists are
+memoryviews over the file, so nothing is decoded until it is used.
+
+Usage:
+    python indexes.py output/radical_stroke.idx                   # list indexes
+    python indexes.py output/radical_stroke.idx --index radical --key 85
+    python indexes.py output/radical_stroke.idx --index strokes --range 5 8
+"""
+
+import bisect
+import json
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+MAGIC = b"YMKI"
+FORMAT_VERSION = 1
+
+
+# =============================================================================
+# Writer
+# =============================================================================
+
+def _pad4(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def _u32(values: Iterable[int]) -> bytes:
+    arr = array("I", values)
+    if arr.itemsize != 4:  # pragma: no cover - every supported platform has 4-byte I
+        arr = array("L", values)
+    return arr.tobytes()
+
+
+def write_indexes(output_path: Path, indexes: Dict[str, dict], metadata: Optional[dict] = None):
+    """
+    Write named indexes to one file.
+
+    `indexes` maps index name -> {key: iterable of int IDs}. Keys must be all
+    ints or all strs within one index. ID lists are written in the order
+    given, so callers choose sorted-by-ID or ranked order.
+    """
+    sections = []
+    header = {"metadata": metadata or {}, "indexes": {}}
+    offset = 0
+
+    for name, mapping in indexes.items():
+        keys = sorted(mapping)
+        key_type = "str" if keys and isinstance(keys[0], str) else "int"
+
+        if key_type == "int":
+            key_bytes = _u32(keys)
+        else:
+            blob = bytearray()
+            offsets = [0]
+            for key in keys:
+                blob += key.encode("utf-8")
+                offsets.append(len(blob))
+            key_bytes = _u32(offsets) + bytes(blob)
+        key_bytes = _pad4(key_bytes)
+
+        post_offsets = [0]
+        ids = []
+        for key in keys:
+            ids.extend(mapping[key])
+            post_offsets.append(len(ids))
+        posting_bytes = _u32(post_offsets) + _u32(ids)
+
+        header["indexes"][name] = {
+            "key_type": key_type,
+            "count": len(keys),
+            "ids": len(ids),
+            "keys_offset": offset,
+            "postings_offset": offset + len(key_bytes),
+        }
+        sections += [key_bytes, posting_bytes]
+        offset += len(key_bytes) + len(posting_bytes)
+
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    header_bytes += b" " * (-(12 + len(header_bytes)) % 4)
+
+    with open(output_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for section in sections:
+            f.write(section)
+
+
+# =============================================================================
+# Reader
+# =============================================================================
+
+class PostingIndex:
+    """One named index: sorted keys plus a posting list per key."""
+
+    def __init__(self, buf: memoryview, info: dict):
+        count = info["count"]
+        self.key_type = info["key_type"]
+        keys_at = info["keys_offset"]
+        post_at = info["postings_offset"]
+
+        if self.key_type == "int":
+            self._keys = buf[keys_at:keys_at + 4 * count].cast("I")
+        else:
+            offsets = buf[keys_at:keys_at + 4 * (count + 1)].cast("I")
+            blob = bytes(buf[keys_at + 4 * (count + 1):post_at])
+            self._keys = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(count)]
+
+        self._offsets = buf[post_at:post_at + 4 * (count + 1)].cast("I")
+        ids_at = post_at + 4 * (count + 1)
+        self._ids = buf[ids_at:ids_at + 4 * info["ids"]].cast("I")
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self):
+        return self._keys
+
+    def _postings(self, i: int) -> memoryview:
+        return self._ids[self._offsets[i]:self._offsets[i + 1]]
+
+    def get(self, key) -> memoryview:
+        """Posting list for an exact key (empty if absent)."""
+        i = bisect.bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._postings(i)
+        return self._ids[0:0]
+
+    def key_range(self, low, high) -> range:
+        """Positions of keys with low <= key <= high."""
+        return range(bisect.bisect_left(self._keys, low), bisect.bisect_right(self._keys, high))
+
+    def key_prefix(self, prefix: str) -> range:
+        """Positions of string keys starting with `prefix`."""
+        start = bisect.bisect_left(self._keys, prefix)
+        return range(start, bisect.bisect_left(self._keys, prefix + "\U0010ffff", lo=start))
+
+    def key_at(self, i: int):
+        return self._keys[i]
+
+    def postings_at(self, i: int) -> memoryview:
+        return self._postings(i)
+
+    def union_range(self, low, high) -> List[int]:
+        """Sorted union of the posting lists for every key in [low, high]."""
+        positions = self.key_range(low, high)
+        if not positions:
+            return []
+        start = self._offsets[positions.start]
+        end = self._offsets[positions.stop]
+        return sorted(self._ids[start:end])
+
+
+class IndexFile:
+    """Reader for files written by write_indexes(); loads the file once."""
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(f"{path} is not a Yomikae index file")
+        version, header_len = struct.unpack_from("<II", data, 4)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported index version {version} (expected {FORMAT_VERSION})")
+
+        self.header = json.loads(data[12:12 + header_len].decode("utf-8"))
+        self.metadata = self.header["metadata"]
+        buf = memoryview(data)[12 + header_len:]
+        self.indexes = {name: PostingIndex(buf, info)
+                        for name, info in self.header["indexes"].items()}
+
+    def __getitem__(self, name: str) -> PostingIndex:
+        return self.indexes[name]
+
+
+def intersect(a, b) -> List[int]:
+    """Intersection of two sorted ID sequences (linear merge)."""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) * 8 < len(b):
+        # Very unequal sizes: binary-search the short list into the long one
+        out = []
+        lo = 0
+        for x in a:
+            lo = bisect.bisect_left(b, x, lo)
+            if lo < len(b) and b[lo] == x:
+                out.append(x)
+        return out
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            out.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect a posting-list index file")
+    parser.add_argument("path", type=str, help="Index file")
+    parser.add_argument("--index", type=str, help="Index name")
+    parser.add_argument("--key", type=str, help="Exact key to look up")
+    parser.add_argument("--range", type=int, nargs=2, metavar=("LOW", "HIGH"),
+                        help="Inclusive int key range")
+    args = parser.parse_args()
+
+    index_file = IndexFile(Path(args.path))
+    if not args.index:
+        for name, info in index_file.header["indexes"].items():
+            print(f"{name}: {info['count']} {info['key_type']} keys, {info['ids']} postings")
+        return
+
+    index = index_file[args.index]
+    if args.key is not None:
+        key = int(args.key) if index.key_type == "int" else args.key
+        ids = list(index.get(key))
+    elif args.range:
+        ids = index.union_range(*args.range)
+    else:
+        ids = []
+    print(f"{len(ids)} IDs: {ids[:50]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Kana / Romaji Reading Normalization
+
+Japanese readings reach the pipeline in several shapes:
+    "てがみ (tegami)"   curated entries (kana + Hepburn with macrons)
+    "ビン／ベン"         JCKV 標準的読み方 (katakana, sometimes several)
+    "SHOKU JIKI"        Unihan kJapaneseOn / kJapaneseKun (upper-case romaji)
+    "てがみ"             JMdict <reb>
+
+Every reading is folded to one hiragana key (katakana -> hiragana, ー expanded
+to the vowel it lengthens) and one Hepburn romaji key ("benkyou"). Both are
+table-driven, and normalize_readings() converts whole columns with a memo.
+build_reading_index() turns (entry ID, readings) pairs into an inverted index
+that ships as JSON, so reading search is a dict lookup or a bisect on the
+sorted keys.
+
+Usage:
+    python kana.py "べんきょう (benkyō)" "マージャン" "SHOKU"
+"""
+
+import bisect
+import itertools
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Tuple
+
+
+# =============================================================================
+# Tables
+# =============================================================================
+
+# Katakana ァ..ヶ -> hiragana ぁ..ゖ
+KATAKANA_TO_HIRAGANA = {cp: cp - 0x60 for cp in range(0x30A1, 0x30F7)}
+HIRAGANA_TO_KATAKANA = {cp - 0x60: cp for cp in range(0x30A1, 0x30F7)}
+
+HIRAGANA_ROMAJI = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "ゐ": "i", "ゑ": "e", "を": "o", "ん": "n",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ゔ": "vu",
+    "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o",
+    "ゃ": "ya", "ゅ": "yu", "ょ": "yo", "ゎ": "wa", "ゕ": "ka", "ゖ": "ke",
+}
+
+# Extended digraphs used in loanwords
+_EXTRA_DIGRAPHS = {
+    "しぇ": "she", "ちぇ": "che", "じぇ": "je",
+    "ふぁ": "fa", "ふぃ": "fi", "ふぇ": "fe", "ふぉ": "fo",
+    "てぃ": "ti", "でぃ": "di", "とぅ": "tu", "どぅ": "du",
+    "うぃ": "wi", "うぇ": "we", "うぉ": "wo",
+    "ゔぁ": "va", "ゔぃ": "vi", "ゔぇ": "ve", "ゔぉ": "vo",
+}
+
+
+def _build_digraphs() -> dict:
+    digraphs = dict(_EXTRA_DIGRAPHS)
+    for kana in "きしちにひみりぎじぢびぴ":
+        stem = HIRAGANA_ROMAJI[kana][:-1]          # ki -> k, shi -> sh, ji -> j
+        if stem not in ("sh", "ch", "j"):
+            stem += "y"
+        for small, vowel in (("ゃ", "a"), ("ゅ", "u"), ("ょ", "o")):
+            digraphs[kana + small] = stem + vowel
+    return digraphs
+
+
+DIGRAPH_ROMAJI = _build_digraphs()
+
+VOWEL_KANA = {"a": "あ", "i": "い", "u": "う", "e": "え", "o": "お"}
+
+
+def _build_romaji_to_kana() -> dict:
+    table = {}
+    # Digraphs first, then singles; first spelling wins so standard kana
+    # (じ over ぢ, お over を) is preferred when romaji is ambiguous.
+    for kana, roma in list(DIGRAPH_ROMAJI.items()) + list(HIRAGANA_ROMAJI.items()):
+        if kana in "ぁぃぅぇぉゃゅょゎゕゖゐゑ":
+            continue
+        table.setdefault(roma, kana)
+    table["o"] = "お"
+    # Kunrei / wapuro alternatives
+    table.update({
+        "si": "し", "ti": "ち", "tu": "つ", "hu": "ふ", "zi": "じ", "di": "ぢ",
+        "du": "づ", "sya": "しゃ", "syu": "しゅ", "syo": "しょ", "tya": "ちゃ",
+        "tyu": "ちゅ", "tyo": "ちょ", "zya": "じゃ", "zyu": "じゅ", "zyo": "じょ",
+        "jya": "じゃ", "jyu": "じゅ", "jyo": "じょ", "wo": "を", "nn": "ん",
+    })
+    return table
+
+
+ROMAJI_TO_KANA = _build_romaji_to_kana()
+MAX_ROMAJI_LEN = max(len(k) for k in ROMAJI_TO_KANA)
+
+MACRONS = str.maketrans({"ā": "aa", "ī": "ii", "ū": "uu", "ē": "ee", "ō": "ou", "â": "aa",
+                         "î": "ii", "û": "uu", "ê": "ee", "ô": "ou"})
+
+# Spellings a long vowel written with a macron may have in the romaji keys
+MACRON_SPELLINGS = {"ā": ("aa",), "ī": ("ii",), "ū": ("uu",), "ē": ("ee", "ei"),
+                    "ō": ("ou", "oo"), "â": ("aa",), "î": ("ii",), "û": ("uu",),
+                    "ê": ("ee", "ei"), "ô": ("ou", "oo")}
+
+_KANA_RUN_RE = re.compile(r"[ぁ-ゖァ-ヺー]+")
+_ROMAJI_WORD_RE = re.compile(r"[A-Za-zāīūēōâîûêô']+")
+_ROMAJI_QUERY_RE = re.compile(r"[a-zāīūēōâîûêô'\- ]+")
+
+
+# =============================================================================
+# Conversion
+# =============================================================================
+
+def to_hiragana(text: str) -> str:
+    """
+    Fold kana to a hiragana key: half-width -> full-width, katakana ->
+    hiragana, and ー replaced by the vowel it lengthens.
+    """
+    text = unicodedata.normalize("NFKC", text).translate(KATAKANA_TO_HIRAGANA)
+    if "ー" not in text:
+        return text
+    out = []
+    for ch in text:
+        if ch == "ー" and out:
+            roma = HIRAGANA_ROMAJI.get(out[-1], "")
+            out.append(VOWEL_KANA.get(roma[-1:], "ー"))
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def to_katakana(text: str) -> str:
+    """Hiragana -> katakana (on'yomi are conventionally written in katakana)."""
+    return text.translate(HIRAGANA_TO_KATAKANA)
+
+
+def hiragana_to_romaji(text: str) -> str:
+    """Modified Hepburn without macrons (long vowels spelled out: "benkyou")."""
+    out = []
+    i = 0
+    geminate = False
+    while i < len(text):
+        pair = text[i:i + 2]
+        if pair in DIGRAPH_ROMAJI:
+            roma = DIGRAPH_ROMAJI[pair]
+            i += 2
+        elif text[i] == "っ":
+            geminate = True
+            i += 1
+            continue
+        else:
+            roma = HIRAGANA_ROMAJI.get(text[i], text[i])
+            i += 1
+        if geminate:
+            roma = ("t" + roma) if roma.startswith("ch") else (roma[0] + roma)
+            geminate = False
+        out.append(roma)
+    return "".join(out)
+
+
+def romaji_to_hiragana(text: str) -> str:
+    """Greedy table-driven romaji -> hiragana (accepts Hepburn, kunrei, macrons)."""
+    text = text.lower().translate(MACRONS)
+    out = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < len(text) else ""
+        # Doubled consonant (and "tch") -> small tsu
+        if ch == nxt and ch not in "aiueon" or (ch == "t" and text[i + 1:i + 3] == "ch"):
+            out.append("っ")
+            i += 1
+            continue
+        # Syllabic n before a consonant other than y, or at the end
+        if ch == "n" and (not nxt or nxt not in "aiueoy"):
+            out.append("ん")
+            # "nn" is one ん unless the second n starts a syllable (kanna)
+            after = text[i + 2:i + 3]
+            i += 2 if nxt == "'" or (nxt == "n" and after not in tuple("aiueoy")) else 1
+            continue
+        for length in range(min(MAX_ROMAJI_LEN, len(text) - i), 0, -1):
+            kana = ROMAJI_TO_KANA.get(text[i:i + length])
+            if kana:
+                out.append(kana)
+                i += length
+                break
+        else:
+            i += 1  # drop characters that are not romaji (apostrophes, hyphens)
+    return "".join(out)
+
+
+def romaji_query_keys(text: str) -> List[str]:
+    """
+    Romaji index keys a romaji query can stand for ([] if it is not romaji).
+
+    Keys are spelled as hiragana_to_romaji() writes them: lower case, no
+    macrons, apostrophes or hyphens. A macron vowel is ambiguous (ō is
+    おう "ou" in とうきょう but おお "oo" in おおきい), so every spelling
+    is returned: "tōkyō" -> toukyou, tookyou, toukyoo, tookyoo.
+    """
+    text = unicodedata.normalize("NFKC", text).lower().strip()
+    if not text or not _ROMAJI_QUERY_RE.fullmatch(text):
+        return []
+    text = re.sub(r"['\- ]", "", text)
+    options = [MACRON_SPELLINGS.get(ch, (ch,)) for ch in text]
+    return ["".join(spelling) for spelling in itertools.product(*options)]
+
+
+def extract_readings(text: str) -> List[str]:
+    """
+    Split a raw reading field into individual hiragana readings.
+
+    Kana runs are taken as-is ("ゆか (yuka) / とこ (toko)" -> ゆか, とこ);
+    fields with no kana are treated as romaji (Unihan "SHOKU JIKI").
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize("NFKC", text)
+    runs = _KANA_RUN_RE.findall(text)
+    if runs:
+        return [to_hiragana(r) for r in runs]
+    return [romaji_to_hiragana(w) for w in _ROMAJI_WORD_RE.findall(text)]
+
+
+def normalize_readings(values: List[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    """
+    Normalize a whole column of reading fields in one pass.
+
+    Returns parallel lists of hiragana keys and romaji keys per value.
+    Repeated values are converted once.
+    """
+    memo = {}
+    hiragana, romaji = [], []
+    for value in values:
+        result = memo.get(value)
+        if result is None:
+            kana = extract_readings(value or "")
+            result = memo[value] = (kana, [hiragana_to_romaji(k) for k in kana])
+        hiragana.append(result[0])
+        romaji.append(result[1])
+    return hiragana, romaji
+
+
+# =============================================================================
+# Reading Index
+# =============================================================================
+
+def build_reading_index(entries: Iterable[Tuple[str, List[str]]]) -> dict:
+    """
+    Build an inverted reading index from (entry_id, raw reading fields) pairs.
+
+    Returns {"hiragana": {key: [ids]}, "romaji": {key: [ids]}} with keys and
+    ID lists sorted, ready to be written with write_reading_index().
+    """
+    entries = list(entries)
+    flat_ids = []
+    flat_values = []
+    for entry_id, readings in entries:
+        for value in readings:
+            flat_ids.append(entry_id)
+            flat_values.append(value)
+
+    hiragana, romaji = normalize_readings(flat_values)
+
+    index = {"hiragana": {}, "romaji": {}}
+    for entry_id, kana_keys, roma_keys in zip(flat_ids, hiragana, romaji):
+        for key in kana_keys:
+            index["hiragana"].setdefault(key, set()).add(entry_id)
+        for key in roma_keys:
+            index["romaji"].setdefault(key, set()).add(entry_id)
+
+    return {
+        name: {key: sorted(ids) for key, ids in sorted(table.items())}
+        for name, table in index.items()
+    }
+
+
+def write_reading_index(index: dict, output_path: Path):
+    output = {
+        "version": 1,
+        "hiragana": index["hiragana"],
+        "romaji": index["romaji"],
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"  Wrote {output_path.name} ({len(index['hiragana'])} kana keys, "
+          f"{len(index['romaji'])} romaji keys)")
+
+
+class ReadingIndex:
+    """Reader for reading_index.json: exact and prefix lookups by kana or romaji."""
+
+    def __init__(self, path: Path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.tables = {"hiragana": data["hiragana"], "romaji": data["romaji"]}
+        self._sorted_keys = {name: list(table) for name, table in self.tables.items()}
+
+    @staticmethod
+    def _normalize(query: str) -> Tuple[str, List[str]]:
+        keys = romaji_query_keys(query)
+        if keys:
+            return "romaji", keys
+        return "hiragana", [to_hiragana(query)]
+
+    def lookup(self, query: str) -> List[str]:
+        table, keys = self._normalize(query)
+        found = []
+        for key in keys:
+            found.extend(i for i in self.tables[table].get(key, []) if i not in found)
+        return found
+
+    def prefix(self, query: str, limit: int = 50) -> List[Tuple[str, List[str]]]:
+        table, prefixes = self._normalize(query)
+        keys = self._sorted_keys[table]
+        matched = set()
+        for prefix in prefixes:
+            for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+                if not keys[i].startswith(prefix):
+                    break
+                matched.add(keys[i])
+        return [(key, self.tables[table][key]) for key in sorted(matched)[:limit]]
+
+
+if __name__ == "__main__":
+    import sys
+    for arg in sys.argv[1:]:
+        kana = extract_readings(arg)
+        print(f"{arg!r}: {kana} {[hiragana_to_romaji(k) for k in kana]}")
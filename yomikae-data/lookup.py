@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Lookup Library
+
+Importable read API over the pipeline outputs:
+
+    import lookup
+    lookup.lookup_character("学")
+    lookup.lookup_false_friend("勉強")           # headword, Chinese form or ID
+    for ff in lookup.iter_false_friends(severity="critical", source="jckv"):
+        ...
+
+Importing the module defines functions only: no data is read and only os,
+threading and typing are imported. The first query loads the data (the JSON
+outputs, or the memory-mapped output/yomikae.bin when they are missing or
+backend="binary" is configured), builds the key indexes once and keeps
+everything cached for the life of the process, including binary records
+once decoded. Returned entries are shared; treat them as read-only.
+
+Usage:
+    python lookup.py 勉強 学              # print entries
+    python lookup.py --benchmark         # import time, first-query and warm latency
+
+Data:
+    output/characters.json plus output/false_friends_merged.json (falling
+    back to false_friends_expanded.json), or output/yomikae.bin
+"""
+
+import os
+import threading
+from typing import Optional
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+BINARY_NAME = "yomikae.bin"
+CHARACTERS_NAME = "characters.json"
+FALSE_FRIENDS_NAMES = ["false_friends_merged.json", "false_friends_expanded.json"]
+
+SOURCE_BY_PREFIX = {"jckv": "jckv", "auto": "auto"}   # everything else is curated
+
+_config = {"data_dir": DATA_DIR, "backend": "auto"}
+_state = {}
+_lock = threading.Lock()
+
+
+def configure(data_dir: Optional[str] = None, backend: str = "auto"):
+    """
+    Point the library at another output directory or force a backend
+    ("auto", "json" or "binary"). Drops any data already loaded.
+    """
+    if backend not in ("auto", "json", "binary"):
+        raise ValueError(f"Unknown backend: {backend}")
+    with _lock:
+        if data_dir is not None:
+            _config["data_dir"] = data_dir
+        _config["backend"] = backend
+        _close()
+
+
+def reset():
+    """Forget cached data; the next query reloads it."""
+    with _lock:
+        _close()
+
+
+def _close():
+    store = _state.get("store")
+    if store is not None:
+        store.close()
+    _state.clear()
+
+
+def entry_source(entry: dict) -> str:
+    """Source of a false-friend entry; merged output encodes it in the ID prefix."""
+    if entry.get("source"):
+        return entry["source"]
+    return SOURCE_BY_PREFIX.get((entry.get("id") or "").split("_")[0], "curated")
+
+
+# =============================================================================
+# Loading
+# =============================================================================
+
+def _load_json(data_dir: str):
+    import json
+
+    characters = []
+    path = os.path.join(data_dir, CHARACTERS_NAME)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            characters = json.load(f)
+
+    false_friends = []
+    for name in FALSE_FRIENDS_NAMES:
+        path = os.path.join(data_dir, name)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            false_friends = data["false_friends"] if isinstance(data, dict) else data
+            break
+    return None, characters, false_friends
+
+
+def _load_binary(path: str):
+    from binary_store import open_store
+
+    store = open_store(path)
+    empty = []
+    return store, store.tables.get("characters", empty), store.tables.get("false_friends", empty)
+
+
+class _CachedTable:
+    """Binary RecordTable that decodes each record at most once."""
+
+    def __init__(self, table):
+        self.table = table
+        self.rows = [None] * len(table)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        row = self.rows[i]
+        if row is None:
+            row = self.rows[i] = self.table[i]
+        return row
+
+
+def _field_reader(table):
+    """Read one field of row i, without decoding the rest for binary tables."""
+    if isinstance(table, _CachedTable):
+        names = {name for name, _ in getattr(table.table, "fields", [])}
+        return lambda i, name: table.table.get_field(i, name) if name in names else None
+    return lambda i, name: table[i].get(name)
+
+
+def _data() -> dict:
+    state = _state
+    if state:
+        return state
+    with _lock:
+        if state:
+            return state
+        data_dir, backend = _config["data_dir"], _config["backend"]
+        binary_path = os.path.join(data_dir, BINARY_NAME)
+        have_json = any(os.path.exists(os.path.join(data_dir, name))
+                        for name in [CHARACTERS_NAME] + FALSE_FRIENDS_NAMES)
+        if backend == "binary" or (backend == "auto" and not have_json
+                                   and os.path.exists(binary_path)):
+            store, characters, false_friends = _load_binary(binary_path)
+            characters, false_friends = _CachedTable(characters), _CachedTable(false_friends)
+        else:
+            store, characters, false_friends = _load_json(data_dir)
+
+        char_field = _field_reader(characters)
+        char_index = {char_field(i, "character"): i for i in range(len(characters))}
+
+        ff_field = _field_reader(false_friends)
+        ff_index = {}
+        for i in range(len(false_friends)):
+            for name in ("id", "cn_characters", "characters"):  # headword wins on clashes
+                key = ff_field(i, name)
+                if key:
+                    ff_index[key] = i
+
+        state.update(store=store, characters=characters, false_friends=false_friends,
+                     char_index=char_index, ff_index=ff_index, ff_field=ff_field)
+        return state
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+def lookup_character(char: str) -> Optional[dict]:
+    """Character entry from characters.json, or None."""
+    data = _data()
+    i = data["char_index"].get(char)
+    return None if i is None else data["characters"][i]
+
+
+def lookup_false_friend(key: str) -> Optional[dict]:
+    """False friend by Japanese headword, Chinese form or ID, or None."""
+    data = _data()
+    i = data["ff_index"].get(key)
+    return None if i is None else data["false_friends"][i]
+
+
+def iter_false_friends(severity: Optional[str] = None, source: Optional[str] = None):
+    """Iterate false friends, optionally filtered by severity and/or source."""
+    data = _data()
+    table, field = data["false_friends"], data["ff_field"]
+    for i in range(len(table)):
+        if severity is not None and field(i, "severity") != severity:
+            continue
+        if source is not None and entry_source({"id": field(i, "id"),
+                                                "source": field(i, "source")}) != source:
+            continue
+        yield table[i]
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+_BENCH = """
+import sys, time, json
+t0 = time.perf_counter()
+import lookup
+t1 = time.perf_counter()
+lookup.configure(data_dir=sys.argv[1], backend=sys.argv[2])
+first = lookup.lookup_false_friend(sys.argv[3])
+t2 = time.perf_counter()
+keys = sys.argv[3:]
+n = 0
+while n < 20000:
+    for key in keys:
+        lookup.lookup_false_friend(key)
+        n += 1
+t3 = time.perf_counter()
+count = sum(1 for _ in lookup.iter_false_friends(severity="critical"))
+t4 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_ms": (t2 - t1) * 1000,
+                  "warm_us": (t3 - t2) / n * 1e6, "iter_ms": (t4 - t3) * 1000,
+                  "found": first is not None}))
+"""
+
+
+def run_benchmark(repeat: int = 5):
+    import json
+    import py_compile
+    import subprocess
+    import sys
+
+    # Measure a normal import from cached bytecode, not a source compile
+    # (PYTHONDONTWRITEBYTECODE would otherwise force one on every run)
+    py_compile.compile(os.path.abspath(__file__), doraise=True)
+    here = os.path.dirname(os.path.abspath(__file__))
+    backends = ["json"]
+    if os.path.exists(os.path.join(_config["data_dir"], BINARY_NAME)):
+        backends.append("binary")
+
+    _, _, sample = _load_json(_config["data_dir"])
+    keys = [ff["characters"] for ff in sample[::max(1, len(sample) // 50)]] or ["勉強"]
+
+    print(f"\n=== Lookup library benchmark (best of {repeat}) ===")
+    print(f"{'backend':10}{'import ms':>12}{'first query ms':>16}{'warm us':>10}{'iter ms':>10}")
+    for backend in backends:
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run([sys.executable, "-c", _BENCH, _config["data_dir"], backend, *keys],
+                                 capture_output=True, text=True, check=True, cwd=here)
+            runs.append(json.loads(out.stdout))
+        best = {k: min(r[k] for r in runs) for k in ("import_ms", "first_ms", "warm_us", "iter_ms")}
+        print(f"{backend:10}{best['import_ms']:>12.3f}{best['first_ms']:>16.2f}"
+              f"{best['warm_us']:>10.2f}{best['iter_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Look up characters and false friends")
+    parser.add_argument("keys", nargs="*", help="Characters, headwords or IDs")
+    parser.add_argument("--data-dir", type=str, help="Output directory to read")
+    parser.add_argument("--benchmark", action="store_true", help="Measure import and query latency")
+    parser.add_argument("--repeat", type=int, default=5, help="Benchmark repetitions")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        configure(args.data_dir)
+    if args.benchmark:
+        run_benchmark(args.repeat)
+    for key in args.keys:
+        entry = lookup_false_friend(key) or lookup_character(key)
+        print(json.dumps(entry, ensure_ascii=False, indent=2) if entry else f"{key}: not found")
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Local Lookup Service
+
+Read-only HTTP/JSON service over the compiled characters and merged false
+friends, for reviewing entries (e.g. the JCKV entries that need review)
+without grepping megabyte JSON files. Data is loaded and indexed once at
+startup; rendered responses are kept in an LRU cache and requests are
+served concurrently, one thread per connection.
+
+Endpoints (all GET, filters are combined with AND):
+    /false_friends?headword=&reading=&pinyin=&severity=&source=&needs_review=
+    /characters?character=&reading=&pinyin=
+    /health
+Every list endpoint takes offset= and limit= for pagination.
+
+Readings match kana or romaji, with or without macrons ("せいし", "seishi",
+"sēshi"); pinyin matches any tone form ("qi4che1", "qìchē", "qiche").
+Source is derived from the entry ID prefix (ff* = curated, jckv_ = jckv,
+auto_ = auto), since the merged file does not carry the source field.
+
+Usage:
+    python lookup_service.py                        # serve on 127.0.0.1:8765
+    python lookup_service.py --port 9000 --cache-size 4096
+    python lookup_service.py --load-test            # p50/p99 latency, req/s
+    python lookup_service.py --load-test --url http://127.0.0.1:8765
+"""
+
+import json
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from kana import normalize_readings, romaji_query_keys, to_hiragana
+from lookup import entry_source
+from pinyin import normalize_column, to_toneless
+
+
+# =============================================================================
+# Configuration
+# =============================================================================
+
+OUTPUT_DIR = Path("output")
+CHARACTERS_PATH = OUTPUT_DIR / "characters.json"
+# The file the app bundles; the expander's default output is the fallback
+FALSE_FRIENDS_PATHS = [OUTPUT_DIR / "false_friends_merged.json",
+                       OUTPUT_DIR / "false_friends_expanded.json"]
+
+HOST = "127.0.0.1"
+PORT = 8765
+CACHE_SIZE = 2048
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+REVIEW_SOURCES = {"jckv", "auto"}                      # imported with needs_review=True
+
+FALSE_FRIEND_FILTERS = ["headword", "reading", "pinyin", "severity", "source", "needs_review"]
+CHARACTER_FILTERS = ["character", "reading", "pinyin"]
+
+
+# =============================================================================
+# Data and Indexes
+# =============================================================================
+
+def _reading_keys(value: str) -> List[str]:
+    """Index keys for a reading query: kana, or every spelling of Hepburn romaji."""
+    return romaji_query_keys(value) or [to_hiragana(value)]
+
+
+def _add(index: Dict[str, List[int]], key: str, position: int):
+    postings = index.setdefault(key, [])
+    if not postings or postings[-1] != position:
+        postings.append(position)
+
+
+class LookupData:
+    """Characters and false friends plus per-filter inverted indexes (key -> positions)."""
+
+    def __init__(self, characters: list, false_friends: list):
+        self.characters = characters
+        self.false_friends = false_friends
+        self.indexes = {
+            "false_friends": self._index_false_friends(false_friends),
+            "characters": self._index_characters(characters),
+        }
+
+    @classmethod
+    def load(cls, characters_path: Path = CHARACTERS_PATH,
+             false_friends_path: Optional[Path] = None) -> "LookupData":
+        characters = []
+        if characters_path.exists():
+            with open(characters_path, "r", encoding="utf-8") as f:
+                characters = json.load(f)
+
+        if false_friends_path is None:
+            false_friends_path = next((p for p in FALSE_FRIENDS_PATHS if p.exists()), None)
+        false_friends = []
+        if false_friends_path and false_friends_path.exists():
+            with open(false_friends_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            # Expander output wraps the list; data_pipeline writes a bare list
+            false_friends = data["false_friends"] if isinstance(data, dict) else data
+
+        print(f"  Loaded {len(characters)} characters, {len(false_friends)} false friends")
+        return cls(characters, false_friends)
+
+    @staticmethod
+    def _index_false_friends(entries: list) -> dict:
+        index = {name: {} for name in FALSE_FRIEND_FILTERS}
+        kana_keys, roma_keys = normalize_readings([e.get("jp_reading", "") for e in entries])
+        toneless = [e.get("cn_pinyin_toneless") or t for e, t in
+                    zip(entries, normalize_column([e.get("cn_pinyin", "") for e in entries])[2])]
+
+        for i, entry in enumerate(entries):
+            _add(index["headword"], entry["characters"], i)
+            if entry.get("cn_characters"):
+                _add(index["headword"], entry["cn_characters"], i)
+            for key in kana_keys[i] + roma_keys[i]:
+                _add(index["reading"], key, i)
+            # JCKV alternatives ("zhuang4tai4; zhuang4 tai") become "a;b"
+            for key in toneless[i].replace("/", ";").split(";"):
+                if key.strip():
+                    _add(index["pinyin"], key.strip(), i)
+            _add(index["severity"], entry.get("severity", ""), i)
+            source = entry_source(entry)
+            _add(index["source"], source, i)
+            review = entry.get("needs_review", source in REVIEW_SOURCES)
+            _add(index["needs_review"], "true" if review else "false", i)
+        return index
+
+    @staticmethod
+    def _index_characters(entries: list) -> dict:
+        index = {name: {} for name in CHARACTER_FILTERS}
+        for i, entry in enumerate(entries):
+            _add(index["character"], entry["character"], i)
+            japanese = entry.get("japanese") or {}
+            readings = japanese.get("onyomi", []) + japanese.get("kunyomi", [])
+            kana_keys, roma_keys = normalize_readings(readings)
+            for keys in kana_keys + roma_keys:
+                for key in keys:
+                    _add(index["reading"], key, i)
+            chinese = entry.get("chinese") or {}
+            for key in chinese.get("pinyin_toneless") or normalize_column(chinese.get("pinyin", []))[2]:
+                if key:
+                    _add(index["pinyin"], key, i)
+        return index
+
+    def search(self, table: str, filters: Dict[str, str]) -> List[int]:
+        """Positions matching every filter, in file order."""
+        index = self.indexes[table]
+        rows = self.false_friends if table == "false_friends" else self.characters
+        result = None
+        for name, value in filters.items():
+            if name == "reading":
+                postings = {i for key in _reading_keys(value)
+                            for i in index["reading"].get(key, [])}
+            elif name == "pinyin":
+                postings = set(index["pinyin"].get(to_toneless(value) or value.lower(), []))
+            else:
+                postings = set(index[name].get(value, []))
+            result = postings if result is None else result & postings
+            if not result:
+                return []
+        return sorted(result) if result is not None else list(range(len(rows)))
+
+
+# =============================================================================
+# Service
+# =============================================================================
+
+class LookupService:
+    """Routes queries to LookupData and caches rendered responses."""
+
+    def __init__(self, data: LookupData, cache_size: int = CACHE_SIZE):
+        self.data = data
+        # lru_cache is thread-safe; the key is the normalized (route, params)
+        self.respond = lru_cache(maxsize=cache_size)(self._respond)
+
+    def handle(self, target: str):
+        """Return (status, body bytes) for a request target like /characters?pinyin=ma."""
+        parts = urlsplit(target)
+        params = tuple(sorted(parse_qsl(parts.query)))
+        if parts.path == "/health":
+            return 200, self._json({
+                "characters": len(self.data.characters),
+                "false_friends": len(self.data.false_friends),
+                "cache": self.respond.cache_info()._asdict(),
+            })
+        return self.respond(parts.path.rstrip("/"), params)
+
+    @staticmethod
+    def _json(payload) -> bytes:
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _respond(self, path: str, params: tuple):
+        table = path.lstrip("/")
+        if table not in self.data.indexes:
+            return 404, self._json({"error": f"Unknown endpoint: {path or '/'}"})
+
+        allowed = FALSE_FRIEND_FILTERS if table == "false_friends" else CHARACTER_FILTERS
+        filters = {}
+        offset, limit = 0, DEFAULT_LIMIT
+        try:
+            for name, value in params:
+                if name == "offset":
+                    offset = max(0, int(value))
+                elif name == "limit":
+                    limit = min(MAX_LIMIT, max(1, int(value)))
+                elif name in allowed:
+                    filters[name] = value
+                else:
+                    raise ValueError(f"Unknown parameter: {name}")
+        except ValueError as e:
+            return 400, self._json({"error": str(e)})
+
+        rows = self.data.false_friends if table == "false_friends" else self.data.characters
+        positions = self.data.search(table, filters)
+        return 200, self._json({
+            "total": len(positions),
+            "offset": offset,
+            "limit": limit,
+            "results": [rows[i] for i in positions[offset:offset + limit]],
+        })
+
+
+def make_handler(service: LookupService, verbose: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive for load tests and browsers
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def do_GET(self):
+            status, body = service.handle(self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def serve(data: LookupData, host: str = HOST, port: int = PORT,
+          cache_size: int = CACHE_SIZE, verbose: bool = False):
+    service = LookupService(data, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service, verbose))
+    server.daemon_threads = True
+    print(f"Serving on http://{host}:{server.server_address[1]} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped.")
+    finally:
+        server.server_close()
+
+
+# =============================================================================
+# Load Test
+# =============================================================================
+
+def load_test_targets(data: LookupData, count: int = 200) -> List[str]:
+    """A mix of request targets drawn from the loaded data."""
+    from urllib.parse import quote
+
+    targets = ["/false_friends?needs_review=true", "/false_friends?source=curated"]
+    for severity in ("critical", "important", "subtle"):
+        targets += [f"/false_friends?severity={severity}&offset={k * DEFAULT_LIMIT}"
+                    for k in range(3)]
+    step = max(1, len(data.false_friends) // count)
+    for entry in data.false_friends[::step]:
+        targets.append(f"/false_friends?headword={quote(entry['characters'])}")
+        if entry.get("jp_reading"):
+            targets.append(f"/false_friends?reading={quote(entry['jp_reading'].split()[0])}")
+        if entry.get("cn_pinyin"):
+            targets.append(f"/false_friends?pinyin={quote(entry['cn_pinyin'].split(';')[0])}")
+    step = max(1, len(data.characters) // count)
+    for entry in data.characters[::step]:
+        targets.append(f"/characters?character={quote(entry['character'])}")
+    return targets
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run_load_test(url: str, targets: List[str], requests: int = 5000, concurrency: int = 8):
+    """Hit `url` with `requests` GETs over `concurrency` keep-alive connections."""
+    import http.client
+
+    parts = urlsplit(url)
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def worker(worker_id: int):
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=10)
+        local = []
+        failed = 0
+        for k in range(worker_id, requests, concurrency):
+            start = time.perf_counter()
+            conn.request("GET", targets[k % len(targets)])
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+            if response.status != 200:
+                failed += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"\n=== Load test: {len(latencies)} requests, {concurrency} connections, "
+          f"{len(targets)} distinct targets ===")
+    print(f"  requests/sec: {len(latencies) / elapsed:,.0f}")
+    print(f"  p50 latency:  {_percentile(latencies, 50) * 1000:.3f} ms")
+    print(f"  p99 latency:  {_percentile(latencies, 99) * 1000:.3f} ms")
+    if latencies:
+        print(f"  max latency:  {latencies[-1] * 1000:.3f} ms")
+    print(f"  non-200:      {errors[0]}")
+
+
+def _start_server_process(port: int, server_args: List[str]):
+    """Run the service in a child process so client and server do not share a GIL."""
+    import subprocess
+    import urllib.request
+
+    proc = subprocess.Popen([sys.executable, str(Path(__file__).resolve()),
+                             "--port", str(port)] + server_args,
+                            stdout=subprocess.DEVNULL)
+    url = f"http://{HOST}:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1).read()
+            return proc, url
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("Lookup service did not start")
+
+
+# =============================================================================
+# Main
+# =============================================================================
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local read-only lookup service")
+    parser.add_argument("--host", type=str, default=HOST, help="Bind address")
+    parser.add_argument("--port", type=int, default=PORT, help="Port")
+    parser.add_argument("--characters", type=str, default=str(CHARACTERS_PATH),
+                        help="characters.json path")
+    parser.add_argument("--false-friends", type=str,
+                        help="Merged false friends JSON (default: output/false_friends_merged.json)")
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="LRU response cache entries")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    parser.add_argument("--load-test", action="store_true",
+                        help="Run a load test (starts a server unless --url is given)")
+    parser.add_argument("--url", type=str, help="Existing service to load-test")
+    parser.add_argument("--requests", type=int, default=5000, help="Load test request count")
+    parser.add_argument("--concurrency", type=int, default=8, help="Load test connections")
+    args = parser.parse_args()
+
+    data = LookupData.load(Path(args.characters),
+                           Path(args.false_friends) if args.false_friends else None)
+
+    if not args.load_test:
+        serve(data, args.host, args.port, args.cache_size, args.verbose)
+        return
+
+    proc = None
+    url = args.url
+    if not url:
+        server_args = ["--characters", args.characters, "--cache-size", str(args.cache_size)]
+        if args.false_friends:
+            server_args += ["--false-friends", args.false_friends]
+        proc, url = _start_server_process(args.port, server_args)
+    try:
+        run_load_test(url, load_test_targets(data), args.requests, args.concurrency)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+False-Friend Membership Filter
+
+A Bloom filter answering "could this token be a false friend?" without a
+database or JSON lookup. It covers every merged headword, its Chinese form,
+and their script variants (traditional / simplified / shinjitai, via
+output/variants.json when present), so a tapped token matches whichever
+script it is written in. A "no" is definite; a "yes" is wrong at most at
+the configured false-positive rate and is confirmed by the real lookup.
+
+File layout (little-endian):
+    magic "YKBF", u16 version, u16 hash count k, u32 key count n,
+    u64 bit count m, m / 8 bytes of bits (bit i = byte i >> 3, mask 1 << (i & 7))
+
+Hashing is 64-bit FNV-1a over the UTF-8 key followed by the MurmurHash3
+fmix64 finalizer (FNV alone mixes short CJK keys poorly and overshoots the
+target rate); probe i sets bit (h1 + i * h2) mod m with h1 = low 32 bits,
+h2 = high 32 bits | 1, so a reader in any language needs only multiplies,
+xors and shifts.
+
+Usage:
+    python membership.py                            # build from the merged JSON
+    python membership.py --fp-rate 0.001
+    python membership.py --benchmark                # Bloom vs dict vs SQLite
+
+Output:
+    output/false_friends.bloom
+"""
+
+import math
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+
+OUTPUT_DIR = Path("output")
+MEMBERSHIP_PATH = OUTPUT_DIR / "false_friends.bloom"
+SOURCE_PATHS = [OUTPUT_DIR / "false_friends_merged.json",
+                OUTPUT_DIR / "false_friends_expanded.json"]
+
+MAGIC = b"YKBF"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+
+DEFAULT_FP_RATE = 0.01
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+
+# =============================================================================
+# Keys
+# =============================================================================
+
+def membership_keys(false_friends: Iterable, variants=None) -> Set[str]:
+    """
+    Headwords, Chinese forms and their script variants.
+
+    Accepts FalseFriend objects or the dicts in the JSON outputs.
+    """
+    from variants import TABLE_NAMES
+
+    keys = set()
+    for ff in false_friends:
+        if isinstance(ff, dict):
+            forms = [ff.get("characters"), ff.get("cn_characters")]
+        else:
+            forms = [ff.characters, ff.cn_characters]
+        for form in forms:
+            if not form:
+                continue
+            keys.add(form)
+            if variants is not None:
+                keys.update(variants.convert(form, name) for name in TABLE_NAMES)
+    return keys
+
+
+# =============================================================================
+# Bloom filter
+# =============================================================================
+
+def key_hash(data: bytes) -> int:
+    """FNV-1a 64 with the fmix64 finalizer."""
+    h = FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * FNV_PRIME) & MASK_64
+    h ^= h >> 33
+    h = (h * 0xFF51AFD7ED558CCD) & MASK_64
+    h ^= h >> 33
+    h = (h * 0xC4CEB9FE1A85EC53) & MASK_64
+    return h ^ (h >> 33)
+
+
+class BloomFilter:
+    def __init__(self, bit_count: int, hash_count: int, bits: Optional[bytearray] = None,
+                 key_count: int = 0):
+        self.m = bit_count
+        self.k = hash_count
+        self.n = key_count
+        self.bits = bits if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, count: int, fp_rate: float = DEFAULT_FP_RATE) -> "BloomFilter":
+        """Optimal m and k for count keys at the target false-positive rate."""
+        if not 0 < fp_rate < 1:
+            raise ValueError(f"fp_rate must be between 0 and 1, got {fp_rate}")
+        count = max(count, 1)
+        m = max(64, math.ceil(-count * math.log(fp_rate) / math.log(2) ** 2))
+        m = (m + 7) // 8 * 8
+        k = max(1, round(m / count * math.log(2)))
+        return cls(m, k)
+
+    def _probes(self, key: str):
+        h = key_hash(key.encode("utf-8"))
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        m = self.m
+        return [(h1 + i * h2) % m for i in range(self.k)]
+
+    def add(self, key: str):
+        bits = self.bits
+        for i in self._probes(key):
+            bits[i >> 3] |= 1 << (i & 7)
+        self.n += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        for i in self._probes(key):
+            if not bits[i >> 3] & (1 << (i & 7)):
+                return False
+        return True
+
+    def expected_fp_rate(self) -> float:
+        return (1 - math.exp(-self.k * self.n / self.m)) ** self.k
+
+    def to_bytes(self) -> bytes:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, self.k, self.n, self.m) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "BloomFilter":
+        magic, version, k, n, m = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a membership filter file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported membership filter version {version} "
+                             f"(expected {FORMAT_VERSION})")
+        bits = bytearray(data[HEADER.size:HEADER.size + (m + 7) // 8])
+        if len(bits) != (m + 7) // 8:
+            raise ValueError(f"Truncated membership filter: {len(bits)} of {(m + 7) // 8} bytes")
+        return cls(m, k, bits, n)
+
+
+def build_filter(keys: Iterable[str], fp_rate: float = DEFAULT_FP_RATE) -> BloomFilter:
+    keys = sorted(set(keys))
+    bloom = BloomFilter.for_capacity(len(keys), fp_rate)
+    for key in keys:
+        bloom.add(key)
+    return bloom
+
+
+def write_membership(keys: Iterable[str], output_path: Path = MEMBERSHIP_PATH,
+                     fp_rate: float = DEFAULT_FP_RATE) -> BloomFilter:
+    bloom = build_filter(keys, fp_rate)
+    Path(output_path).write_bytes(bloom.to_bytes())
+    print(f"  Wrote {Path(output_path).name} ({bloom.n} keys, {len(bloom.bits)} bytes, "
+          f"k={bloom.k}, expected FP {bloom.expected_fp_rate():.4f})")
+    return bloom
+
+
+def load_membership(path: Path = MEMBERSHIP_PATH) -> BloomFilter:
+    return BloomFilter.from_bytes(Path(path).read_bytes())
+
+
+def load_source_false_friends() -> list:
+    import json
+
+    for path in SOURCE_PATHS:
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)["false_friends"]
+    return []
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def _absent_tokens(keys: Set[str], count: int, seed: int = 0) -> list:
+    """CJK tokens shaped like headwords but not in the key set."""
+    import random
+
+    rng = random.Random(seed)
+    lengths = sorted(len(k) for k in keys) or [2]
+    tokens = []
+    while len(tokens) < count:
+        token = "".join(chr(rng.randint(0x4E00, 0x9FFF)) for _ in range(rng.choice(lengths)))
+        if token not in keys:
+            tokens.append(token)
+    return tokens
+
+
+def run_benchmark(keys: Set[str], fp_rate: float = DEFAULT_FP_RATE, probes: int = 100_000):
+    import sqlite3
+    import tempfile
+    import time
+
+    bloom = build_filter(keys, fp_rate)
+    present = sorted(keys)
+    absent = _absent_tokens(keys, probes // 2)
+    # Tokenized text is mostly not false friends; half and half keeps both paths visible
+    queries = (present * (probes // 2 // len(present) + 1))[:probes // 2] + absent
+
+    table = {key: True for key in present}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = sqlite3.connect(str(Path(tmp) / "membership.sqlite"))
+        db.execute("CREATE TABLE headwords (word TEXT PRIMARY KEY) WITHOUT ROWID")
+        db.executemany("INSERT INTO headwords VALUES (?)", ((k,) for k in present))
+        db.commit()
+
+        def sqlite_contains(key, cursor=db.cursor()):
+            cursor.execute("SELECT 1 FROM headwords WHERE word = ?", (key,))
+            return cursor.fetchone() is not None
+
+        def rate(contains) -> tuple:
+            start = time.perf_counter()
+            hits = 0
+            for q in queries:
+                if contains(q):
+                    hits += 1
+            return len(queries) / (time.perf_counter() - start), hits
+
+        results = [
+            ("Bloom filter", rate(bloom.__contains__), len(bloom.to_bytes())),
+            ("dict", rate(table.__contains__), None),
+            ("SQLite (indexed)", rate(sqlite_contains), None),
+        ]
+        db.close()
+
+    false_positives = sum(1 for t in absent if t in bloom)
+    print(f"\n=== Membership benchmark ({len(keys)} keys, {len(queries)} probes, "
+          f"half absent) ===")
+    print(f"{'':20}{'lookups/s':>14}{'hits':>10}{'size bytes':>12}")
+    for name, (per_sec, hits), size in results:
+        print(f"{name:20}{per_sec:>14,.0f}{hits:>10}{size if size else '':>12}")
+    print(f"  Bloom: k={bloom.k}, m={bloom.m} bits, target FP {fp_rate}, "
+          f"measured FP {false_positives / len(absent):.4f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from variants import VARIANTS_PATH, VariantTables
+
+    parser = argparse.ArgumentParser(description="Build the false-friend membership filter")
+    parser.add_argument("--fp-rate", type=float, default=DEFAULT_FP_RATE,
+                        help="Target false-positive rate")
+    parser.add_argument("--output", type=str, default=str(MEMBERSHIP_PATH))
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare lookups/sec against dict and SQLite")
+    parser.add_argument("--probes", type=int, default=100_000)
+    args = parser.parse_args()
+
+    false_friends = load_source_false_friends()
+    if not false_friends:
+        raise SystemExit("No merged/expanded false friends JSON found in output/")
+    keys = membership_keys(false_friends, VariantTables.load(VARIANTS_PATH))
+    if args.benchmark:
+        run_benchmark(keys, args.fp_rate, args.probes)
+    else:
+        write_membership(keys, Path(args.output), args.fp_rate)
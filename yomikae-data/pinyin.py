@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Pinyin Normalization
+
+Converts pinyin between the three forms the pipeline sees:
+    marked    "nǐhǎo"    (curated entries, Unihan kMandarin)
+    numbered  "ni3 hao3" (CC-CEDICT, JCKV)
+    toneless  "nihao"    (search key; ü is written "v" as in pinyin IMEs)
+
+All syllable conversions are precomputed lookup tables built once at import,
+and normalize_column() converts whole columns with a per-value memo, so the
+pipeline can store every form and search never converts at query time.
+
+The marked form keeps the input's word spacing ("guai4 wo3" -> "guài wǒ",
+"yi4fan1" -> "yìfān"); the numbered form always spaces syllables, CEDICT
+style. Tokens that are not pinyin, such as the Latin letters in CEDICT's
+"A A zhi4" or "ka3 la1 O K", pass through unchanged.
+
+Usage:
+    python pinyin.py "ni3 hao3" "miǎnqiǎng" "yi4fan1"
+"""
+
+import re
+import unicodedata
+from typing import List, Tuple
+
+
+# =============================================================================
+# Syllable Tables
+# =============================================================================
+
+# Every standard Mandarin syllable without tone ("ü" spelled out), plus the
+# CEDICT erhua suffix "r".
+SYLLABLES = """
+a ai an ang ao
+ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi
+chong chou chu chua chuai chuan chuang chui chun chuo ci cong cou cu cuan cui
+cun cuo
+da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du
+duan dui dun duo
+e ei en eng er
+fa fan fang fei fen feng fo fou fu
+ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+ha hai han hang hao he hei hen heng hm hng hong hou hu hua huai huan huang hui
+hun huo
+ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long
+lou lu luan lun luo lü lüe
+m ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+n na nai nan nang nao ne nei nen neng ng ni nian niang niao nie nin ning niu
+nong nou nu nuan nun nuo nü nüe
+o ou
+pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+r ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng shi
+shou shu shua shuai shuan shuang shui shun shuo si song sou su suan sui sun suo
+ta tai tan tang tao te tei teng ti tian tiao tie ting tong tou tu tuan tui tun
+tuo
+wa wai wan wang wei wen weng wo wu
+xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen
+zheng zhi zhong zhou zhu zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu
+zuan zui zun zuo
+""".split()
+
+TONE_MARKS = {
+    "a": "āáǎàa", "e": "ēéěèe", "i": "īíǐìi",
+    "o": "ōóǒòo", "u": "ūúǔùu", "ü": "ǖǘǚǜü",
+}
+
+VOWELS = "aeiouü"
+
+
+def _mark_syllable(base: str, tone: int) -> str:
+    """Apply a tone mark following the standard placement rules."""
+    if tone == 5:
+        return base
+    if "a" in base:
+        target = base.index("a")
+    elif "e" in base:
+        target = base.index("e")
+    elif "ou" in base:
+        target = base.index("o")
+    else:
+        positions = [i for i, ch in enumerate(base) if ch in VOWELS]
+        if not positions:
+            return base  # syllabic m / n / ng / r carry no mark here
+        target = positions[-1]
+    return base[:target] + TONE_MARKS[base[target]][tone - 1] + base[target + 1:]
+
+
+def _build_tables():
+    numbered = {}   # "ni3" / "lu:4" / "lv4" -> ("ni", 3)
+    marked = {}     # "nǐ" / "ni" -> ("ni", 3) / ("ni", 5)
+    forms = {}      # ("ni", 3) -> ("nǐ", "ni3", "ni")
+
+    for base in SYLLABLES:
+        spellings = {base, base.replace("ü", "u:"), base.replace("ü", "v")}
+        if base in ("lüe", "nüe"):
+            spellings.add(base.replace("ü", "u"))  # unambiguous, common in JCKV
+        # Tone 5 first so toneless spellings of m/n/ng/r resolve to neutral
+        for tone in (5, 1, 2, 3, 4):
+            mark = _mark_syllable(base, tone)
+            forms[(base, tone)] = (mark, f"{base.replace('ü', 'u:')}{tone}", base.replace("ü", "v"))
+            marked.setdefault(mark, (base, tone))
+            for spelling in spellings:
+                numbered[f"{spelling}{tone}"] = (base, tone)
+        # "lu:" / "lv" with no tone digit
+        for spelling in spellings:
+            marked.setdefault(spelling, (base, 5))
+
+    return numbered, marked, forms
+
+
+NUMBERED_TABLE, MARKED_TABLE, SYLLABLE_FORMS = _build_tables()
+MAX_MARKED_LEN = max(len(k) for k in MARKED_TABLE)
+
+_NUMBERED_RE = re.compile(r"([a-zü:]+)([0-5]?)")
+_ALTERNATIVES_RE = re.compile(r"(\s*[;/]\s*)")
+_TOKEN_SPLIT_RE = re.compile(r"([\s'’\-·,，]+)")
+# Separators between words; apostrophes, hyphens and "·" join syllables of one word
+_WORD_BREAK_RE = re.compile(r"[\s,，]")
+
+
+# =============================================================================
+# Parsing
+# =============================================================================
+
+def _segment_marked(token: str):
+    """
+    Split an unspaced tone-marked token ("miǎnqiǎng") into syllables.
+
+    Uses the fewest-syllables segmentation that covers the whole token;
+    returns None when no segmentation exists.
+    """
+    n = len(token)
+    best = [None] * (n + 1)
+    best[n] = []
+    for i in range(n - 1, -1, -1):
+        for j in range(min(n, i + MAX_MARKED_LEN), i, -1):
+            syl = MARKED_TABLE.get(token[i:j])
+            if syl is not None and best[j] is not None:
+                candidate = [syl] + best[j]
+                if best[i] is None or len(candidate) < len(best[i]):
+                    best[i] = candidate
+    return best[0]
+
+
+def parse_pinyin(text: str) -> list:
+    """
+    Parse pinyin in any of the three forms.
+
+    Returns a list whose items are (base, tone, capitalized) syllables,
+    raw strings for tokens that are not pinyin (letters, "xx5", punctuation)
+    and None where a space separates two words.
+    """
+    # NFKC also folds full-width tone digits ("dang４")
+    text = unicodedata.normalize("NFKC", text.strip())
+    result = []
+    for k, token in enumerate(_TOKEN_SPLIT_RE.split(text)):
+        if k % 2:
+            if result and _WORD_BREAK_RE.search(token):
+                result.append(None)
+            continue
+        if not token:
+            continue
+        # Upper-case Latin letters ("A", "OK") are letters, never syllables
+        if token.isascii() and token.isalpha() and token.isupper():
+            result.append(token)
+            continue
+        cap = token[0].isupper()
+        lower = token.lower()
+
+        # Numbered: "syllable + digit" runs; JCKV uses 0 for the neutral
+        # tone and sometimes drops the digit on a trailing neutral syllable
+        if any(ch.isdigit() for ch in lower):
+            runs = _NUMBERED_RE.findall(lower)
+            syllables = []
+            if "".join(s + t for s, t in runs) == lower:
+                for letters, digit in runs:
+                    if digit:
+                        syllables.append(NUMBERED_TABLE.get(f"{letters}{digit if digit != '0' else '5'}"))
+                    else:
+                        syllables.extend(_segment_marked(letters.replace("u:", "ü")) or [None])
+            if syllables and all(syllables):
+                for k, (base, tone) in enumerate(syllables):
+                    result.append((base, tone, cap and k == 0))
+            else:
+                result.append(token)
+            continue
+
+        segmented = _segment_marked(lower.replace("v", "ü").replace("u:", "ü"))
+        if segmented:
+            for k, (base, tone) in enumerate(segmented):
+                result.append((base, tone, cap and k == 0))
+        else:
+            result.append(token)
+    while result and result[-1] is None:
+        result.pop()
+    return result
+
+
+def _forms_from_parsed(parsed: list) -> Tuple[str, str, str]:
+    marked_parts = []
+    numbered_parts = []
+    toneless_parts = []
+    new_word = False
+    for item in parsed:
+        if item is None:
+            new_word = True
+            continue
+        if isinstance(item, str):
+            marked_parts.append(" " + item if marked_parts else item)
+            numbered_parts.append(item)
+            toneless_parts.append(re.sub(r"\d$", "", item.lower()))
+            new_word = True
+            continue
+        base, tone, cap = item
+        mark, numbered, toneless = SYLLABLE_FORMS[(base, tone)]
+        if cap:
+            mark, numbered = mark.capitalize(), numbered.capitalize()
+        # Apostrophe before a/e/o-initial syllables inside a word (xī'ān)
+        if marked_parts and new_word:
+            mark = " " + mark
+        elif marked_parts and base[0] in "aeo":
+            mark = "'" + mark
+        new_word = False
+        marked_parts.append(mark)
+        numbered_parts.append(numbered)
+        toneless_parts.append(toneless)
+    return "".join(marked_parts), " ".join(numbered_parts), "".join(toneless_parts)
+
+
+# =============================================================================
+# Public API
+# =============================================================================
+
+def pinyin_forms(text: str) -> Tuple[str, str, str]:
+    """
+    Return (marked, numbered, toneless) for one pinyin string.
+
+    Alternative readings separated by ";" or "/" (JCKV) are converted
+    individually and rejoined with the same separator (with its spacing in
+    the marked form).
+    """
+    if not text:
+        return "", "", ""
+    parts = _ALTERNATIVES_RE.split(text)
+    if len(parts) == 1:
+        return _forms_from_parsed(parse_pinyin(text))
+    forms = ([], [], [])
+    for k, part in enumerate(parts):
+        if k % 2:
+            converted = (part, part.strip(), part.strip())
+        else:
+            converted = _forms_from_parsed(parse_pinyin(part))
+        for column, value in zip(forms, converted):
+            column.append(value)
+    return tuple("".join(column) for column in forms)
+
+
+def to_marked(text: str) -> str:
+    return pinyin_forms(text)[0]
+
+
+def to_numbered(text: str) -> str:
+    return pinyin_forms(text)[1]
+
+
+def to_toneless(text: str) -> str:
+    return pinyin_forms(text)[2]
+
+
+def normalize_column(values: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Convert a whole column of pinyin strings in one pass.
+
+    Returns parallel (marked, numbered, toneless) lists. Repeated values
+    (common in CEDICT, where traditional and simplified share a reading)
+    are converted once.
+    """
+    memo = {}
+    marked, numbered, toneless = [], [], []
+    for value in values:
+        forms = memo.get(value)
+        if forms is None:
+            forms = memo[value] = pinyin_forms(value or "")
+        marked.append(forms[0])
+        numbered.append(forms[1])
+        toneless.append(forms[2])
+    return marked, numbered, toneless
+
+
+if __name__ == "__main__":
+    import sys
+    for arg in sys.argv[1:]:
+        print(f"{arg!r}: {pinyin_forms(arg)}")
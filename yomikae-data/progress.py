@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Progress and Throughput Reporting
+
+One reporter for the long loops (Unihan/JMdict/CEDICT parsing, the JCKV
+conversion), so they show where they are instead of going silent for
+seconds, and so per-row errors are counted rather than printed one by one.
+
+    with Progress("CC-CEDICT", total=size, unit="B") as progress:
+        for line in f:
+            progress.update(len(line))
+            try:
+                ...
+            except ValueError as e:
+                progress.error(line_no, e)
+
+Modes (YOMIKAE_PROGRESS, or --progress on the CLIs):
+    auto  bar on a terminal, log otherwise (default)
+    bar   one self-overwriting line on stderr, redrawn at most BAR_INTERVAL
+    log   a plain stderr line every LOG_INTERVAL seconds
+    json  the same as JSON lines (event, label, done, total, rate, eta, errors)
+    off   nothing until the end-of-stage summary
+
+update() only compares a counter and a clock, so reporting costs nothing
+measurable in the loops. Errors are tallied by exception type; the first
+MAX_ERROR_SAMPLES are kept with their row and shown in the summary.
+
+Usage:
+    YOMIKAE_PROGRESS=json python data_pipeline.py --process
+
+Output:
+    stderr only
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+
+MODES = ["auto", "bar", "log", "json", "off"]
+MODE_ENV = "YOMIKAE_PROGRESS"
+
+BAR_INTERVAL = 0.2
+LOG_INTERVAL = 10.0
+BAR_WIDTH = 30
+MAX_ERROR_SAMPLES = 5
+
+
+def set_mode(mode: str):
+    """Select the reporting mode for this process and the workers it starts."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown progress mode {mode!r} (expected one of {MODES})")
+    os.environ[MODE_ENV] = mode
+
+
+def current_mode(stream=None) -> str:
+    mode = os.environ.get(MODE_ENV, "auto")
+    if mode not in MODES:
+        mode = "auto"
+    if mode == "auto":
+        stream = stream or sys.stderr
+        mode = "bar" if hasattr(stream, "isatty") and stream.isatty() else "log"
+    return mode
+
+
+def _format_count(value: float, unit: str) -> str:
+    if unit == "B":
+        for suffix in ("B", "KB", "MB", "GB"):
+            if value < 1024 or suffix == "GB":
+                return f"{value:.0f} {suffix}" if suffix == "B" else f"{value:.1f} {suffix}"
+            value /= 1024
+    return f"{value:,.0f} {unit}"
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+class Progress:
+    """Rate-limited progress, throughput and error counts for one loop."""
+
+    def __init__(self, label: str, total: Optional[int] = None, unit: str = "items",
+                 mode: Optional[str] = None, stream=None):
+        self.label = label
+        self.total = total
+        self.unit = unit
+        self.stream = stream or sys.stderr
+        self.mode = mode if mode and mode != "auto" else current_mode(self.stream)
+        self.interval = BAR_INTERVAL if self.mode == "bar" else LOG_INTERVAL
+        self.done = 0
+        self.error_counts: Dict[str, int] = {}
+        self.error_samples: List[str] = []
+        self.start = time.monotonic()
+        self._next_report = self.start + self.interval
+        self._finished = False
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.finish()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Counting
+    # -------------------------------------------------------------------------
+
+    def update(self, n: int = 1):
+        self.done += n
+        if self.mode != "off":
+            now = time.monotonic()
+            if now >= self._next_report:
+                self._next_report = now + self.interval
+                self._report("progress", now)
+
+    def error(self, item, error):
+        """Count a per-row failure; item identifies the row (index, headword)."""
+        kind = type(error).__name__ if isinstance(error, BaseException) else str(error)
+        self.error_counts[kind] = self.error_counts.get(kind, 0) + 1
+        if len(self.error_samples) < MAX_ERROR_SAMPLES:
+            self.error_samples.append(f"{item}: {error}")
+
+    @property
+    def error_total(self) -> int:
+        return sum(self.error_counts.values())
+
+    # -------------------------------------------------------------------------
+    # Reporting
+    # -------------------------------------------------------------------------
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        elapsed = (now or time.monotonic()) - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total and rate > 0:
+            eta = max(0.0, (self.total - self.done) / rate)
+        return {"label": self.label, "done": self.done, "total": self.total, "unit": self.unit,
+                "elapsed": round(elapsed, 3), "rate": round(rate, 1),
+                "eta": None if eta is None else round(eta, 1), "errors": self.error_total}
+
+    def _line(self, snap: dict) -> str:
+        done = _format_count(snap["done"], self.unit)
+        rate = _format_count(snap["rate"], self.unit) + "/s"
+        errors = f", {snap['errors']} errors" if snap["errors"] else ""
+        if self.total:
+            fraction = min(1.0, snap["done"] / self.total)
+            if self.mode == "bar":
+                filled = int(fraction * BAR_WIDTH)
+                bar = "#" * filled + "-" * (BAR_WIDTH - filled)
+                return (f"  {self.label} [{bar}] {fraction:6.1%} {rate}, "
+                        f"ETA {_format_duration(snap['eta'])}{errors}")
+            return (f"  {self.label}: {done} / {_format_count(self.total, self.unit)} "
+                    f"({fraction:.1%}), {rate}, ETA {_format_duration(snap['eta'])}{errors}")
+        return f"  {self.label}: {done}, {rate}{errors}"
+
+    def _report(self, event: str, now: Optional[float] = None):
+        snap = self.snapshot(now)
+        if self.mode == "json":
+            record = {"event": event, **snap}
+            if event == "done":
+                record["error_counts"] = self.error_counts
+                record["error_samples"] = self.error_samples
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif self.mode == "bar":
+            end = "\n" if event == "done" else ""
+            self.stream.write("\r" + self._line(snap).ljust(79) + end)
+        elif self.mode == "log" or event == "done":
+            self.stream.write(self._line(snap) + "\n")
+        self.stream.flush()
+
+    def finish(self):
+        """Final line with totals, plus the error summary if anything failed."""
+        if self._finished:
+            return
+        self._finished = True
+        if self.mode == "off" and not self.error_counts:
+            return
+        if self.mode != "off":
+            self._report("done")
+        if self.error_counts and self.mode != "json":
+            kinds = ", ".join(f"{kind} {count}" for kind, count in
+                              sorted(self.error_counts.items(), key=lambda kv: -kv[1]))
+            self.stream.write(f"  {self.label}: {self.error_total} rows failed ({kinds})\n")
+            for sample in self.error_samples:
+                self.stream.write(f"    {sample}\n")
+            if self.error_total > len(self.error_samples):
+                self.stream.write(f"    ... {self.error_total - len(self.error_samples)} more\n")
+            self.stream.flush()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Character Ranking
+
+The "most common first" order shared by everything that ranks compiled
+character entries: the load-priority shards (data_pipeline.py), the
+autocomplete entry IDs (autocomplete.py) and the homophone posting lists
+(homophones.py). Entries sort by frequency_rank, then stroke count, then
+the character itself so ties are stable across builds.
+
+Usage:
+    from ranking import commonness_key
+    ordered = sorted(characters, key=commonness_key)
+
+Output:
+    none
+"""
+
+
+# Rank and stroke count used when an entry has none
+UNRANKED = 99
+
+
+def commonness_key(entry: dict):
+    """Sort key: most common first (frequency rank, then fewest strokes)."""
+    rank = entry.get("frequency_rank") or UNRANKED
+    strokes = entry.get("stroke_count") or UNRANKED
+    return (rank, strokes, entry["character"])
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Scale-Test Harness
+
+Runs the full build.py stage graph on synthetic dictionaries at multiples
+of today's source sizes and reports how time and memory grow with input
+size, so superlinear stages show up before real data of that size does.
+
+Synthetic sources are written as the files the pipeline reads (Unihan.zip,
+JMdict_e.gz, the CC-CEDICT zip, the curated JSON and a Tatoeba-style
+sentence corpus under sources/), with valid pinyin, variant links,
+overlapping headword sets and CEDICT-like word lengths. 1x is:
+    Unihan 95k characters, JMdict 60k headwords, CEDICT 185k entries,
+    50 curated + 1,000 JCKV + 1,000 auto-detected false friends,
+    100k sentences
+Unihan characters are single code points, so Unihan stops growing at the
+~0.9M code points available (just under 10x). parse_jmdict keeps its first
+50,000 entries, as it does on real data.
+
+Every scale runs in its own interpreter under an address-space limit
+(RLIMIT_AS), working directory set to a scratch dir. Every stage in
+build.py runs in dependency order with the same calls the build makes
+(collectors, variant clusters, progress off), followed by the optional
+character shards and binary store. JCKV conversion needs the licensed
+spreadsheet and auto-detection's dictionary loaders are not implemented,
+so those two stages get the synthetic FalseFriend lists instead of being
+timed. A stage that hits the limit is reported as OOM and ends that scale.
+
+Per stage the harness records wall time and the peak RSS increase over the
+stage (VmHWM reset through /proc/self/clear_refs; tracemalloc peak where
+that is unavailable), prints a bar chart per stage, and fits the growth
+exponent on a log-log scale. Stages growing faster than n^--threshold
+(default 1.15) are flagged.
+
+Usage:
+    python scale_test.py                              # 1x, 2x, 5x, 10x under 4 GB
+    python scale_test.py --scales 1,10,100 --mem-limit 16384
+    python scale_test.py --unit 0.1 --json scale.json # smaller base, save results
+
+Output:
+    Tables and charts on stdout; raw measurements with --json
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+BASE_SIZES = {
+    "unihan": 95_000,
+    "jmdict": 60_000,
+    "cedict": 185_000,
+    "curated": 50,
+    "jckv": 1_000,
+    "auto": 1_000,
+    "sentences": 100_000,
+}
+
+# build.py stages fed synthetic results instead of running (see above)
+INJECTED_STAGES = {"convert_jckv": "jckv", "auto_detect": "auto"}
+
+DEFAULT_SCALES = [1, 2, 5, 10]
+DEFAULT_MEM_LIMIT_MB = 4096
+DEFAULT_THRESHOLD = 1.15
+
+# Stages faster than this at every scale are timer noise, not hot spots
+MIN_FLAG_MS = 20.0
+
+CJK_BASE = 0x4E00
+CJK_COUNT = 0x9FFF - 0x4E00 + 1
+# Code points for synthetic Unihan characters: the CJK blocks, then the
+# unassigned planes (starting at CJK_BASE, so single-character words overlap)
+UNIHAN_RANGES = [(0x4E00, 0x9FFF), (0x3400, 0x4DBF), (0x20000, 0x2A6DF), (0x2A700, 0x2EBEF),
+                 (0x30000, 0x3134F), (0x40000, 0xDFFFF), (0xF0000, 0x10FFFD)]
+# Every VARIANT_EVERY-th Unihan character gets a traditional/simplified pair
+VARIANT_EVERY = 20
+# parse_unihan's field names -> Unihan property
+UNIHAN_PROPERTIES = {
+    "pinyin": "kMandarin", "onyomi": "kJapaneseOn", "kunyomi": "kJapaneseKun",
+    "definition": "kDefinition", "strokes": "kTotalStrokes", "radical": "kRSUnicode",
+    "frequency": "kFrequency", "simplified": "kSimplifiedVariant",
+    "traditional": "kTraditionalVariant",
+}
+WORD_LENGTHS = [1] * 10 + [2] * 60 + [3] * 15 + [4] * 12 + [5] * 2 + [6]
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわん"
+SEVERITIES = ["critical", "important", "subtle"]
+CATEGORIES = ["true_divergence", "simplification_merge", "japanese_coinage", "scope_difference"]
+GLOSSES = ["study", "to force", "letter", "husband", "news", "love", "old", "walk",
+           "to run", "cheap", "hand", "paper", "soup", "car", "plan", "deal"]
+
+
+# =============================================================================
+# Synthetic data
+# =============================================================================
+
+def synthetic_word(i: int) -> str:
+    """Unique CJK string for id i; length follows a CEDICT-like distribution."""
+    length = WORD_LENGTHS[(i * 2654435761) % len(WORD_LENGTHS)]
+    chars = []
+    while i or not chars:
+        i, digit = divmod(i, CJK_COUNT)
+        chars.append(chr(CJK_BASE + digit))
+    # Pad with the zero digit so different ids never collide at one length
+    chars.extend(chr(CJK_BASE) * (length - len(chars)))
+    return "".join(reversed(chars))
+
+
+def unihan_chars(n: int):
+    """The first n synthetic Unihan characters (fewer if the code points run out)."""
+    count = 0
+    for low, high in UNIHAN_RANGES:
+        for cp in range(low, high + 1):
+            if count == n:
+                return
+            yield chr(cp)
+            count += 1
+
+
+def _syllables(rng: random.Random, count: int, numbered: bool) -> str:
+    from pinyin import SYLLABLES, to_marked
+
+    sylls = [f"{rng.choice(SYLLABLES)}{rng.randint(1, 5)}" for _ in range(count)]
+    return " ".join(sylls) if numbered else to_marked(" ".join(sylls))
+
+
+def _romaji(rng: random.Random, count: int) -> str:
+    from kana import hiragana_to_romaji
+
+    return hiragana_to_romaji("".join(rng.choice(KANA) for _ in range(count)))
+
+
+def _glosses(rng: random.Random, count: int) -> list:
+    return [f"{rng.choice(GLOSSES)} ({rng.randint(0, 999)})" for _ in range(count)]
+
+
+def synthetic_sources(scale: float, seed: int = 0) -> tuple:
+    """(unihan, jmdict, cedict) dicts as the parse_* functions return them."""
+    rng = random.Random(seed)
+    n_unihan = int(BASE_SIZES["unihan"] * scale)
+    n_jmdict = int(BASE_SIZES["jmdict"] * scale)
+    n_cedict = int(BASE_SIZES["cedict"] * scale)
+
+    # Id ranges overlap so roughly half of each source is shared
+    unihan = {}
+    for char in unihan_chars(n_unihan):
+        unihan[char] = {
+            "pinyin": _syllables(rng, 1, numbered=False),
+            "onyomi": _romaji(rng, rng.randint(1, 2)).upper(),
+            "kunyomi": " ".join(_romaji(rng, rng.randint(2, 4)) for _ in range(rng.randint(0, 2))),
+            "definition": rng.choice(GLOSSES),
+            "strokes": str(rng.randint(1, 30)),
+            "radical": f"{rng.randint(1, 214)}.{rng.randint(0, 20)}",
+            "frequency": str(rng.randint(1, 5)),
+        }
+    chars = list(unihan)
+    for i in range(0, len(chars) - 1, VARIANT_EVERY):
+        trad, simp = chars[i], chars[i + 1]
+        unihan[trad]["simplified"] = f"U+{ord(simp):04X}"
+        unihan[simp]["traditional"] = f"U+{ord(trad):04X}"
+
+    jmdict = {}
+    start = n_unihan // 2
+    for i in range(start, start + n_jmdict):
+        jmdict[synthetic_word(i)] = {
+            "readings": ["".join(rng.choice(KANA) for _ in range(3))],
+            "meanings": _glosses(rng, rng.randint(1, 5)),
+        }
+
+    cedict = {}
+    start = n_unihan // 4
+    for i in range(start, start + n_cedict):
+        word = synthetic_word(i)
+        entry = {
+            "traditional": word,
+            "simplified": word,
+            "pinyin": _syllables(rng, len(word), numbered=True),
+            "meanings": _glosses(rng, rng.randint(1, 5)),
+        }
+        cedict[word] = entry
+    from pinyin import normalize_column
+    entries = list(cedict.values())
+    marked, numbered, toneless = normalize_column([e["pinyin"] for e in entries])
+    for entry, mark, num, plain in zip(entries, marked, numbered, toneless):
+        entry["pinyin"] = mark
+        entry["pinyin_numbered"] = num
+        entry["pinyin_toneless"] = plain
+
+    return unihan, jmdict, cedict
+
+
+def synthetic_false_friends(scale: float, seed: int = 0) -> tuple:
+    """(curated, jckv, auto) FalseFriend lists with overlapping headwords."""
+    from expand_false_friends import FalseFriend
+
+    rng = random.Random(seed + 1)
+
+    def make(source: str, ids: range) -> list:
+        result = []
+        for i in ids:
+            word = synthetic_word(i)
+            result.append(FalseFriend(
+                id=f"{source}_{i:07d}",
+                characters=word,
+                type=rng.randint(1, 4),
+                category=rng.choice(CATEGORIES),
+                severity=rng.choice(SEVERITIES),
+                affects="both",
+                jp_reading="".join(rng.choice(KANA) for _ in range(len(word) * 2)),
+                jp_meanings=_glosses(rng, 3),
+                cn_pinyin=_syllables(rng, len(word), numbered=False),
+                cn_meanings_simplified=_glosses(rng, 3),
+                cn_meanings_traditional=_glosses(rng, 3),
+                explanation=" / ".join(_glosses(rng, 4)),
+                shared_meanings=_glosses(rng, 1),
+                jp_only_meanings=_glosses(rng, 2),
+                cn_only_meanings=_glosses(rng, 2),
+                source=source,
+            ))
+        return result
+
+    n_curated = int(BASE_SIZES["curated"] * scale)
+    n_jckv = int(BASE_SIZES["jckv"] * scale)
+    n_auto = int(BASE_SIZES["auto"] * scale)
+    auto = make("auto", range(0, n_auto))
+    jckv = make("jckv", range(n_auto // 2, n_auto // 2 + n_jckv))
+    curated = make("curated", range(n_auto // 2, n_auto // 2 + n_curated))
+    return curated, jckv, auto
+
+
+def write_sources(unihan: dict, jmdict: dict, cedict: dict, sources_dir: Path):
+    """Write the parsed-form dicts as the files parse_unihan/jmdict/cedict read."""
+    import gzip
+    import zipfile
+
+    sources_dir.mkdir(parents=True, exist_ok=True)
+    lines = [f"U+{ord(char):04X}\t{UNIHAN_PROPERTIES[name]}\t{value}\n"
+             for char, fields in unihan.items()
+             for name, value in fields.items() if value and name in UNIHAN_PROPERTIES]
+    with zipfile.ZipFile(sources_dir / "Unihan.zip", "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("Unihan_Readings.txt", "".join(lines))
+
+    with gzip.open(sources_dir / "JMdict_e.gz", "wt", encoding="utf-8") as f:
+        f.write("<JMdict>\n")
+        for word, entry in jmdict.items():
+            rebs = "".join(f"<r_ele><reb>{r}</reb></r_ele>" for r in entry["readings"])
+            glosses = "".join(f"<gloss>{g}</gloss>" for g in entry["meanings"])
+            f.write(f"<entry><k_ele><keb>{word}</keb></k_ele>{rebs}<sense>{glosses}</sense></entry>\n")
+        f.write("</JMdict>\n")
+
+    lines = [f"{e['traditional']} {e['simplified']} [{e['pinyin_numbered']}] "
+             f"/{'/'.join(e['meanings'])}/\n" for e in cedict.values()]
+    with zipfile.ZipFile(sources_dir / "cedict_1_0_ts_utf-8_mdbg.zip", "w",
+                         zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("cedict_ts.u8", "".join(lines))
+
+
+def write_corpus(headwords: list, n: int, sources_dir: Path, seed: int = 0):
+    """A sentences.csv / links.csv pair: jpn and cmn sentences around the headwords, each with an eng translation."""
+    rng = random.Random(seed + 2)
+    with open(sources_dir / "sentences.csv", "w", encoding="utf-8") as sentences, \
+            open(sources_dir / "links.csv", "w", encoding="utf-8") as links:
+        for i in range(n // 2):
+            sid = i * 2 + 1
+            lang = "jpn" if i % 2 else "cmn"
+            filler = "".join(chr(CJK_BASE + rng.randrange(CJK_COUNT)) for _ in range(rng.randint(2, 12)))
+            ending = "です。" if lang == "jpn" else "。"
+            sentences.write(f"{sid}\t{lang}\t{filler}{rng.choice(headwords)}{ending}\n")
+            sentences.write(f"{sid + 1}\teng\t{rng.choice(GLOSSES)}\n")
+            links.write(f"{sid}\t{sid + 1}\n")
+
+
+# =============================================================================
+# Measurement (child process)
+# =============================================================================
+
+def _status_kb(key: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1])
+    return 0
+
+
+def _reset_peak() -> bool:
+    """Reset VmHWM to the current RSS; False where the kernel does not allow it."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _measure(func):
+    """Run func(); return (result, seconds, peak MB above the starting RSS)."""
+    import gc
+    import tracemalloc
+
+    gc.collect()
+    use_hwm = _reset_peak()
+    if use_hwm:
+        base = _status_kb("VmRSS:")
+    else:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    if use_hwm:
+        peak_mb = max(0, _status_kb("VmHWM:") - base) / 1024
+    else:
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return result, elapsed, peak_mb
+
+
+def pipeline_stages() -> list:
+    """Stage names in the order run_scale() times them."""
+    import build
+
+    return [name for name in build.BuildRunner._toposort(build.STAGES)
+            if name not in INJECTED_STAGES]
+
+
+def run_scale(scale: float, out_dir: Path, seed: int = 0) -> dict:
+    """Generate inputs for one scale and run every build.py stage in dependency order."""
+    import contextlib
+    import io
+
+    out_dir = out_dir.resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # Every pipeline path (sources/, output/, build/) is relative to the cwd
+    os.chdir(out_dir)
+    import build
+    import data_pipeline
+    import progress
+    from expand_false_friends import save_false_friends
+
+    progress.set_mode("off")
+    build.CURATED_PATH = out_dir / "false_friends_curated.json"
+    data_pipeline.OUTPUT_DIR.mkdir(exist_ok=True)
+    report = {"scale": scale, "stages": {}, "sizes": {}}
+    state = {}
+    results = {}
+
+    def generate():
+        unihan, jmdict, cedict = synthetic_sources(scale, seed)
+        write_sources(unihan, jmdict, cedict, data_pipeline.SOURCES_DIR)
+        curated, state["jckv"], state["auto"] = synthetic_false_friends(scale, seed)
+        save_false_friends(curated, str(build.CURATED_PATH))
+        headwords = [ff.characters for ff in curated + state["jckv"] + state["auto"]]
+        write_corpus(headwords + list(jmdict)[:len(headwords)],
+                     int(BASE_SIZES["sentences"] * scale), data_pipeline.SOURCES_DIR, seed)
+        state["curated"] = curated
+        state["sentences"] = int(BASE_SIZES["sentences"] * scale)
+
+    def run(name: str):
+        stage = build.STAGES_BY_NAME[name]
+        return stage.func(*[results[dep] for dep in stage.deps])
+
+    quiet = io.StringIO()
+    stage = "generate"
+    try:
+        with contextlib.redirect_stdout(quiet):
+            _, seconds, peak = _measure(generate)
+            report["generate"] = {"seconds": seconds, "peak_mb": peak}
+            for name, key in INJECTED_STAGES.items():
+                results[name] = state[key]
+            for stage in pipeline_stages():
+                results[stage], seconds, peak = _measure(lambda: run(stage))
+                report["stages"][stage] = {"seconds": seconds, "peak_mb": peak}
+                quiet.seek(0)
+                quiet.truncate()
+    except MemoryError:
+        report["oom"] = stage
+    report["max_rss_mb"] = _status_kb("VmHWM:") / 1024
+    report["sizes"] = {
+        "unihan": len(results.get("parse_unihan", ())),
+        "jmdict": len(results.get("parse_jmdict", ())),
+        "cedict": len(results.get("parse_cedict", ())),
+        "curated": len(state.get("curated", ())),
+        "jckv": len(state.get("jckv", ())),
+        "auto": len(state.get("auto", ())),
+        "sentences": state.get("sentences", 0),
+        "characters": len(results.get("compile_characters", {}).get("characters", ())),
+    }
+    return report
+
+
+def _child_main(config: dict):
+    import resource
+
+    limit = config["mem_limit_mb"] * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    report = run_scale(config["scale"], Path(config["out_dir"]), config["seed"])
+    # Sizes were recorded before a possible OOM; the report itself is small
+    print(json.dumps(report))
+
+
+# =============================================================================
+# Driver and report
+# =============================================================================
+
+def run_harness(scales: list, mem_limit_mb: int, unit: float = 1.0, seed: int = 0,
+                out_dir: Path = None) -> list:
+    import tempfile
+
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="yomikae-scale-") as tmp:
+        for scale in scales:
+            config = {"scale": scale * unit, "mem_limit_mb": mem_limit_mb, "seed": seed,
+                      "out_dir": str((out_dir or Path(tmp)) / f"x{scale}")}
+            print(f"  Running {scale}x ({scale * unit:g} of base sizes, "
+                  f"limit {mem_limit_mb} MB)...", flush=True)
+            start = time.perf_counter()
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child",
+                                   json.dumps(config)],
+                                  capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+            lines = proc.stdout.strip().splitlines()
+            if proc.returncode != 0 or not lines:
+                # Killed before it could report (e.g. MemoryError while printing)
+                report = {"scale": scale * unit, "stages": {}, "sizes": {},
+                          "oom": "generate", "error": proc.stderr.strip().splitlines()[-1:]}
+            else:
+                report = json.loads(lines[-1])
+            report["multiple"] = scale
+            report["wall_seconds"] = time.perf_counter() - start
+            reports.append(report)
+            if report.get("oom"):
+                print(f"    OOM during {report['oom']}; skipping larger scales")
+                break
+    return reports
+
+
+def growth_exponent(points: list) -> float:
+    """Least-squares slope of log(value) against log(size)."""
+    import math
+
+    pts = [(math.log(x), math.log(y)) for x, y in points if x > 0 and y > 0]
+    if len(pts) < 2:
+        return float("nan")
+    mean_x = sum(x for x, _ in pts) / len(pts)
+    mean_y = sum(y for _, y in pts) / len(pts)
+    var = sum((x - mean_x) ** 2 for x, _ in pts)
+    if var == 0:
+        return float("nan")
+    return sum((x - mean_x) * (y - mean_y) for x, y in pts) / var
+
+
+def _bar(value: float, largest: float, width: int = 30) -> str:
+    if largest <= 0:
+        return ""
+    return "#" * max(1, round(value / largest * width)) if value > 0 else ""
+
+
+def _exponent(value: float) -> str:
+    return f"n^{value:.2f}" if value == value else "n/a"
+
+
+def print_report(reports: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """Print per-stage charts and return the flagged (stage, metric, exponent) list."""
+    print("\n=== Input sizes ===")
+    names = list(BASE_SIZES) + ["characters"]
+    print(f"{'scale':>7}" + "".join(f"{name:>12}" for name in names) + f"{'max RSS MB':>12}")
+    for r in reports:
+        sizes = r.get("sizes", {})
+        print(f"{r['multiple']:>6}x" + "".join(f"{sizes.get(n, 0):>12,}" for n in names)
+              + f"{r.get('max_rss_mb', 0):>12.0f}")
+
+    flagged = []
+    for stage in pipeline_stages():
+        rows = [(r["multiple"], r["stages"][stage]) for r in reports if stage in r["stages"]]
+        if not rows:
+            continue
+        max_ms = max(m["seconds"] for _, m in rows) * 1000
+        max_mb = max(m["peak_mb"] for _, m in rows)
+        print(f"\n=== {stage} ===")
+        print(f"{'scale':>7}{'time ms':>11}  {'':30}{'peak MB':>10}  {'':30}")
+        for multiple, m in rows:
+            ms = m["seconds"] * 1000
+            print(f"{multiple:>6}x{ms:>11.1f}  {_bar(ms, max_ms):30}"
+                  f"{m['peak_mb']:>10.1f}  {_bar(m['peak_mb'], max_mb):30}")
+
+        time_exp = growth_exponent([(x, m["seconds"]) for x, m in rows])
+        mem_exp = growth_exponent([(x, m["peak_mb"]) for x, m in rows])
+        notes = []
+        if time_exp == time_exp and time_exp > threshold and max_ms >= MIN_FLAG_MS:
+            flagged.append((stage, "time", time_exp))
+            notes.append("SUPERLINEAR TIME")
+        if mem_exp == mem_exp and mem_exp > threshold and max_mb >= 1:
+            flagged.append((stage, "memory", mem_exp))
+            notes.append("SUPERLINEAR MEMORY")
+        print(f"  growth: time ~ {_exponent(time_exp)}, memory ~ {_exponent(mem_exp)}"
+              + (f"  <-- {', '.join(notes)}" if notes else ""))
+
+    oom = [r for r in reports if r.get("oom")]
+    print("\n=== Summary ===")
+    for r in oom:
+        print(f"  {r['multiple']}x ran out of memory during {r['oom']}")
+    if flagged:
+        for stage, metric, exp in flagged:
+            print(f"  {stage}: {metric} grows as n^{exp:.2f} (threshold {threshold})")
+    else:
+        print(f"  No stage grows faster than n^{threshold}")
+    return flagged
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run pipeline stages on synthetic data at scale")
+    parser.add_argument("--scales", type=str, default=",".join(map(str, DEFAULT_SCALES)),
+                        help="Comma-separated multiples of today's source sizes")
+    parser.add_argument("--unit", type=float, default=1.0,
+                        help="Base size multiplier (e.g. 0.1 for a quick run)")
+    parser.add_argument("--mem-limit", type=int, default=DEFAULT_MEM_LIMIT_MB,
+                        help="Address-space limit per scale in MB")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Growth exponent above which a stage is flagged")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keep-output", type=str,
+                        help="Write stage outputs here instead of a temp dir")
+    parser.add_argument("--json", type=str, help="Also write raw measurements to this file")
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child_main(json.loads(args.child))
+        sys.exit(0)
+
+    scales = [float(s) if "." in s else int(s) for s in args.scales.split(",")]
+    print("\n" + "=" * 60)
+    print("SCALE TEST")
+    print("=" * 60)
+    results = run_harness(scales, args.mem_limit, args.unit, args.seed,
+                          Path(args.keep_output) if args.keep_output else None)
+    print_report(results, args.threshold)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"unit": args.unit, "mem_limit_mb": args.mem_limit,
+                       "base_sizes": BASE_SIZES, "results": results}, f, indent=2)
+        print(f"\nWrote {args.json}")
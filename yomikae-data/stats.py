@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Streaming Statistics
+
+One collector that the emitters feed record by record, so every count and
+histogram comes out of a pass that already happens instead of separate
+rescans of the output lists:
+
+    compile_false_friends / compile_characters   (data_pipeline.py)
+    write_swift_json / swift_document            (save_false_friends)
+    convert_jckv_database                        (its pattern/skip counters)
+
+add_false_friend() takes FalseFriend objects or the dicts data_pipeline
+builds; add_character() takes compiled character entries. Besides the
+totals stats.json always had (type, severity), the collector keeps
+source/category histograms, meanings-per-entry and gloss-length
+distributions, and per-character reading counts.
+
+Usage:
+    from stats import StatsCollector
+    stats = StatsCollector()
+    for ff in false_friends:
+        stats.add_false_friend(ff)
+    stats.stats_document({"unihan": 0, ...})
+
+Output:
+    none (write_stats() in data_pipeline.py writes output/stats.json)
+"""
+
+from collections import Counter
+from typing import Dict, Optional
+
+
+# Gloss lengths are bucketed to this many characters
+GLOSS_BUCKET = 10
+
+FF_TYPE_BUCKETS = {4: "type_4_critical", 3: "type_3_partial", 1: "type_1_2_expanded",
+                   2: "type_1_2_expanded"}
+SEVERITIES = ["critical", "important", "subtle"]
+
+
+def _field(record, name, default=None):
+    if isinstance(record, dict):
+        return record.get(name, default)
+    return getattr(record, name, default)
+
+
+class StatsCollector:
+    """Named counters and histograms, filled one record at a time."""
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.histograms: Dict[str, Counter] = {}
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] += n
+
+    def observe(self, histogram: str, value):
+        table = self.histograms.get(histogram)
+        if table is None:
+            table = self.histograms[histogram] = Counter()
+        table[value] += 1
+
+    def _observe_glosses(self, histogram: str, meanings):
+        self.observe(f"{histogram}_per_entry", len(meanings))
+        for meaning in meanings:
+            self.observe(f"{histogram}_gloss_length", len(meaning) // GLOSS_BUCKET * GLOSS_BUCKET)
+
+    def merge(self, other: "StatsCollector") -> "StatsCollector":
+        self.counters.update(other.counters)
+        for name, table in other.histograms.items():
+            self.histograms.setdefault(name, Counter()).update(table)
+        return self
+
+    # -------------------------------------------------------------------------
+    # Records
+    # -------------------------------------------------------------------------
+
+    def add_false_friend(self, ff):
+        self.counters["false_friends"] += 1
+        self.observe("ff_type", _field(ff, "type"))
+        self.observe("ff_severity", _field(ff, "severity"))
+        self.observe("ff_source", _field(ff, "source") or "unknown")
+        self.observe("ff_category", _field(ff, "category") or "unknown")
+        if _field(ff, "needs_review"):
+            self.counters["ff_needs_review"] += 1
+        self._observe_glosses("ff_jp_meanings", _field(ff, "jp_meanings") or [])
+        self._observe_glosses("ff_cn_meanings", _field(ff, "cn_meanings_simplified")
+                              or _field(ff, "cn_meanings") or [])
+
+    def add_character(self, entry: dict):
+        self.counters["characters"] += 1
+        if len(entry.get("character", "")) > 1:
+            self.counters["character_words"] += 1
+        japanese = entry.get("japanese") or {}
+        chinese = entry.get("chinese") or {}
+        self.observe("char_jp_readings",
+                     len(japanese.get("onyomi") or []) + len(japanese.get("kunyomi") or []))
+        self.observe("char_cn_readings", len(chinese.get("pinyin") or []))
+        self._observe_glosses("char_jp_meanings", japanese.get("meanings") or [])
+        self._observe_glosses("char_cn_meanings", chinese.get("meanings") or [])
+
+    # -------------------------------------------------------------------------
+    # Views
+    # -------------------------------------------------------------------------
+
+    def histogram(self, name: str) -> dict:
+        """A histogram in first-seen order (as printed by save_false_friends)."""
+        return dict(self.histograms.get(name, {}))
+
+    def distribution(self, name: str) -> dict:
+        """A numeric histogram with sorted, string keys for JSON."""
+        table = self.histograms.get(name, {})
+        return {str(k): table[k] for k in sorted(table)}
+
+    def false_friends_by_type(self) -> dict:
+        buckets = {name: 0 for name in dict.fromkeys(FF_TYPE_BUCKETS.values())}
+        for ff_type, n in self.histograms.get("ff_type", {}).items():
+            if ff_type in FF_TYPE_BUCKETS:
+                buckets[FF_TYPE_BUCKETS[ff_type]] += n
+        return buckets
+
+    def stats_document(self, source_counts: Optional[dict] = None,
+                       total_characters: Optional[int] = None) -> dict:
+        """The stats.json document: the original totals, then the distributions."""
+        severities = self.histograms.get("ff_severity", {})
+        return {
+            "total_characters": (self.counters["characters"] if total_characters is None
+                                 else total_characters),
+            "total_false_friends": self.counters["false_friends"],
+            "false_friends_by_type": self.false_friends_by_type(),
+            "false_friends_by_severity": {s: severities.get(s, 0) for s in SEVERITIES},
+            "sources_used": source_counts or {},
+            "false_friends_by_category": self.histogram("ff_category"),
+            "distributions": {
+                name: self.distribution(name)
+                for name in ["char_jp_readings", "char_cn_readings",
+                             "char_jp_meanings_per_entry", "char_cn_meanings_per_entry",
+                             "char_jp_meanings_gloss_length", "char_cn_meanings_gloss_length",
+                             "ff_jp_meanings_per_entry", "ff_cn_meanings_per_entry",
+                             "ff_jp_meanings_gloss_length", "ff_cn_meanings_gloss_length"]
+            },
+        }
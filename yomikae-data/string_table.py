@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+String-Table JSON Format
+
+Optional normalized form of the false friends JSON. JCKV entries repeat the
+same text many times (a meaning appears in jp_meanings, both cn_meanings_*
+lists, the shared/only lists and inside the explanation), and every record
+repeats every key. This format stores:
+
+    {"format": "yomikae-strtab", "version": 1,
+     "metadata_keys": ["metadata", "false_friends"],   # original key order
+     "metadata": {...},                 # copied unchanged
+     "list_field": "false_friends",
+     "fields": [["id", "s"], ["type", "v"], ["jp_meanings", "l"], ...],
+     "strings": ["...", ...],           # every distinct string, most used first
+     "records": [[0, 4, [12, 13], ...], ...]}
+
+Field kinds: "s" string -> index, "l" list of strings -> list of indices,
+"v" any other JSON value stored as-is. null stays null in every kind.
+Records whose keys differ from "fields" are stored as objects with the same
+per-field encoding. decode() restores the original document exactly, so
+json.dumps(decode(...), indent=2) matches save_false_friends byte for byte.
+
+Usage:
+    python string_table.py output/false_friends_expanded.json             # encode
+    python string_table.py output/false_friends_expanded.json --benchmark
+    python expand_false_friends.py ... --string-table   # alongside the normal output
+
+Output:
+    <input stem>.strtab.json
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+FORMAT = "yomikae-strtab"
+FORMAT_VERSION = 1
+
+# Top-level keys of the encoded form; document keys are copied next to them
+RESERVED_KEYS = {"format", "version", "metadata_keys", "list_field", "fields", "strings", "records"}
+
+
+# =============================================================================
+# Encoder
+# =============================================================================
+
+def _list_field(document) -> Optional[str]:
+    lists = [k for k, v in document.items() if isinstance(v, list)]
+    return lists[0] if len(lists) == 1 else None
+
+
+def _field_kinds(records: List[dict]) -> Dict[str, str]:
+    kinds = {}
+    for record in records:
+        for name, value in record.items():
+            if value is None:
+                kind = None
+            elif isinstance(value, str):
+                kind = "s"
+            elif isinstance(value, list) and all(isinstance(v, str) for v in value):
+                kind = "l"
+            else:
+                kind = "v"
+            previous = kinds.get(name)
+            if previous is None:
+                kinds[name] = kind
+            elif kind is not None and kind != previous:
+                kinds[name] = "v"
+    # Fields that were null everywhere: store as-is
+    return {name: kind or "v" for name, kind in kinds.items()}
+
+
+def encode(document: dict) -> dict:
+    """Encode a {"metadata": ..., "<records>": [...]} document."""
+    list_field = _list_field(document)
+    if list_field is None:
+        raise ValueError("Expected a document with exactly one list of records")
+    clashes = RESERVED_KEYS.intersection(k for k in document if k != list_field)
+    if clashes:
+        raise ValueError(f"Document keys clash with the string-table format: {sorted(clashes)}")
+    records = document[list_field]
+    kinds = _field_kinds(records)
+    fields = list(kinds)
+
+    counts = Counter()
+    for record in records:
+        for name, value in record.items():
+            if value is None:
+                continue
+            if kinds[name] == "s":
+                counts[value] += 1
+            elif kinds[name] == "l":
+                counts.update(value)
+    # Most frequent first so common strings get short indices; ties by
+    # first appearance keep the output deterministic
+    strings = [s for s, _ in sorted(counts.items(), key=lambda kv: -kv[1])]
+    index = {s: i for i, s in enumerate(strings)}
+
+    def encode_value(name, value):
+        if value is None:
+            return None
+        kind = kinds[name]
+        if kind == "s":
+            return index[value]
+        if kind == "l":
+            return [index[v] for v in value]
+        return value
+
+    encoded = []
+    for record in records:
+        if list(record) == fields:
+            encoded.append([encode_value(name, value) for name, value in record.items()])
+        else:
+            encoded.append({name: encode_value(name, value) for name, value in record.items()})
+
+    return {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "metadata_keys": list(document),
+        **{k: v for k, v in document.items() if k != list_field},
+        "list_field": list_field,
+        "fields": [[name, kinds[name]] for name in fields],
+        "strings": strings,
+        "records": encoded,
+    }
+
+
+# =============================================================================
+# Decoder
+# =============================================================================
+
+def decode(data: dict) -> dict:
+    """Rebuild the original document from encode() output."""
+    if data.get("format") != FORMAT:
+        raise ValueError("Not a string-table document")
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported string-table version {data.get('version')} "
+                         f"(expected {FORMAT_VERSION})")
+    strings = data["strings"]
+    plan = [tuple(field) for field in data["fields"]]
+    kinds = dict(plan)
+
+    records = []
+    for row in data["records"]:
+        if isinstance(row, dict):
+            record = {}
+            for name, value in row.items():
+                kind = kinds[name]
+                if value is None or kind == "v":
+                    record[name] = value
+                elif kind == "s":
+                    record[name] = strings[value]
+                else:
+                    record[name] = [strings[i] for i in value]
+        else:
+            record = {}
+            for (name, kind), value in zip(plan, row):
+                if value is None or kind == "v":
+                    record[name] = value
+                elif kind == "s":
+                    record[name] = strings[value]
+                else:
+                    record[name] = [strings[i] for i in value]
+        records.append(record)
+
+    list_field = data["list_field"]
+    return {key: records if key == list_field else data[key] for key in data["metadata_keys"]}
+
+
+def load(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return decode(json.load(f))
+
+
+def save(document: dict, path: Path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(encode(document), f, ensure_ascii=False, separators=(",", ":"))
+
+
+def strtab_path(path: Path) -> Path:
+    return path.with_name(f"{path.stem}.strtab.json")
+
+
+# =============================================================================
+# Benchmark
+# =============================================================================
+
+def run_benchmark(path: Path, repeat: int = 5):
+    import gzip
+    import time
+
+    original = path.read_bytes()
+    document = json.loads(original)
+    encoded = json.dumps(encode(document), ensure_ascii=False,
+                         separators=(",", ":")).encode("utf-8")
+    # Same document without indentation, to separate whitespace savings
+    # from string-table savings
+    compact = json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    # Round trip must reproduce the save_false_friends bytes
+    restored = json.dumps(decode(json.loads(encoded)), ensure_ascii=False, indent=2)
+    identical = restored.encode("utf-8") == original
+
+    def best(func) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    plain_ms = best(lambda: json.loads(original))
+    compact_ms = best(lambda: json.loads(compact))
+    table_ms = best(lambda: decode(json.loads(encoded)))
+    parse_ms = best(lambda: json.loads(encoded))
+
+    print(f"\n=== String-table format: {path.name} (best of {repeat}) ===")
+    print(f"{'':22}{'size KB':>10}{'gzip KB':>10}{'decode ms':>11}")
+    print(f"{'save_false_friends':22}{len(original) / 1024:>10.0f}"
+          f"{len(gzip.compress(original)) / 1024:>10.0f}{plain_ms:>11.2f}")
+    print(f"{'compact JSON':22}{len(compact) / 1024:>10.0f}"
+          f"{len(gzip.compress(compact)) / 1024:>10.0f}{compact_ms:>11.2f}")
+    print(f"{'string table':22}{len(encoded) / 1024:>10.0f}"
+          f"{len(gzip.compress(encoded)) / 1024:>10.0f}{table_ms:>11.2f}")
+    print(f"  (json.loads alone: {parse_ms:.2f} ms; "
+          f"{len(encode(document)['strings'])} distinct strings)")
+    print(f"  byte-identical round trip: {identical}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Encode false friends JSON with a string table")
+    parser.add_argument("path", type=str, help="save_false_friends output")
+    parser.add_argument("--benchmark", action="store_true", help="Compare size and decode time")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    source = Path(args.path)
+    if args.benchmark:
+        run_benchmark(source, args.repeat)
+    else:
+        with open(source, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        save(doc, strtab_path(source))
+        print(f"Wrote {strtab_path(source)}")
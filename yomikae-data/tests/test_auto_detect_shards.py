@@ -0,0 +1,72 @@
+"""Sharded auto-detection: any shard count reduces to the single-process result."""
+
+import random
+import zlib
+
+import pytest
+
+from auto_detect_shards import map_shard, part_path, reduce_shards, shard_of
+from expand_false_friends import rank_auto_candidates, score_shared_words
+
+
+GLOSSES = ["study", "force", "letter", "toilet paper", "husband", "lover", "news", "walk"]
+
+
+@pytest.fixture(scope="module")
+def meanings():
+    rng = random.Random(0)
+    jp, cn = {}, {}
+    for i in range(300):
+        word = chr(0x4E00 + i) + chr(0x4E00 + (i * 7) % 300)
+        jp[word] = rng.sample(GLOSSES, 2)
+        if i % 3:
+            cn[word] = rng.sample(GLOSSES, 2)
+    return jp, cn
+
+
+def _single_process(jp, cn, threshold=0.3):
+    return rank_auto_candidates(score_shared_words(jp, cn, jp.keys() & cn.keys(), threshold))
+
+
+@pytest.mark.parametrize("num_shards", [1, 3, 8, 500])
+def test_reduce_matches_single_process(meanings, tmp_path, num_shards, capsys):
+    jp, cn = meanings
+    for shard in range(num_shards):
+        map_shard(jp, cn, shard, num_shards, tmp_path)
+    assert reduce_shards(num_shards, tmp_path) == _single_process(jp, cn)
+    assert "Auto-detected" in capsys.readouterr().out
+
+
+def test_shard_of_is_stable():
+    # CRC-32, not hash(): the same bucket in every process and on every machine
+    for word in ("勉強", "手紙", "a"):
+        assert shard_of(word, 8) == zlib.crc32(word.encode("utf-8")) % 8
+    assert {shard_of(chr(0x4E00 + i), 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_missing_parts_and_bad_shards(meanings, tmp_path):
+    jp, cn = meanings
+    map_shard(jp, cn, 0, 2, tmp_path)
+    with pytest.raises(FileNotFoundError):
+        reduce_shards(2, tmp_path)
+    with pytest.raises(ValueError):
+        map_shard(jp, cn, 2, 2, tmp_path)
+
+
+def test_thresholds_must_agree(meanings, tmp_path):
+    jp, cn = meanings
+    map_shard(jp, cn, 0, 2, tmp_path, threshold=0.3)
+    map_shard(jp, cn, 1, 2, tmp_path, threshold=0.5)
+    with pytest.raises(ValueError):
+        reduce_shards(2, tmp_path)
+    map_shard(jp, cn, 1, 2, tmp_path, threshold=0.3)
+    with pytest.raises(ValueError):
+        reduce_shards(2, tmp_path, threshold=0.5)
+    assert reduce_shards(2, tmp_path, threshold=0.3) == _single_process(jp, cn)
+
+
+def test_parts_are_written_atomically(meanings, tmp_path):
+    jp, cn = meanings
+    path = map_shard(jp, cn, 0, 1, tmp_path)
+    assert path == part_path(tmp_path, 0, 1)
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
@@ -0,0 +1,83 @@
+"""Autocomplete index: ranked completions match a brute-force scan, hot prefixes included."""
+
+import random
+
+import pytest
+
+from autocomplete import (FIELDS, HOT_PREFIX_KEYS, MAX_COMPLETIONS, Autocomplete,
+                          build_autocomplete, write_autocomplete)
+from pinyin import SYLLABLES
+
+
+def _characters(count=400, seed=0):
+    rng = random.Random(seed)
+    kana = "あいうえおかきくけこさしすせそたちつてと"
+    characters = [
+        {"character": "学", "frequency_rank": 1, "stroke_count": 8,
+         "japanese": {"onyomi": ["ガク"], "kunyomi": ["まな.ぶ"]},
+         "chinese": {"pinyin_toneless": ["xue"]}},
+        {"character": "学生", "frequency_rank": 2, "stroke_count": None,
+         "japanese": None, "chinese": {"pinyin_toneless": ["xue sheng"]}},
+    ]
+    for i in range(count):
+        characters.append({
+            "character": chr(0x4E00 + i),
+            "frequency_rank": rng.choice([None, rng.randint(3, 5000)]),
+            "stroke_count": rng.randint(1, 20),
+            "japanese": {"onyomi": ["".join(rng.choice(kana) for _ in range(2))], "kunyomi": []},
+            "chinese": {"pinyin_toneless": [rng.choice(SYLLABLES)]},
+        })
+    return characters
+
+
+@pytest.fixture(scope="module")
+def built(tmp_path_factory):
+    characters = _characters()
+    path = tmp_path_factory.mktemp("autocomplete") / "autocomplete.idx"
+    write_autocomplete(characters, output_path=path)
+    indexes, _ = build_autocomplete(characters)
+    return Autocomplete(path), indexes
+
+
+def _brute_force(mapping, prefix, n):
+    ids = sorted({i for key, postings in mapping.items() if key.startswith(prefix)
+                  for i in postings})
+    return ids[:n]
+
+
+def test_matches_brute_force(built):
+    reader, indexes = built
+    assert any(indexes[f"{field}_top"] for field in FIELDS)  # some prefixes are hot
+    for field in FIELDS:
+        prefixes = {key[:n] for key in indexes[field] for n in range(1, len(key) + 1)}
+        for prefix in sorted(prefixes):
+            for n in (1, 10, MAX_COMPLETIONS, MAX_COMPLETIONS + 5):
+                assert reader._field_ids(field, prefix, n) == \
+                    _brute_force(indexes[field], prefix, n), (field, prefix, n)
+
+
+def test_hot_prefixes_are_the_large_ranges(built):
+    _, indexes = built
+    for field in FIELDS:
+        keys = indexes[field]
+        for prefix, top in indexes[f"{field}_top"].items():
+            assert sum(k.startswith(prefix) for k in keys) > HOT_PREFIX_KEYS
+            assert top == _brute_force(keys, prefix, MAX_COMPLETIONS)
+
+
+def test_queries_by_script(built):
+    reader, _ = built
+    assert reader.complete("学", 2) == [("学", 1), ("学生", 2)]
+    assert reader.complete("ガク", 1) == [("学", 1)]
+    assert reader.complete("まな", 1) == [("学", 1)]
+    assert reader.complete("xues", 1) == [("学生", 2)]
+    assert reader.complete("xué", 1)[0][0] == "学"
+    assert reader.complete("  ") == []
+    assert reader.complete("qqqq") == []
+
+
+def test_fields_for():
+    assert Autocomplete.fields_for("Xue Sheng") == [("romaji", "xuesheng"), ("pinyin", "xuesheng")]
+    assert Autocomplete.fields_for("ガク") == [("kana", "がく")]
+    assert Autocomplete.fields_for("ｘｕｅ") == [("romaji", "xue"), ("pinyin", "xue")]
+    assert Autocomplete.fields_for("学生") == [("character", "学生")]
@@ -0,0 +1,87 @@
+"""Binary store: write_store() / open_store() round trips and format checks."""
+
+import struct
+
+import pytest
+
+from binary_store import FORMAT_VERSION, infer_schema, open_store, write_store
+
+
+CHARACTERS = [
+    {"character": "学", "stroke_count": 8, "japanese": {"onyomi": ["ガク"], "jlpt_level": 5},
+     "chinese": {"pinyin": ["xué"], "simplified": None}, "false_friend_id": None},
+    {"character": "勉強", "stroke_count": None, "japanese": None,
+     "chinese": {"pinyin": ["miǎn qiǎng"], "simplified": "勉强"}, "false_friend_id": "ff_003"},
+    {"character": "空", "stroke_count": 8, "japanese": {"onyomi": [], "jlpt_level": None},
+     "chinese": {"pinyin": ["kōng", "kòng"], "simplified": None}, "false_friend_id": None},
+]
+FALSE_FRIENDS = [{"id": "ff_003", "characters": "勉強", "needs_review": False,
+                  "jp_meanings": ["study"]}]
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = tmp_path / "yomikae.bin"
+    write_store(path, {"characters": CHARACTERS, "false_friends": FALSE_FRIENDS},
+                metadata={"build": "test"})
+    with open_store(path) as store:
+        yield store
+
+
+def test_round_trip(store):
+    assert list(store["characters"]) == CHARACTERS
+    assert list(store["false_friends"]) == FALSE_FRIENDS
+    assert store.metadata == {"build": "test"}
+
+
+def test_random_access(store):
+    table = store["characters"]
+    assert len(table) == 3
+    assert table[-1] == CHARACTERS[-1]
+    assert table.get_field(1, "chinese.simplified") == "勉强"
+    assert table.get_field(1, "stroke_count") is None
+    with pytest.raises(IndexError):
+        table[3]
+
+
+def test_strings_and_lists_are_deduplicated(tmp_path):
+    records = [{"a": "same", "b": ["x", "y"]} for _ in range(100)]
+    path = tmp_path / "dedup.bin"
+    header = write_store(path, {"t": records})
+    assert header["strings"]["count"] == 3
+    assert header["lists"]["count"] == 2  # the shared empty list plus ["x", "y"]
+    with open_store(path) as store:
+        assert list(store["t"]) == records
+
+
+def test_empty_table(tmp_path):
+    path = tmp_path / "empty.bin"
+    write_store(path, {"characters": []})
+    with open_store(path) as store:
+        assert len(store["characters"]) == 0
+        assert list(store["characters"]) == []
+
+
+def test_schema_rejects_unsupported_values():
+    with pytest.raises(ValueError):
+        infer_schema([{"a": 1}, {"a": "one"}])
+    with pytest.raises(ValueError):
+        infer_schema([{"a": 0.5}])
+    with pytest.raises(ValueError):
+        infer_schema([{"a": [1, 2]}])
+    assert infer_schema([{"a": None}]) == [["a", "str"]]
+
+
+def test_rejects_other_files_and_versions(tmp_path):
+    other = tmp_path / "other.bin"
+    other.write_bytes(b"NOPE" + bytes(16))
+    with pytest.raises(ValueError):
+        open_store(other)
+
+    future = tmp_path / "future.bin"
+    write_store(future, {"t": [{"a": "b"}]})
+    data = bytearray(future.read_bytes())
+    struct.pack_into("<I", data, 4, FORMAT_VERSION + 1)
+    future.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        open_store(future)
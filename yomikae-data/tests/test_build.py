@@ -0,0 +1,82 @@
+"""build.py stage graph: staleness, optional outputs, JCKV guard and worker output."""
+
+import io
+
+import pytest
+
+import build
+import expand_false_friends as eff
+
+
+def _source(text):
+    return text
+
+
+def _upper(text):
+    return text.upper()
+
+
+def _graph(path):
+    return [build.Stage("source", lambda: path.read_text(encoding="utf-8"), inputs=[path]),
+            build.Stage("upper", _upper, deps=["source"])]
+
+
+def test_runner_skips_fresh_stages_and_reruns_on_input_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build, "BUILD_DIR", tmp_path / "build")
+    monkeypatch.setattr(build, "CACHE_DIR", tmp_path / "build" / "cache")
+    monkeypatch.setattr(build, "STATE_PATH", tmp_path / "build" / "state.json")
+    source = tmp_path / "source.txt"
+    source.write_text("a", encoding="utf-8")
+
+    runner = build.BuildRunner(_graph(source), in_process=True)
+    assert set(runner.run()) == {"source", "upper"}
+    assert runner.results["upper"] == "A"
+
+    runner = build.BuildRunner(_graph(source), in_process=True)
+    assert runner.run() == {}
+
+    source.write_text("b", encoding="utf-8")
+    runner = build.BuildRunner(_graph(source), in_process=True)
+    assert set(runner.run()) == {"source", "upper"}
+    assert runner.results["upper"] == "B"
+
+
+def test_cycles_and_unknown_deps_are_rejected():
+    with pytest.raises(ValueError):
+        build.BuildRunner._toposort([build.Stage("a", _source, deps=["b"]),
+                                     build.Stage("b", _source, deps=["a"])])
+    with pytest.raises(ValueError):
+        build.BuildRunner._toposort([build.Stage("a", _source, deps=["missing"])])
+
+
+def test_optional_outputs_are_built_only_when_asked():
+    default = build.default_targets([])
+    assert "emit_shards" not in default and "emit_binary" not in default
+    assert "emit_characters" in default
+    assert "emit_binary" in build.default_targets(["binary"])
+    assert "emit_shards" not in build.default_targets(["binary"])
+
+
+def test_convert_jckv_refuses_to_run_without_openpyxl(tmp_path, monkeypatch):
+    workbook = tmp_path / "JKVC.xlsx"
+    workbook.write_bytes(b"")
+    monkeypatch.setattr(build, "JCKV_PATH", workbook)
+    monkeypatch.setattr(eff, "HAS_OPENPYXL", False)
+    with pytest.raises(ImportError):
+        build.stage_convert_jckv({})
+
+
+def test_convert_jckv_without_workbook_is_empty(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "JCKV_PATH", tmp_path / "missing.xlsx")
+    assert build.stage_convert_jckv({}) == []
+
+
+def test_stage_output_tags_whole_lines():
+    stream = io.StringIO()
+    out = build._StageOutput(stream, "emit_stats")
+    out.write("  Wrote ")
+    out.write("stats.json\n  second")
+    assert stream.getvalue() == "[emit_stats]   Wrote stats.json\n"
+    out.close()
+    assert stream.getvalue().endswith("[emit_stats]   second\n")
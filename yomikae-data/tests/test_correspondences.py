@@ -0,0 +1,85 @@
+"""Sound correspondences: feature extraction, weighted counts and backend agreement."""
+
+import json
+
+import pytest
+
+import correspondences
+from correspondences import analyze, onyomi_features, pinyin_features, reading_pairs
+
+
+def _char(char, onyomi, pinyin):
+    return {"character": char, "japanese": {"onyomi": onyomi},
+            "chinese": {"pinyin_toneless": pinyin}}
+
+
+CHARACTERS = [
+    _char("先", ["セン"], ["xian"]),
+    _char("山", ["サン", "セン"], ["shan"]),
+    _char("中", ["チュウ"], ["zhong"]),
+    _char("東", ["トウ"], ["dong"]),
+    _char("学", ["ガク"], ["xue"]),
+    _char("行", ["コウ", "ギョウ"], ["xing", "hang"]),
+    _char("学生", ["ガクセイ"], ["xuesheng"]),  # words are skipped
+    _char("々", [], ["x"]),                      # no on'yomi
+]
+
+
+@pytest.mark.parametrize("reading, expected", [
+    ("きょう", ("ky-", "-ウ")), ("がく", ("g-", "-ク")), ("せん", ("s-", "-ン")),
+    ("あ", ("∅-", "-∅")), ("しゅつ", ("sh-", "-ツ")), ("", None),
+])
+def test_onyomi_features(reading, expected):
+    assert onyomi_features(reading) == expected
+
+
+@pytest.mark.parametrize("syllable, expected", [
+    ("zhong", ("zh-", "-ng")), ("xian", ("x-", "-n")), ("shui", ("sh-", "-i")),
+    ("hao", ("h-", "-u")), ("er", ("∅-", "-r")), ("zhi", ("zh-", "-∅")),
+    ("lv", ("l-", "-∅")), ("n", ("∅-", "-n")), ("", None),
+])
+def test_pinyin_features(syllable, expected):
+    assert pinyin_features(syllable) == expected
+
+
+def test_pairs_spread_one_unit_per_character():
+    pairs = list(reading_pairs(CHARACTERS))
+    assert [char for char, _ in pairs] == ["先", "山", "中", "東", "学", "行"]
+    tables = correspondences.build_tables(pairs, "python")
+    for table in tables.values():
+        assert table.total == pytest.approx(len(pairs))
+    coda = tables["coda"]
+    # 先 (1) + 山 (2 pairs x 0.5) all -ン ~ -n
+    assert coda.counts[coda.row_index["-ン"]][coda.col_index["-n"]] == pytest.approx(2.0)
+    assert coda.p_col_given_row("-ウ", "-ng") == pytest.approx(1.0)
+
+
+def test_scores_pick_the_best_pair():
+    result = analyze(CHARACTERS, "python")
+    assert result["metadata"]["characters"] == 6
+    assert result["characters"]["中"]["regular"]
+    assert result["characters"]["行"]["onyomi"] in ("コウ", "ギョウ")
+    assert result["characters"]["行"]["pinyin"] in ("xing", "hang")
+    assert "学生" not in result["characters"]
+
+
+def test_empty_input():
+    result = analyze([], "python")
+    assert result["characters"] == {} and result["correspondences"] == []
+
+
+@pytest.mark.skipif(not correspondences.HAS_NUMPY, reason="NumPy not installed")
+def test_numpy_and_python_backends_agree(capsys):
+    from scale_test import synthetic_sources
+    import data_pipeline
+
+    characters = data_pipeline.compile_characters(*synthetic_sources(0.005))
+    assert correspondences.check_backends(characters + CHARACTERS)
+    assert analyze([], "numpy") == analyze([], "python")
+    capsys.readouterr()
+
+
+def test_artifact_is_written(tmp_path):
+    path = tmp_path / "reading_correspondences.json"
+    result = correspondences.write_correspondences(CHARACTERS, path, backend="python")
+    assert json.loads(path.read_text(encoding="utf-8")) == json.loads(json.dumps(result))
@@ -0,0 +1,125 @@
+"""Delta packages: make_delta() / apply_delta() reproduce the next build byte for byte."""
+
+import json
+
+import pytest
+
+import delta
+
+
+def _write(directory, name, document, **kwargs):
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(json.dumps(document, ensure_ascii=False, **kwargs),
+                                  encoding="utf-8")
+
+
+def _round_trip(tmp_path, package):
+    path = tmp_path / "update.ydelta"
+    delta.write_delta(package, path)
+    out = tmp_path / "applied"
+    delta.apply_delta(tmp_path / "old", delta.read_delta(path), out)
+    return out
+
+
+def _assert_same_build(left, right):
+    assert delta.artifact_hashes(left) == delta.artifact_hashes(right)
+
+
+def _characters(*chars):
+    return [{"character": c, "stroke_count": i + 1} for i, c in enumerate(chars)]
+
+
+def test_record_edits_round_trip(tmp_path):
+    old, new = tmp_path / "old", tmp_path / "new"
+    _write(old, "characters.json", _characters("一", "二", "三", "四"), indent=2)
+    records = _characters("一", "二", "五", "四")
+    records[0]["stroke_count"] = 9
+    _write(new, "characters.json", records, indent=2)
+
+    package = delta.make_delta(old, new)
+    artifact = package["artifacts"]["characters.json"]
+    assert artifact["mode"] == "records"
+    assert artifact["removed"] == ["三"]
+    assert [r["character"] for r in artifact["updated"]] == ["一"]
+    assert artifact["added"] == [[2, records[2]]]
+    assert artifact["order"] is None
+    _assert_same_build(_round_trip(tmp_path, package), new)
+
+
+def test_wrapped_documents_and_reordering(tmp_path):
+    old, new = tmp_path / "old", tmp_path / "new"
+    entries = [{"id": f"ff_{i:03d}", "characters": c} for i, c in enumerate("学生先")]
+    _write(old, "false_friends.json", {"metadata": {"count": 3}, "false_friends": entries},
+           separators=(",", ":"))
+    _write(new, "false_friends.json", {"false_friends": entries[::-1], "metadata": {"count": 3}},
+           separators=(",", ":"))
+
+    package = delta.make_delta(old, new)
+    artifact = package["artifacts"]["false_friends.json"]
+    assert artifact["mode"] == "records"
+    assert artifact["order"] == ["ff_002", "ff_001", "ff_000"]
+    _assert_same_build(_round_trip(tmp_path, package), new)
+
+
+def test_value_type_and_key_order_changes_are_updates(tmp_path):
+    old, new = tmp_path / "old", tmp_path / "new"
+    _write(old, "characters.json", [{"character": "一", "rank": 1, "x": True}], indent=2)
+    _write(new, "characters.json", [{"character": "一", "rank": 1.0, "x": 1}], indent=2)
+    _round_trip(tmp_path, delta.make_delta(old, new))
+
+    _write(new, "characters.json", [{"x": True, "rank": 1, "character": "一"}], indent=2)
+    _assert_same_build(_round_trip(tmp_path, delta.make_delta(old, new)), new)
+
+
+def test_unreproducible_files_ship_whole(tmp_path):
+    old, new = tmp_path / "old", tmp_path / "new"
+    _write(old, "characters.json", _characters("一"), indent=2)
+    _write(new, "characters.json", _characters("一", "一"), indent=2)  # duplicate keys
+    _write(new, "false_friends.json", [{"id": "ff_001"}], indent=3)     # new file
+
+    package = delta.make_delta(old, new)
+    assert package["artifacts"]["characters.json"]["mode"] == "replace"
+    assert package["artifacts"]["false_friends.json"]["mode"] == "replace"
+    _assert_same_build(_round_trip(tmp_path, package), new)
+
+    # And back: the new file is deleted again
+    back = delta.make_delta(new, old)
+    assert back["artifacts"]["false_friends.json"] == {"mode": "delete"}
+    out = tmp_path / "back"
+    delta.apply_delta(new, back, out)
+    _assert_same_build(out, old)
+
+
+def test_apply_rejects_wrong_base(tmp_path):
+    old, new, other = tmp_path / "old", tmp_path / "new", tmp_path / "other"
+    _write(old, "characters.json", _characters("一"), indent=2)
+    _write(new, "characters.json", _characters("一", "二"), indent=2)
+    _write(other, "characters.json", _characters("三"), indent=2)
+    package = delta.make_delta(old, new)
+    with pytest.raises(ValueError):
+        delta.apply_delta(other, package, tmp_path / "out")
+
+
+def test_read_delta_rejects_other_files(tmp_path):
+    path = tmp_path / "bogus.ydelta"
+    delta.write_delta({"format": "something-else"}, path)
+    with pytest.raises(ValueError):
+        delta.read_delta(path)
+
+
+def test_release_writes_verified_deltas(tmp_path, monkeypatch):
+    monkeypatch.setattr(delta, "RELEASES_DIR", tmp_path / "releases")
+    monkeypatch.setattr(delta, "DELTAS_DIR", tmp_path / "releases" / "deltas")
+    monkeypatch.setattr(delta, "RELEASE_INDEX", tmp_path / "releases" / "index.json")
+    output = tmp_path / "output"
+
+    _write(output, "characters.json", _characters("一"), indent=2)
+    assert delta.release(output) is None
+    assert delta.release(output) is None  # unchanged build is not re-released
+
+    _write(output, "characters.json", _characters("一", "二"), indent=2)
+    delta_path = delta.release(output)
+    assert delta_path.exists()
+    releases = json.loads(delta.RELEASE_INDEX.read_text(encoding="utf-8"))["releases"]
+    assert len(releases) == 2
+    assert delta_path.name == f"{releases[0]}_{releases[1]}.ydelta"
@@ -0,0 +1,59 @@
+"""Example mining: single-character headwords must be matched as words."""
+
+import examples
+
+
+def _corpus(tmp_path, rows):
+    path = tmp_path / "sentences.csv"
+    path.write_text("".join(f"{sid}\t{lang}\t{text}\n" for sid, lang, text in rows),
+                    encoding="utf-8")
+    return path
+
+
+def _mine(tmp_path, headwords, rows, words=None):
+    return examples.mine_examples(headwords, _corpus(tmp_path, rows), jobs=1, words=words)
+
+
+def test_chinese_single_character_gets_an_example(tmp_path):
+    rows = [(1, "cmn", "我们走吧。"), (2, "cmn", "他叫我汤。")]
+    result = _mine(tmp_path, [{"jpn": "走", "cmn": "走"}, {"jpn": "湯", "cmn": "汤"}], rows,
+                   words={"我们", "好吃"})
+    assert result["examples"]["走"]["cmn"]["id"] == 1
+    assert result["examples"]["湯"]["cmn"]["id"] == 2
+
+
+def test_chinese_single_character_inside_a_word_is_skipped(tmp_path):
+    rows = [(1, "cmn", "我每天都在勉强自己。"), (2, "cmn", "今天天气很好。")]
+    result = _mine(tmp_path, [{"jpn": "天", "cmn": "天"}, {"jpn": "強", "cmn": "强"}], rows,
+                   words={"每天", "勉强", "自己", "今天", "天气"})
+    assert "天" not in result["examples"]
+    assert "強" not in result["examples"]
+
+
+def test_chinese_without_word_list_matches_anywhere(tmp_path):
+    rows = [(1, "cmn", "我每天都在勉强自己。")]
+    result = _mine(tmp_path, [{"jpn": "天", "cmn": "天"}], rows)
+    assert result["examples"]["天"]["cmn"]["id"] == 1
+
+
+def test_japanese_single_character_needs_kana_boundary(tmp_path):
+    rows = [(1, "jpn", "毎日勉強します。"), (2, "jpn", "強い風が吹いた。")]
+    result = _mine(tmp_path, [{"jpn": "強", "cmn": "强"}], rows)
+    assert result["examples"]["強"]["jpn"]["id"] == 2
+    assert list(result["postings"]["jpn"]["強"]) == [2]
+
+
+def test_multi_character_headwords_match_as_substrings(tmp_path):
+    rows = [(1, "jpn", "本当に勉強しますか？"), (2, "cmn", "你要好好学习。")]
+    result = _mine(tmp_path, [{"jpn": "勉強", "cmn": "学习"}], rows, words={"好好"})
+    assert result["examples"]["勉強"]["jpn"]["id"] == 1
+    assert result["examples"]["勉強"]["cmn"]["id"] == 2
+
+
+def test_translation_is_attached(tmp_path):
+    rows = [(1, "cmn", "我们走吧。"), (2, "eng", "Let's go.")]
+    links = tmp_path / "links.csv"
+    links.write_text("1\t2\n", encoding="utf-8")
+    result = examples.mine_examples([{"jpn": "走", "cmn": "走"}], _corpus(tmp_path, rows),
+                                    links, jobs=1, words=set())
+    assert result["examples"]["走"]["cmn"]["translation"] == "Let's go."
@@ -0,0 +1,98 @@
+"""expand_false_friends.py: the command line and the save_false_friends writers."""
+
+import io
+import json
+import sys
+from dataclasses import asdict
+
+import pytest
+
+import expand_false_friends as eff
+
+
+CURATED = {"false_friends": [{
+    "id": "ff_001", "characters": "手紙", "jp_reading": "てがみ",
+    "jp_meaning": "letter", "cn_characters": "手纸", "cn_pinyin": "shǒuzhǐ",
+    "cn_meaning": "toilet paper", "severity": "critical", "category": "true_divergence",
+}]}
+
+
+def _run_main(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["expand_false_friends.py", *argv])
+    eff.main()
+
+
+def test_jckv_without_openpyxl_exits_before_writing(tmp_path, monkeypatch):
+    output = tmp_path / "false_friends_expanded.json"
+    output.write_text('{"shipped": true}', encoding="utf-8")
+    curated = tmp_path / "curated.json"
+    curated.write_text(json.dumps(CURATED, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "JCKV.xlsx").write_bytes(b"")
+    monkeypatch.setattr(eff, "HAS_OPENPYXL", False)
+
+    with pytest.raises(SystemExit) as exc:
+        _run_main(monkeypatch, "--jckv", str(tmp_path / "JCKV.xlsx"),
+                  "--curated", str(curated), "--output", str(output))
+    assert exc.value.code != 0
+    assert output.read_text(encoding="utf-8") == '{"shipped": true}'
+
+
+def test_curated_only_run_writes_output(tmp_path, monkeypatch):
+    output = tmp_path / "false_friends_expanded.json"
+    curated = tmp_path / "curated.json"
+    curated.write_text(json.dumps(CURATED, ensure_ascii=False), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+
+    _run_main(monkeypatch, "--curated", str(curated), "--output", str(output))
+    written = json.loads(output.read_text(encoding="utf-8"))
+    assert [ff["characters"] for ff in written["false_friends"]] == ["手紙"]
+
+
+def _false_friends():
+    plain = eff.FalseFriend(id="ff_001", characters="手紙", type=4, category="true_divergence",
+                            severity="critical", affects="both", jp_reading="てがみ",
+                            jp_meanings=["letter"], cn_meanings_simplified=["toilet paper"])
+    tricky = eff.FalseFriend(
+        id="jckv_0002", characters="愛人", type=3, category="scope_difference",
+        severity="subtle", affects="both", jp_reading="あいじん",
+        jp_meanings=['say "hi"', "back\\slash", "tab\there", "\u2028line", "😀 \x00"],
+        cn_characters=None, merged_from=[], shared_meanings=["spouse"],
+        jp_only_meanings=[1, None], cn_only_meanings=[["nested"], {"k": "v"}],
+        explanation="multi\nline", source="jckv", needs_review=True)
+    return [plain, tricky]
+
+
+def _asdict_json(false_friends):
+    entries = []
+    for ff in false_friends:
+        d = asdict(ff)
+        for name in eff.NON_SWIFT_FIELDS:
+            del d[name]
+        entries.append(d)
+    return json.dumps({"metadata": eff.swift_metadata(len(false_friends)), "false_friends": entries},
+                      ensure_ascii=False, indent=2)
+
+
+@pytest.mark.parametrize("count", [0, 1, 2])
+def test_streaming_writer_matches_asdict(count):
+    false_friends = _false_friends()[:count]
+    buf = io.StringIO()
+    eff.write_swift_json(buf, false_friends)
+    assert buf.getvalue() == _asdict_json(false_friends)
+    assert json.dumps(eff.swift_document(false_friends), ensure_ascii=False, indent=2) == \
+        _asdict_json(false_friends)
+
+
+def test_save_false_friends_backends(tmp_path):
+    false_friends = _false_friends()
+    stdlib = tmp_path / "stdlib.json"
+    stats = eff.save_false_friends(false_friends, str(stdlib))
+    assert stdlib.read_text(encoding="utf-8") == _asdict_json(false_friends)
+    assert stats.histogram("ff_severity") == {"critical": 1, "subtle": 1}
+    assert stats.counters["ff_needs_review"] == 1
+
+    fast = tmp_path / "orjson.json"
+    eff.save_false_friends(false_friends, str(fast), backend="orjson")
+    assert json.loads(fast.read_text(encoding="utf-8")) == json.loads(_asdict_json(false_friends))
+    with pytest.raises(ValueError):
+        eff.save_false_friends(false_friends, str(fast), backend="ujson")
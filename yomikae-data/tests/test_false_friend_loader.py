@@ -0,0 +1,70 @@
+"""Streaming false-friend loader: file shapes, chunk boundaries and subsets."""
+
+import json
+
+import pytest
+
+import false_friend_loader as loader
+
+
+ENTRIES = [
+    {"id": f"ff_{i:03d}", "characters": chars, "severity": "critical",
+     "cn_pinyin": "shǒu zhǐ", "cn_meanings": ["toilet paper"], "confidence_note": 1.5e-3}
+    for i, chars in enumerate(["手紙", "勉強", "汽車", "愛人", "大丈夫"])
+]
+
+
+def _write(tmp_path, document, name="ff.json"):
+    path = tmp_path / name
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+@pytest.fixture(params=["bare list", "document"])
+def path(request, tmp_path):
+    if request.param == "bare list":
+        return _write(tmp_path, ENTRIES)
+    return _write(tmp_path, {"metadata": {"version": 2, "note": "]}"}, "false_friends": ENTRIES})
+
+
+def test_loads_both_file_shapes(path):
+    loaded = loader.load_false_friends(path)
+    assert [ff.characters for ff in loaded] == [e["characters"] for e in ENTRIES]
+    assert loaded[0].cn_meanings_simplified == ["toilet paper"]
+    assert loaded[0].cn_pinyin_numbered
+
+
+def test_matches_json_load_baseline(path):
+    assert loader.load_false_friends(path) == loader._load_with_json(path)
+
+
+def test_entries_split_across_chunks(path, monkeypatch):
+    monkeypatch.setattr(loader, "CHUNK_SIZE", 7)
+    assert [ff.id for ff in loader.load_false_friends(path)] == [e["id"] for e in ENTRIES]
+
+
+def test_field_subset_gets_loader_defaults(path):
+    ff = loader.load_false_friends(path, fields=["severity"])[0]
+    assert ff.severity == "critical"
+    assert ff.cn_pinyin == "" and ff.cn_meanings_simplified == []
+
+
+def test_id_subset_stops_early(path):
+    loaded = loader.load_false_friends(path, ids=["ff_003", "ff_001"])
+    assert [ff.id for ff in loaded] == ["ff_001", "ff_003"]
+
+
+def test_unknown_field_and_missing_id_are_errors(tmp_path):
+    with pytest.raises(ValueError):
+        loader.FieldPlan(["no_such_field"])
+    with pytest.raises(KeyError):
+        loader.load_false_friends(_write(tmp_path, [{"characters": "手紙"}]))
+
+
+def test_empty_and_truncated_files(tmp_path):
+    assert loader.load_false_friends(_write(tmp_path, [])) == []
+    assert loader.load_false_friends(_write(tmp_path, {"false_friends": []})) == []
+    truncated = tmp_path / "truncated.json"
+    truncated.write_text(json.dumps(ENTRIES)[:-40], encoding="utf-8")
+    with pytest.raises(ValueError):
+        loader.load_false_friends(truncated)
@@ -0,0 +1,94 @@
+"""Headword store: front-coded keys of any length behave like the dict they replace."""
+
+import pickle
+
+import pytest
+
+from headword_store import BLOCK_SIZE, HeadwordStoreBuilder
+
+
+FIELDS = ["traditional", "simplified", "pinyin", "meanings"]
+
+
+def _entry(i, word):
+    return {"traditional": word, "simplified": word, "pinyin": f"p{i}", "meanings": [f"m{i}", "x"]}
+
+
+@pytest.fixture(scope="module")
+def words():
+    # Long compounds sharing long prefixes, across many blocks
+    base = "中華人民共和國"
+    words = [base[:n] for n in range(1, len(base) + 1)]
+    words += [base + suffix for suffix in ("國務院", "國歌", "憲法", "成立五十週年紀念")]
+    words += [chr(0x4E00 + i) + chr(0x4E00 + j) for i in range(10) for j in range(10)]
+    words += ["", "a", "ab", "abc", "b"]
+    return words
+
+
+@pytest.fixture(scope="module")
+def store_and_dict(words):
+    builder = HeadwordStoreBuilder(FIELDS, list_fields=("meanings",))
+    expected = {}
+    for i, word in enumerate(words):
+        builder.add(word, _entry(i, word))
+        expected[word] = _entry(i, word)
+    return builder.build(), expected
+
+
+def test_behaves_like_a_dict(store_and_dict):
+    store, expected = store_and_dict
+    assert len(store) == len(expected) > 4 * BLOCK_SIZE
+    assert list(store) == sorted(expected)
+    assert dict(store) == expected
+    assert store["中華人民共和國成立五十週年紀念"] == expected["中華人民共和國成立五十週年紀念"]
+    assert store.get("中華人民共和") == expected["中華人民共和"]
+    assert "中華人民共" in store and "華人" not in store
+    assert store.get("zzz") is None and 42 not in store
+    with pytest.raises(KeyError):
+        store["中華人民共和國國"]
+
+
+def test_prefix_search(store_and_dict):
+    store, expected = store_and_dict
+    assert list(store.prefix("中華人民共和國")) == sorted(k for k in expected
+                                                    if k.startswith("中華人民共和國"))
+    assert list(store.prefix("一", limit=3)) == ["一一", "一丁", "一丂"]
+    assert list(store.prefix("ab")) == ["ab", "abc"]
+    assert list(store.prefix("zz")) == []
+    assert store.prefixes_of("中華人民共和國歌") == [
+        "中", "中華", "中華人", "中華人民", "中華人民共", "中華人民共和", "中華人民共和國"]
+
+
+def test_shared_entries_and_overwrites():
+    builder = HeadwordStoreBuilder(FIELDS, list_fields=("meanings",))
+    builder.add(["學習", "学习"], {"traditional": "學習", "simplified": "学习", "meanings": ["study"]})
+    builder.add("学习", {"traditional": "學習", "simplified": "学习", "meanings": ["learn"]})
+    store = builder.build()
+    assert store["學習"]["meanings"] == ["study"]
+    assert store["学习"]["meanings"] == ["learn"]
+    assert store["學習"]["pinyin"] == ""
+
+
+def test_separators_are_rejected():
+    builder = HeadwordStoreBuilder(FIELDS, list_fields=("meanings",))
+    with pytest.raises(ValueError):
+        builder.add("a", {"pinyin": "x\x1fy"})
+    with pytest.raises(ValueError):
+        builder.add("a", {"meanings": ["one\x1etwo"]})
+    with pytest.raises(ValueError):
+        builder.add("a\x1db", {})
+
+
+def test_empty_store():
+    store = HeadwordStoreBuilder(FIELDS).build()
+    assert len(store) == 0
+    assert "a" not in store
+    assert list(store.prefix("")) == []
+
+
+def test_pickle_round_trip(store_and_dict):
+    store, expected = store_and_dict
+    store["中華"]  # leave a cached block behind
+    restored = pickle.loads(pickle.dumps(store))
+    assert restored._cached_block == (-1, None)
+    assert dict(restored) == expected
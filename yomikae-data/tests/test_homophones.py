@@ -0,0 +1,58 @@
+"""Homophone indexes: collector ordering, the homophones.idx round trip and query routing."""
+
+import pytest
+
+from homophones import HomophoneCollector, Homophones, write_homophones
+
+
+CHARACTERS = [
+    {"character": "是", "frequency_rank": 10, "stroke_count": 9,
+     "chinese": {"pinyin": ["shì"], "pinyin_toneless": ["shi"]},
+     "japanese": {"onyomi": ["ゼ", "シ"]}},
+    {"character": "十", "frequency_rank": 5, "stroke_count": 2,
+     "chinese": {"pinyin": ["shí"], "pinyin_toneless": ["shi"]},
+     "japanese": {"onyomi": ["ジュウ", "ジッ"]}},
+    {"character": "师", "frequency_rank": None, "stroke_count": 6,
+     "chinese": {"pinyin": ["shī"], "pinyin_toneless": ["shi"]}, "japanese": None},
+    {"character": "诗", "frequency_rank": None, "stroke_count": 8,
+     "chinese": {"pinyin": ["shī"], "pinyin_toneless": ["shi"]}, "japanese": None},
+    {"character": "绿", "frequency_rank": 800, "stroke_count": 11,
+     "chinese": {"pinyin": ["lǜ"], "pinyin_toneless": ["lv"]}, "japanese": None},
+    {"character": "子", "frequency_rank": 20, "stroke_count": 3,
+     "chinese": None, "japanese": {"onyomi": ["シ", "ス"]}},
+    {"character": "老师", "frequency_rank": 1, "stroke_count": None,
+     "chinese": {"pinyin": ["lǎo shī"], "pinyin_toneless": ["laoshi"]}, "japanese": None},
+]
+
+
+@pytest.fixture(scope="module")
+def homophones(tmp_path_factory):
+    collector = HomophoneCollector()
+    for entry in CHARACTERS:
+        collector.add(entry)
+    path = tmp_path_factory.mktemp("homophones") / "homophones.idx"
+    write_homophones(collector.build(), path)
+    return Homophones(path)
+
+
+def test_most_common_first(homophones):
+    assert homophones.lookup("shi") == ["十", "是", "师", "诗"]
+    assert homophones.lookup("shī") == ["师", "诗"]
+    assert homophones.lookup("シ") == ["是", "子"]
+
+
+def test_words_are_skipped(homophones):
+    assert homophones.lookup("laoshi") == []
+
+
+def test_query_forms(homophones):
+    assert homophones.lookup("shi4") == homophones.lookup("shì") == ["是"]
+    assert homophones.lookup("Shi") == homophones.lookup("shi")
+    assert homophones.lookup("し") == ["是", "子"]
+    assert homophones.lookup("じゅう") == ["十"]
+    assert homophones.lookup("  ") == []
+
+
+def test_toneless_umlaut(homophones):
+    assert homophones.lookup("lü") == homophones.lookup("lv") == ["绿"]
+    assert homophones.lookup("lǜ") == homophones.lookup("lv4") == ["绿"]
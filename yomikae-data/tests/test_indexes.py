@@ -0,0 +1,85 @@
+"""Posting-list indexes: write_indexes() / IndexFile round trips and the radical/stroke builder."""
+
+import pytest
+
+from data_pipeline import RS_KEY_BASE, build_radical_stroke_indexes, parse_rs_unicode
+from indexes import IndexFile, intersect, write_indexes
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    path = tmp_path / "test.idx"
+    write_indexes(path, {
+        "strokes": {8: [23398, 31354], 3: [23376], 12: [28450]},
+        "readings": {"がく": [1, 4], "かく": [2], "がくせい": [3]},
+        "empty": {},
+    }, {"id": "codepoint"})
+    return IndexFile(path)
+
+
+def test_round_trip(index_file):
+    assert index_file.metadata == {"id": "codepoint"}
+    strokes = index_file["strokes"]
+    assert strokes.key_type == "int"
+    assert list(strokes.keys()) == [3, 8, 12]
+    assert list(strokes.get(8)) == [23398, 31354]
+    readings = index_file["readings"]
+    assert readings.key_type == "str"
+    assert list(readings.get("がく")) == [1, 4]
+
+
+def test_missing_keys_and_empty_index(index_file):
+    assert list(index_file["strokes"].get(5)) == []
+    assert list(index_file["readings"].get("ない")) == []
+    empty = index_file["empty"]
+    assert len(empty) == 0
+    assert list(empty.get(1)) == []
+    assert empty.union_range(0, 100) == []
+
+
+def test_ranges_and_prefixes(index_file):
+    strokes = index_file["strokes"]
+    assert strokes.union_range(3, 8) == [23376, 23398, 31354]
+    assert strokes.union_range(9, 11) == []
+    readings = index_file["readings"]
+    assert [readings.key_at(i) for i in readings.key_prefix("がく")] == ["がく", "がくせい"]
+    assert list(readings.key_prefix("ぱ")) == []
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "bogus.idx"
+    path.write_bytes(b"NOPE" + b"\0" * 16)
+    with pytest.raises(ValueError):
+        IndexFile(path)
+
+
+def test_intersect():
+    assert intersect([1, 3, 5, 7], [3, 4, 5]) == [3, 5]
+    assert intersect([50], list(range(0, 100, 2))) == [50]
+    assert intersect([], [1, 2]) == []
+
+
+def test_parse_rs_unicode():
+    assert parse_rs_unicode("85.5 85'.5") == [(85, 5), (85, 5)]
+    assert parse_rs_unicode("9.-1") == [(9, 0)]
+    assert parse_rs_unicode(None) == []
+    assert parse_rs_unicode("bogus") == []
+
+
+def test_radical_stroke_indexes_round_trip(tmp_path):
+    characters = [
+        {"character": "海", "radical": "85.6", "stroke_count": 9},
+        {"character": "池", "radical": "85.3", "stroke_count": 6},
+        {"character": "学", "radical": "39.5", "stroke_count": 8},
+        {"character": "学生", "radical": "39.5", "stroke_count": 8},
+        {"character": "？", "radical": None, "stroke_count": None},
+    ]
+    path = tmp_path / "radical_stroke.idx"
+    write_indexes(path, build_radical_stroke_indexes(characters))
+    index_file = IndexFile(path)
+
+    assert list(index_file["radical"].get(85)) == sorted([ord("海"), ord("池")])
+    assert list(index_file["strokes"].get(8)) == [ord("学")]
+    assert list(index_file["radical_residual"].get(85 * RS_KEY_BASE + 3)) == [ord("池")]
+    water_6_to_9 = index_file["strokes"].union_range(6, 9)
+    assert intersect(index_file["radical"].get(85), water_6_to_9) == sorted([ord("海"), ord("池")])
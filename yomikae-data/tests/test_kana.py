@@ -0,0 +1,44 @@
+"""Kana/romaji normalization and the reading index."""
+
+import pytest
+
+from kana import (ReadingIndex, build_reading_index, extract_readings, hiragana_to_romaji,
+                  romaji_query_keys, romaji_to_hiragana, to_hiragana, write_reading_index)
+
+
+def test_to_hiragana_folds_katakana_and_long_marks():
+    assert to_hiragana("マージャン") == "まあじゃん"
+    assert to_hiragana("ｶﾀｶﾅ") == "かたかな"
+
+
+@pytest.mark.parametrize("kana, romaji", [
+    ("べんきょう", "benkyou"), ("がっこう", "gakkou"), ("まっちゃ", "matcha"),
+    ("しんぶん", "shinbun"), ("こんにちは", "konnichiha"),
+])
+def test_romaji_round_trip(kana, romaji):
+    assert hiragana_to_romaji(kana) == romaji
+    assert romaji_to_hiragana(romaji) == kana
+
+
+def test_extract_readings():
+    assert extract_readings("ゆか (yuka) / とこ (toko)") == ["ゆか", "とこ"]
+    assert extract_readings("SHOKU JIKI") == ["しょく", "じき"]
+    assert extract_readings("") == []
+
+
+def test_romaji_query_keys():
+    assert set(romaji_query_keys("Tōkyō")) == {"toukyou", "tookyou", "toukyoo", "tookyoo"}
+    assert romaji_query_keys("kin-en") == ["kinen"]
+    assert romaji_query_keys("とうきょう") == []
+
+
+def test_reading_index_macron_queries(tmp_path):
+    index = build_reading_index([("ff_1", ["とうきょう"]), ("ff_2", ["おおきい"])])
+    path = tmp_path / "reading_index.json"
+    write_reading_index(index, path)
+    reader = ReadingIndex(path)
+    assert reader.lookup("tōkyō") == ["ff_1"]
+    assert reader.lookup("ōkii") == ["ff_2"]
+    assert reader.lookup("トウキョウ") == ["ff_1"]
+    assert [key for key, _ in reader.prefix("tō")] == ["toukyou"]
+    assert [key for key, _ in reader.prefix("ō")] == ["ookii"]
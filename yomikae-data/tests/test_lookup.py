@@ -0,0 +1,59 @@
+"""Lookup library over JSON and binary outputs."""
+
+import json
+import threading
+
+import pytest
+
+import lookup
+from binary_store import write_store
+
+
+CHARACTERS = [{"character": "学", "stroke_count": 8}, {"character": "勉強", "stroke_count": None}]
+FALSE_FRIENDS = [
+    {"id": "ff_003", "characters": "勉強", "cn_characters": "勉强", "severity": "critical"},
+    {"id": "jckv_0001", "characters": "手紙", "cn_characters": "手纸", "severity": "subtle"},
+]
+
+
+@pytest.fixture(params=["json", "binary"])
+def data_dir(request, tmp_path):
+    if request.param == "json":
+        (tmp_path / "characters.json").write_text(json.dumps(CHARACTERS), encoding="utf-8")
+        (tmp_path / "false_friends_merged.json").write_text(
+            json.dumps({"false_friends": FALSE_FRIENDS}), encoding="utf-8")
+    else:
+        write_store(tmp_path / "yomikae.bin",
+                    {"characters": CHARACTERS, "false_friends": FALSE_FRIENDS})
+    lookup.configure(str(tmp_path), backend=request.param)
+    yield tmp_path
+    lookup.reset()
+
+
+def test_lookups(data_dir):
+    assert lookup.lookup_character("学")["stroke_count"] == 8
+    assert lookup.lookup_character("无") is None
+    for key in ("勉強", "勉强", "ff_003"):
+        assert lookup.lookup_false_friend(key)["id"] == "ff_003"
+
+
+def test_filters(data_dir):
+    assert [ff["id"] for ff in lookup.iter_false_friends(severity="critical")] == ["ff_003"]
+    assert [ff["id"] for ff in lookup.iter_false_friends(source="jckv")] == ["jckv_0001"]
+    assert len(list(lookup.iter_false_friends())) == 2
+
+
+def test_concurrent_first_queries_load_once(data_dir):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lookup.lookup_false_friend("手紙")))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r is results[0] for r in results)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        lookup.configure(backend="sqlite")
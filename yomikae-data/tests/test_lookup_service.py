@@ -0,0 +1,56 @@
+"""Lookup service indexes: reading, pinyin and filter queries."""
+
+import json
+
+import pytest
+
+from lookup_service import LookupData, LookupService
+
+
+FALSE_FRIENDS = [
+    {"id": "ff_001", "characters": "東京", "jp_reading": "とうきょう (tōkyō)",
+     "cn_characters": "东京", "cn_pinyin": "Dōngjīng", "severity": "subtle"},
+    {"id": "jckv_0002", "characters": "大木", "jp_reading": "おおき",
+     "cn_pinyin": "dàmù", "severity": "important"},
+    {"id": "ff_003", "characters": "手紙", "jp_reading": "てがみ (tegami)",
+     "cn_pinyin": "shǒuzhǐ", "severity": "critical"},
+]
+
+
+@pytest.fixture
+def data():
+    return LookupData([], FALSE_FRIENDS)
+
+
+@pytest.mark.parametrize("query", ["とうきょう", "トウキョウ", "toukyou", "tōkyō", "Tôkyô"])
+def test_reading_queries_hit(data, query):
+    assert data.search("false_friends", {"reading": query}) == [0]
+
+
+def test_macron_o_can_be_oo(data):
+    assert data.search("false_friends", {"reading": "ōki"}) == [1]
+
+
+def test_reading_miss(data):
+    assert data.search("false_friends", {"reading": "kyoto"}) == []
+
+
+@pytest.mark.parametrize("query", ["shou3zhi3", "shǒuzhǐ", "shouzhi"])
+def test_pinyin_any_tone_form(data, query):
+    assert data.search("false_friends", {"pinyin": query}) == [2]
+
+
+def test_filters_combine(data):
+    assert data.search("false_friends", {"source": "jckv"}) == [1]
+    assert data.search("false_friends", {"severity": "critical", "source": "curated"}) == [2]
+    assert data.search("false_friends", {"headword": "东京"}) == [0]
+
+
+def test_service_answers_and_caches(data):
+    service = LookupService(data, cache_size=4)
+    status, body = service.handle("/false_friends?reading=t%C5%8Dky%C5%8D")
+    assert status == 200 and json.loads(body)["total"] == 1
+    service.handle("/false_friends?reading=t%C5%8Dky%C5%8D")
+    assert service.respond.cache_info().hits == 1
+    assert service.handle("/nowhere")[0] == 404
+    assert service.handle("/false_friends?bogus=1")[0] == 400
@@ -0,0 +1,70 @@
+"""Membership Bloom filter: no false negatives, target FP rate, file round trip."""
+
+import pytest
+
+import membership
+from membership import BloomFilter, build_filter, key_hash, load_membership, write_membership
+from variants import VariantTables
+
+
+def _fmix64(h):
+    mask = membership.MASK_64
+    h ^= h >> 33
+    h = (h * 0xFF51AFD7ED558CCD) & mask
+    h ^= h >> 33
+    h = (h * 0xC4CEB9FE1A85EC53) & mask
+    return h ^ (h >> 33)
+
+
+def _keys(count):
+    return {chr(0x4E00 + i // 200) + chr(0x4E00 + i % 200) for i in range(count)}
+
+
+def test_key_hash_matches_published_fnv1a():
+    # FNV-1a 64 reference values ("" is the offset basis)
+    assert key_hash(b"") == _fmix64(0xCBF29CE484222325)
+    assert key_hash(b"a") == _fmix64(0xAF63DC4C8601EC8C)
+
+
+def test_no_false_negatives_and_target_rate():
+    keys = _keys(5000)
+    bloom = build_filter(keys, fp_rate=0.01)
+    assert all(key in bloom for key in keys)
+    absent = membership._absent_tokens(keys, 20_000)
+    false_positives = sum(token in bloom for token in absent) / len(absent)
+    assert false_positives < 0.02
+    assert bloom.expected_fp_rate() < 0.011
+
+
+def test_file_round_trip(tmp_path):
+    keys = _keys(300)
+    path = tmp_path / "false_friends.bloom"
+    written = write_membership(keys, path, fp_rate=0.001)
+    loaded = load_membership(path)
+    assert (loaded.m, loaded.k, loaded.n) == (written.m, written.k, len(keys))
+    assert loaded.bits == written.bits
+    assert all(key in loaded for key in keys)
+
+
+def test_empty_filter_contains_nothing():
+    bloom = build_filter([])
+    assert bloom.m >= 64
+    assert "学生" not in bloom
+
+
+def test_bad_files_and_rates_are_rejected():
+    with pytest.raises(ValueError):
+        BloomFilter.for_capacity(10, fp_rate=1.5)
+    data = build_filter(_keys(100)).to_bytes()
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(b"NOPE" + data[4:])
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(data[:-1])
+
+
+def test_keys_cover_chinese_forms_and_variants():
+    variants = VariantTables({"t2s": {"學": "学"}, "j2s": {"広": "广"}, "fold": {"學": "学"}})
+    false_friends = [{"characters": "學生", "cn_characters": None},
+                     {"characters": "広告", "cn_characters": "广告"}]
+    keys = membership.membership_keys(false_friends, variants)
+    assert {"學生", "学生", "広告", "广告"} <= keys
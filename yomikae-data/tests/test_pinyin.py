@@ -0,0 +1,53 @@
+"""Pinyin conversion between marked, numbered and toneless forms."""
+
+import pytest
+
+from pinyin import normalize_column, pinyin_forms, to_marked, to_numbered, to_toneless
+
+
+@pytest.mark.parametrize("text, forms", [
+    ("ni3 hao3", ("nǐ hǎo", "ni3 hao3", "nihao")),
+    ("miǎnqiǎng", ("miǎnqiǎng", "mian3 qiang3", "mianqiang")),
+    ("yi4fan1", ("yìfān", "yi4 fan1", "yifan")),
+    ("xī'ān", ("xī'ān", "xi1 an1", "xian")),
+    ("Xi1 an1", ("Xī ān", "Xi1 an1", "xian")),
+    ("lu:4 se4", ("lǜ sè", "lu:4 se4", "lvse")),
+    ("gong1fu0", ("gōngfu", "gong1 fu5", "gongfu")),
+    ("dang４", ("dàng", "dang4", "dang")),
+])
+def test_forms(text, forms):
+    assert pinyin_forms(text) == forms
+
+
+def test_marked_keeps_word_spacing():
+    assert to_marked("guài wǒ") == "guài wǒ"
+    assert to_marked("guai4 wo3") == "guài wǒ"
+    assert to_marked(" zhang4 fu5 ") == "zhàng fu"
+
+
+def test_latin_letters_pass_through():
+    assert pinyin_forms("A A zhi4") == ("A A zhì", "A A zhi4", "aazhi")
+    assert to_numbered("ka3 la1 O K") == "ka3 la1 O K"
+    assert to_marked("T xu4") == "T xù"
+
+
+def test_non_pinyin_tokens_are_kept():
+    assert pinyin_forms("xx5") == ("xx5", "xx5", "xx")
+
+
+def test_alternatives_keep_their_separator():
+    assert pinyin_forms("shì; shí") == ("shì; shí", "shi4;shi2", "shi;shi")
+    assert to_numbered("yi4fan1/yi1fan1") == "yi4 fan1/yi1 fan1"
+
+
+def test_round_trip_through_numbered():
+    for text in ["nǐ hǎo", "miǎnqiǎng", "lǜ sè", "Běi jīng"]:
+        assert to_marked(to_numbered(text)).replace(" ", "") == text.replace(" ", "")
+
+
+def test_empty_and_column():
+    assert pinyin_forms("") == ("", "", "")
+    marked, numbered, toneless = normalize_column(["ni3", "", "ni3"])
+    assert marked == ["nǐ", "", "nǐ"]
+    assert numbered == ["ni3", "", "ni3"]
+    assert to_toneless("nǚ") == "nv"
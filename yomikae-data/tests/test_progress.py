@@ -0,0 +1,100 @@
+"""Progress reporting: modes, rate limiting, JSON records and error summaries."""
+
+import io
+import json
+
+import pytest
+
+import progress
+from progress import Progress
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(progress.time, "monotonic", clock)
+    return clock
+
+
+def test_json_records_are_rate_limited(clock):
+    stream = io.StringIO()
+    with Progress("CEDICT", total=100, unit="B", mode="json", stream=stream) as p:
+        for _ in range(50):
+            clock.now += 0.1
+            p.update(2)
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    # 5 s of work at LOG_INTERVAL = 10 s: no progress line, one done line
+    assert [r["event"] for r in records] == ["done"]
+    done = records[-1]
+    assert (done["done"], done["total"], done["rate"], done["eta"]) == (100, 100, 20.0, 0.0)
+    assert done["error_counts"] == {}
+
+
+def test_log_lines_every_interval(clock):
+    stream = io.StringIO()
+    with Progress("JMDict", total=None, mode="log", stream=stream) as p:
+        for _ in range(25):
+            clock.now += 1.0
+            p.update()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 3  # at 10 s, at 20 s, and the final line
+    assert lines[-1] == "  JMDict: 25 items, 1 items/s"
+
+
+def test_errors_are_counted_and_sampled(clock):
+    stream = io.StringIO()
+    with Progress("JCKV", mode="off", stream=stream) as p:
+        for i in range(8):
+            p.error(i, ValueError(f"bad row {i}"))
+        p.error("学", "malformed line")
+    assert p.error_total == 9
+    assert p.error_counts == {"ValueError": 8, "malformed line": 1}
+    out = stream.getvalue()
+    assert "9 rows failed (ValueError 8, malformed line 1)" in out
+    assert "0: bad row 0" in out and "... 4 more" in out
+
+
+def test_off_mode_without_errors_is_silent(clock):
+    stream = io.StringIO()
+    with Progress("Unihan", total=10, mode="off", stream=stream) as p:
+        p.update(10)
+    assert stream.getvalue() == ""
+
+
+def test_bar_mode_ends_with_a_newline(clock):
+    stream = io.StringIO()
+    with Progress("Unihan", total=4, mode="bar", stream=stream) as p:
+        clock.now += 1.0
+        p.update(2)
+        clock.now += 1.0
+        p.update(2)
+    out = stream.getvalue()
+    assert out.startswith("\r  Unihan [") and out.endswith("\n")
+    assert out.count("\n") == 1
+    assert "100.0%" in out
+
+
+def test_modes(monkeypatch):
+    with pytest.raises(ValueError):
+        progress.set_mode("loud")
+    monkeypatch.setenv(progress.MODE_ENV, "loud")
+    assert progress.current_mode(io.StringIO()) == "log"
+    monkeypatch.setenv(progress.MODE_ENV, "json")
+    assert progress.current_mode() == "json"
+
+
+def test_formatting():
+    assert progress._format_count(512, "B") == "512 B"
+    assert progress._format_count(3 * 1024 ** 2, "B") == "3.0 MB"
+    assert progress._format_count(12345, "entries") == "12,345 entries"
+    assert progress._format_duration(None) == "?"
+    assert progress._format_duration(75) == "1:15"
+    assert progress._format_duration(3 * 3600 + 120) == "3h02m"
@@ -0,0 +1,55 @@
+"""Scale-test harness: synthetic sources parse back as generated; growth fits."""
+
+import math
+
+import data_pipeline as dp
+import scale_test
+
+
+def test_synthetic_words_are_unique():
+    words = [scale_test.synthetic_word(i) for i in range(20_000)]
+    assert len(set(words)) == len(words)
+    # Around the digit rollover and with lengths shorter than the digit count
+    edge = [scale_test.synthetic_word(i) for i in
+            range(scale_test.CJK_COUNT - 50, scale_test.CJK_COUNT + 50)]
+    assert len(set(edge)) == len(edge)
+    assert {len(w) for w in words} == set(scale_test.WORD_LENGTHS)
+
+
+def test_synthetic_sources_are_deterministic_and_sized():
+    unihan, jmdict, cedict = scale_test.synthetic_sources(0.002, seed=3)
+    assert (unihan, jmdict, cedict) == scale_test.synthetic_sources(0.002, seed=3)
+    assert len(unihan) == int(scale_test.BASE_SIZES["unihan"] * 0.002)
+    assert len(jmdict) == int(scale_test.BASE_SIZES["jmdict"] * 0.002)
+    assert len(cedict) == int(scale_test.BASE_SIZES["cedict"] * 0.002)
+    # Variant links point both ways
+    for char, fields in unihan.items():
+        if "simplified" in fields:
+            simp = chr(int(fields["simplified"][2:], 16))
+            assert unihan[simp]["traditional"] == f"U+{ord(char):04X}"
+
+
+def test_written_sources_parse_back(tmp_path):
+    unihan, jmdict, cedict = scale_test.synthetic_sources(0.002)
+    scale_test.write_sources(unihan, jmdict, cedict, tmp_path)
+
+    # Empty fields are not written, as in the real Unihan files
+    expected = {char: {k: v for k, v in fields.items() if v} for char, fields in unihan.items()}
+    assert dp.parse_unihan(tmp_path / "Unihan.zip") == expected
+    parsed = dp.parse_cedict(tmp_path / "cedict_1_0_ts_utf-8_mdbg.zip")
+    assert {word: dict(parsed[word]) for word in cedict} == cedict
+    parsed = dp.parse_jmdict(tmp_path / "JMdict_e.gz")
+    assert {word: dict(parsed[word]) for word in jmdict} == jmdict
+
+
+def test_growth_exponent():
+    assert abs(scale_test.growth_exponent([(1, 3), (2, 12), (10, 300)]) - 2.0) < 1e-9
+    assert math.isnan(scale_test.growth_exponent([(1, 5)]))
+    assert math.isnan(scale_test.growth_exponent([(2, 5), (2, 7)]))
+
+
+def test_pipeline_stages_skip_injected_stages():
+    stages = scale_test.pipeline_stages()
+    assert not set(stages) & set(scale_test.INJECTED_STAGES)
+    assert stages.index("parse_cedict") < stages.index("compile_characters")
+    assert {"emit_shards", "emit_binary"} <= set(stages)
@@ -0,0 +1,68 @@
+"""Tiered character shards: every entry lands in exactly one shard."""
+
+import json
+
+import data_pipeline as dp
+
+
+def _characters(n):
+    chars = []
+    for i in range(n):
+        chars.append({
+            "character": chr(0x4E00 + i),
+            "frequency_rank": (i % 3) + 1 if i % 4 else None,
+            "stroke_count": (i % 25) + 1 if i % 5 else None,
+            "false_friend_id": "ff_001" if i == n - 1 else None,
+        })
+    return chars
+
+
+def _read_back(output_dir):
+    manifest = json.loads((output_dir / "characters_manifest.json").read_text(encoding="utf-8"))
+    shards = [json.loads((output_dir / s["file"]).read_text(encoding="utf-8"))
+              for s in manifest["shards"]]
+    return manifest, shards
+
+
+def test_round_trip(tmp_path):
+    characters = _characters(300)
+    dp.write_character_shards(characters, tmp_path)
+    manifest, shards = _read_back(tmp_path)
+
+    assert manifest["total_characters"] == 300
+    assert [s["count"] for s in manifest["shards"]] == [len(s) for s in shards]
+    loaded = [entry for shard in shards for entry in shard]
+    assert sorted(e["character"] for e in loaded) == sorted(e["character"] for e in characters)
+    assert [s["priority"] for s in manifest["shards"]] == list(range(len(shards)))
+
+
+def test_common_tier_and_linked_entries():
+    characters = _characters(50)
+    shards = dp.build_character_shards(characters, common_size=10)
+    info, common = shards[0]
+    assert info["tier"] == 0
+    assert len(common) == 11
+    assert characters[-1] in common  # linked to a false friend, though rare
+
+
+def test_large_groups_are_split():
+    characters = [{"character": chr(0x4E00 + i), "frequency_rank": 5, "stroke_count": 3}
+                  for i in range(25)]
+    shards = dp.build_character_shards(characters, common_size=0, max_shard_size=10)
+    assert [len(entries) for _, entries in shards] == [0, 10, 10, 5]
+    assert shards[-1][0]["name"] == "freq5_strokes01-05_part3"
+
+
+def test_rewrite_removes_stale_shards(tmp_path):
+    first = dp.write_character_shards(_characters(dp.JOYO_KANJI_COUNT + 300), tmp_path)
+    assert len(first["shards"]) > 1
+    dp.write_character_shards(_characters(5), tmp_path)
+    manifest, _ = _read_back(tmp_path)
+    files = sorted(f"characters/{p.name}" for p in (tmp_path / "characters").iterdir())
+    assert files == sorted(s["file"] for s in manifest["shards"])
+
+
+def test_empty_input(tmp_path):
+    manifest = dp.write_character_shards([], tmp_path)
+    assert manifest["total_characters"] == 0
+    assert [s["count"] for s in manifest["shards"]] == [0]
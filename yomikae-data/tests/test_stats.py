@@ -0,0 +1,88 @@
+"""Streaming statistics: one pass gives the same numbers as rescanning the lists."""
+
+from expand_false_friends import FalseFriend
+from stats import StatsCollector
+
+
+FALSE_FRIENDS = [
+    {"type": 4, "severity": "critical", "source": "curated", "category": "true_divergence",
+     "needs_review": False, "jp_meanings": ["letter"], "cn_meanings": ["toilet paper"]},
+    {"type": 3, "severity": "important", "source": "jckv", "category": "scope_difference",
+     "needs_review": True, "jp_meanings": ["a" * 25, "b"], "cn_meanings_simplified": []},
+    {"type": 1, "severity": "subtle", "needs_review": True, "jp_meanings": []},
+    {"type": 2, "severity": "subtle", "source": "auto", "category": "true_divergence"},
+]
+CHARACTERS = [
+    {"character": "学", "japanese": {"onyomi": ["ガク"], "kunyomi": ["まな.ぶ"], "meanings": ["study"]},
+     "chinese": {"pinyin": ["xué"], "meanings": ["learn", "school"]}},
+    {"character": "学生", "japanese": None, "chinese": {"pinyin": ["xué sheng"], "meanings": []}},
+    {"character": "々"},
+]
+
+
+def _collect(false_friends=FALSE_FRIENDS, characters=CHARACTERS):
+    stats = StatsCollector()
+    for ff in false_friends:
+        stats.add_false_friend(ff)
+    for entry in characters:
+        stats.add_character(entry)
+    return stats
+
+
+def test_document_matches_a_rescan():
+    document = _collect().stats_document({"unihan": 3})
+    assert document["total_characters"] == len(CHARACTERS)
+    assert document["total_false_friends"] == len(FALSE_FRIENDS)
+    assert document["false_friends_by_type"] == {
+        "type_4_critical": 1, "type_3_partial": 1, "type_1_2_expanded": 2}
+    assert document["false_friends_by_severity"] == {"critical": 1, "important": 1, "subtle": 2}
+    assert document["sources_used"] == {"unihan": 3}
+    assert document["false_friends_by_category"] == {
+        "true_divergence": 2, "scope_difference": 1, "unknown": 1}
+
+    distributions = document["distributions"]
+    assert distributions["char_jp_readings"] == {"0": 2, "2": 1}
+    assert distributions["char_cn_meanings_per_entry"] == {"0": 2, "2": 1}
+    assert distributions["ff_jp_meanings_per_entry"] == {"0": 2, "1": 1, "2": 1}
+    assert distributions["ff_jp_meanings_gloss_length"] == {"0": 2, "20": 1}
+    assert distributions["ff_cn_meanings_per_entry"] == {"0": 3, "1": 1}
+
+
+def test_counters():
+    stats = _collect()
+    assert stats.counters["ff_needs_review"] == 2
+    assert stats.counters["character_words"] == 1
+    assert stats.histogram("ff_source") == {"curated": 1, "jckv": 1, "unknown": 1, "auto": 1}
+
+
+def test_objects_and_dicts_count_the_same():
+    objects = [FalseFriend(id="ff_001", characters="手紙", type=4, category="true_divergence",
+                           severity="critical", affects="both", jp_reading="てがみ",
+                           jp_meanings=["letter"], cn_meanings_simplified=["toilet paper"],
+                           source="curated")]
+    dicts = [{"type": 4, "category": "true_divergence", "severity": "critical",
+              "jp_meanings": ["letter"], "cn_meanings_simplified": ["toilet paper"],
+              "source": "curated", "needs_review": False}]
+    assert _collect(objects, []).stats_document() == _collect(dicts, []).stats_document()
+
+
+def test_merge_equals_one_pass():
+    halves = _collect(FALSE_FRIENDS[:2], CHARACTERS[:1]).merge(
+        _collect(FALSE_FRIENDS[2:], CHARACTERS[1:]))
+    assert halves.stats_document() == _collect().stats_document()
+
+
+def test_empty_collector():
+    document = StatsCollector().stats_document(total_characters=10)
+    assert document["total_characters"] == 10
+    assert document["total_false_friends"] == 0
+    assert document["false_friends_by_severity"] == {"critical": 0, "important": 0, "subtle": 0}
+    assert all(d == {} for d in document["distributions"].values())
+
+
+def test_compile_false_friends_feeds_the_collector():
+    import data_pipeline
+
+    stats = StatsCollector()
+    false_friends = data_pipeline.compile_false_friends(stats)
+    assert stats.stats_document() == _collect(false_friends, []).stats_document()
@@ -0,0 +1,71 @@
+"""String-table JSON: encode() / decode() restore the document exactly."""
+
+import json
+
+import pytest
+
+import string_table
+
+
+DOCUMENT = {
+    "metadata": {"version": "2.0", "count": 4},
+    "false_friends": [
+        {"id": "ff_001", "characters": "勉強", "jp_meanings": ["study"], "cn_meanings": ["reluctant"],
+         "notes": None, "severity": 2},
+        {"id": "ff_002", "characters": "手紙", "jp_meanings": ["letter"], "cn_meanings": ["toilet paper"],
+         "notes": "classic", "severity": 3},
+        # Same fields in another order, a missing field and a mixed-kind value
+        {"characters": "大丈夫", "id": "ff_003", "jp_meanings": ["all right", "study"],
+         "cn_meanings": [], "severity": "high"},
+        {"id": "ff_004", "characters": "愛人", "jp_meanings": None, "cn_meanings": ["spouse"],
+         "notes": None, "severity": None},
+    ],
+}
+
+
+def test_round_trip_is_byte_identical():
+    encoded = string_table.encode(DOCUMENT)
+    restored = string_table.decode(json.loads(json.dumps(encoded)))
+    assert json.dumps(restored, ensure_ascii=False, indent=2) == \
+        json.dumps(DOCUMENT, ensure_ascii=False, indent=2)
+
+
+def test_strings_are_shared_and_most_used_first():
+    encoded = string_table.encode(DOCUMENT)
+    strings = encoded["strings"]
+    assert len(strings) == len(set(strings))
+    assert strings[0] == "study"
+    kinds = dict(encoded["fields"])
+    assert kinds["jp_meanings"] == "l"
+    assert kinds["severity"] == "v"
+    assert isinstance(encoded["records"][0], list)
+    assert isinstance(encoded["records"][2], dict)
+
+
+def test_bare_records_and_empty_lists():
+    document = {"metadata": {}, "false_friends": []}
+    assert string_table.decode(string_table.encode(document)) == document
+    with pytest.raises(ValueError):
+        string_table.encode({"a": [], "b": []})
+
+
+def test_metadata_keys_cannot_shadow_the_format():
+    with pytest.raises(ValueError):
+        string_table.encode({"version": 3, "false_friends": []})
+
+
+def test_decode_rejects_other_documents():
+    with pytest.raises(ValueError):
+        string_table.decode(DOCUMENT)
+    encoded = string_table.encode(DOCUMENT)
+    encoded["version"] = string_table.FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        string_table.decode(encoded)
+
+
+def test_save_and_load(tmp_path):
+    source = tmp_path / "false_friends_expanded.json"
+    path = string_table.strtab_path(source)
+    assert path.name == "false_friends_expanded.strtab.json"
+    string_table.save(DOCUMENT, path)
+    assert string_table.load(path) == DOCUMENT
@@ -0,0 +1,146 @@
+"""Variant tables and clusters: builds over tiny sources and the artifact round trips."""
+
+import pytest
+
+from expand_false_friends import FalseFriend, merge_false_friends
+from variants import (TABLE_NAMES, VariantClusters, VariantTables, build_variant_clusters,
+                      build_variant_tables, write_variant_clusters, write_variants)
+
+
+CEDICT = {
+    "學習": {"traditional": "學習", "simplified": "学习"},
+    "國家": {"traditional": "國家", "simplified": "国家"},
+    "廣場": {"traditional": "廣場", "simplified": "广场"},
+    "臺灣": {"traditional": "臺灣", "simplified": "台湾"},
+    "臺北": {"traditional": "臺北", "simplified": "台北"},
+    "颱風": {"traditional": "颱風", "simplified": "台风"},
+}
+UNIHAN = {
+    "學": {"semantic_variants": "U+5B66<kMatthews"},
+    "廣": {"simplified": "U+5E7F", "z_variants": "U+5E83"},
+    "東": {"simplified": "U+4E1C"},  # no CEDICT word: Unihan fallback
+}
+JMDICT = {"学習": {}, "国家": {}, "広場": {}, "台風": {}}
+
+
+@pytest.fixture(scope="module")
+def tables():
+    return build_variant_tables(UNIHAN, JMDICT, CEDICT)
+
+
+def test_traditional_simplified(tables):
+    assert tables["t2s"]["學"] == "学"
+    assert tables["t2s"]["東"] == "东"
+    assert "家" not in tables["t2s"]
+    # 台 <- 臺 颱: the most frequent pairing wins
+    assert tables["s2t"]["台"] == "臺"
+
+
+def test_japanese_forms_follow_jmdict(tables):
+    assert tables["t2j"] == {"學": "学", "國": "国", "廣": "広", "臺": "台", "颱": "台"}
+    assert tables["j2t"]["広"] == "廣"
+    assert tables["j2t"]["台"] == "臺"
+    assert tables["s2j"]["广"] == "広"
+    assert tables["j2s"]["習"] == "习"
+    assert tables["j2s"]["広"] == "广"
+
+
+def test_fold_joins_scripts(tables):
+    variants = VariantTables(tables)
+    assert variants.convert("學習", "t2j") == "学習"
+    assert variants.fold("広場") == variants.fold("廣場") == "广场"
+    assert variants.same_word("学習", "學習")
+    assert not variants.same_word("学習", "学生")
+
+
+def test_without_jmdict_japanese_tables_are_empty(capsys):
+    tables = build_variant_tables(UNIHAN, {}, CEDICT)
+    assert tables["t2s"]
+    assert not any(tables[name] for name in ("t2j", "j2t", "s2j", "j2s"))
+    assert "Note:" in capsys.readouterr().out
+
+
+def test_round_trip(tables, tmp_path):
+    path = tmp_path / "variants.json"
+    write_variants(tables, path)
+    loaded = VariantTables.load(path)
+    for name in TABLE_NAMES:
+        assert loaded.translations[name] == VariantTables(tables).translations[name]
+    assert VariantTables.load(tmp_path / "missing.json") is None
+
+
+CLUSTER_UNIHAN = {
+    "國": {"simplified": "U+56FD"},
+    "国": {"traditional": "U+570B"},
+    "語": {"simplified": "U+8BED"},
+    "语": {"traditional": "U+8A9E"},
+    # 发 stands for both 發 and 髮, 后 for itself and 後: not followed
+    "發": {"simplified": "U+53D1"},
+    "髮": {"simplified": "U+53D1"},
+    "发": {"traditional": "U+767C U+9AEE"},
+    "後": {"simplified": "U+540E"},
+    "后": {"traditional": "U+540E U+5F8C"},
+    # A chain: 峰 ~ 峯 ~ 㟂, but 峰 and 㟂 are not variants of each other
+    "峰": {"z_variants": "U+5CEF"},
+    "峯": {"semantic_variants": "U+37C2<kMatthews"},
+}
+
+
+@pytest.fixture(scope="module")
+def clusters():
+    return VariantClusters(build_variant_clusters(CLUSTER_UNIHAN))
+
+
+def test_clusters_use_the_lowest_code_point(clusters):
+    assert clusters.key("國語") == clusters.key("国语") == "国語"
+    assert clusters.cluster_id("國") == ord("国")
+    assert clusters.cluster_id("学") == ord("学")
+    assert clusters.key("峰") == clusters.key("㟂") == "㟂"
+
+
+def test_merged_simplifications_stay_apart(clusters):
+    assert len({clusters.key(c) for c in "發髮发"}) == 3
+    assert clusters.key("後") != clusters.key("后")
+
+
+def test_same_word_needs_direct_links(clusters):
+    assert clusters.same_word("國語", "国语")
+    assert clusters.same_word("国語", "國語")
+    assert not clusters.same_word("峰", "㟂")
+    assert not clusters.same_word("國", "國語")
+
+
+def test_clusters_round_trip(tmp_path):
+    built = build_variant_clusters(CLUSTER_UNIHAN)
+    path = tmp_path / "variant_clusters.json"
+    write_variant_clusters(built, path)
+    loaded = VariantClusters.load(path)
+    assert loaded.translation == VariantClusters(built).translation
+    assert loaded.links == built["links"]
+    assert VariantClusters.load(tmp_path / "missing.json") is None
+
+
+def _false_friend(characters, source, severity="subtle"):
+    return FalseFriend(id=f"{source}_{characters}", characters=characters, type=3,
+                       category="true_divergence", severity=severity, affects="both",
+                       jp_reading="", jp_meanings=[], source=source)
+
+
+def test_merge_joins_variant_spellings(clusters):
+    auto = [_false_friend("国語", "auto"), _false_friend("峰", "auto")]
+    curated = [_false_friend("國語", "curated", "critical"), _false_friend("㟂", "curated")]
+    merged = merge_false_friends(curated, [], auto, clusters)
+    assert sorted(ff.source for ff in merged) == ["auto", "curated", "curated"]
+    assert [ff.characters for ff in merged if ff.source == "curated"][0] == "國語"
+    # Without clusters nothing is joined
+    assert len(merge_false_friends(curated, [], auto)) == 4
+
+
+def test_character_links_follow_clusters(clusters):
+    from data_pipeline import add_false_friend_links
+
+    false_friends = [{"id": "ff_001", "characters": "国語"}, {"id": "ff_002", "characters": "峰"}]
+    characters = [{"character": "國語"}, {"character": "国语"}, {"character": "㟂"},
+                  {"character": "国語"}]
+    linked = add_false_friend_links(characters, false_friends, clusters)
+    assert [c.get("false_friend_id") for c in linked] == ["ff_001", "ff_001", None, "ff_001"]
@@ -0,0 +1,93 @@
+"""Watch mode: in-process rebuilds keep results hot and survive module reloads."""
+
+import importlib
+import pickle
+import sys
+
+import pytest
+
+import build
+
+
+MODULE_SOURCE = '''
+from dataclasses import dataclass
+
+@dataclass
+class Entry:
+    word: str
+'''
+
+
+@pytest.fixture
+def build_dirs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(build, "BUILD_DIR", tmp_path / "build")
+    monkeypatch.setattr(build, "CACHE_DIR", tmp_path / "build" / "cache")
+    monkeypatch.setattr(build, "STATE_PATH", tmp_path / "build" / "state.json")
+    return tmp_path
+
+
+@pytest.fixture
+def entry_module(tmp_path, monkeypatch):
+    (tmp_path / "watch_entries.py").write_text(MODULE_SOURCE, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("watch_entries")
+    yield module
+    sys.modules.pop("watch_entries", None)
+
+
+def _count(text):
+    return len(text)
+
+
+def test_in_process_rebuild_reuses_kept_results(build_dirs):
+    calls = []
+    factor = build_dirs / "factor.txt"
+    factor.write_text("2", encoding="utf-8")
+
+    def parse():
+        calls.append("parse")
+        return "abc"
+
+    def scale(n):
+        return n * int(factor.read_text(encoding="utf-8"))
+
+    stages = [build.Stage("parse", parse), build.Stage("count", _count, deps=["parse"]),
+              build.Stage("scale", scale, deps=["count"], inputs=[factor])]
+    runner = build.BuildRunner(stages, in_process=True)
+    runner.run()
+    assert runner.results["scale"] == 6
+
+    # Only the stage whose input changed reruns; nothing is re-parsed
+    factor.write_text("10", encoding="utf-8")
+    assert set(runner.run()) == {"scale"}
+    assert runner.results["scale"] == 30
+    assert calls == ["parse"]
+
+
+def test_forget_results_from_reloaded_module(build_dirs, entry_module):
+    stages = [build.Stage("entries", lambda: [entry_module.Entry("学")]),
+              build.Stage("plain", lambda: {"学": 8})]
+    runner = build.BuildRunner(stages, in_process=True)
+    runner.run()
+
+    old_class = entry_module.Entry
+    reloaded = importlib.reload(entry_module)
+    assert reloaded.Entry is not old_class
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(runner.results["entries"])
+
+    assert runner.forget_results_from([reloaded]) == ["entries"]
+    assert "plain" in runner.results
+    # Read back from the cache, which resolves the reloaded class
+    entries = runner._result("entries")
+    assert type(entries[0]) is reloaded.Entry
+    assert entries[0].word == "学"
+
+
+def test_watched_files_cover_inputs_and_modules(tmp_path):
+    source = tmp_path / "source.txt"
+    runner = build.BuildRunner([build.Stage("parse", _count, inputs=[source])], in_process=True)
+    files = build.watched_files(runner)
+    assert source in files
+    assert build.Path(build.dp.__file__) in files
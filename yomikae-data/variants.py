@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Script Variant Tables
+
+Character-level mappings between traditional Chinese, simplified Chinese
+and Japanese shinjitai, derived from the parsed sources:
+    CC-CEDICT  every traditional/simplified headword pair, aligned per
+               character; the most frequent pairing wins
+    Unihan     kSimplifiedVariant / kTraditionalVariant for characters no
+               CEDICT word covers; kSemanticVariant / kZVariant as
+               candidates for the Japanese form
+    JMdict     character frequency over Japanese headwords decides which
+               variant Japanese actually writes (國 -> 国, 廣 -> 広)
+
+Tables: t2s, s2t, t2j, j2t, s2j, j2s, plus "fold" (every form -> simplified)
+for comparing words across scripts. They are written as one JSON artifact
+and loaded as str.translate() tables, so converting a whole string is a
+single C-level pass.
+
+Clusters: union-find over every Unihan variant link (simplified,
+traditional, semantic, Z) puts each character in one equivalence class,
+identified by its lowest code point (時 时 -> 时). A word's cluster
+key is the word with every character replaced by its cluster's
+representative, so compile_characters, merge_false_friends and
+add_false_friend_links can join Japanese, Traditional and Simplified
+spellings with one dict lookup. Simplifications that merged several
+characters (发 <- 發 髮, 后 <- 后 後) are not followed, so those stay apart,
+and same_word() confirms a key match against the direct links before two
+headwords are treated as one.
+
+Usage:
+    python variants.py 學習 广场 --table fold      # convert with output/variants.json
+    python variants.py 國 広 --clusters            # cluster keys with output/variant_clusters.json
+
+Output:
+    output/variants.json
+    output/variant_clusters.json
+"""
+
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+
+OUTPUT_DIR = Path("output")
+VARIANTS_PATH = OUTPUT_DIR / "variants.json"
+CLUSTERS_PATH = OUTPUT_DIR / "variant_clusters.json"
+
+TABLE_NAMES = ["t2s", "s2t", "t2j", "j2t", "s2j", "j2s", "fold"]
+# Parsed Unihan fields whose links are unioned into clusters
+CLUSTER_FIELDS = ["simplified", "traditional", "semantic_variants", "z_variants"]
+
+_CODEPOINT_RE = re.compile(r"U\+([0-9A-F]{4,6})")
+
+
+# =============================================================================
+# Building
+# =============================================================================
+
+def parse_variant_field(value: str) -> list:
+    """Characters listed in a Unihan variant field ("U+570B<kMatthews U+56FD")."""
+    return [chr(int(cp, 16)) for cp in _CODEPOINT_RE.findall(value or "")]
+
+
+def _majority(pairs: Dict[str, Counter], fallback: Dict[str, list]) -> Dict[str, str]:
+    """Most frequent target per source char, then Unihan for uncovered chars."""
+    table = {}
+    for source, counts in pairs.items():
+        # Ties go to the lower code point so the table is stable
+        target = min(counts.items(), key=lambda kv: (-kv[1], kv[0]))[0]
+        if target != source:
+            table[source] = target
+    for source, targets in fallback.items():
+        if source not in pairs and targets and targets[0] != source:
+            table[source] = targets[0]
+    return table
+
+
+def cedict_pairs(cedict: dict) -> Iterable[tuple]:
+    """Unique (traditional, simplified) headword pairs from parse_cedict() output."""
+    return {(e["traditional"], e["simplified"]) for e in cedict.values()
+            if e.get("traditional") and e.get("simplified")}
+
+
+def build_variant_tables(unihan: dict, jmdict: dict, cedict: dict) -> Dict[str, Dict[str, str]]:
+    """Build every mapping table from parsed Unihan, JMdict and CEDICT."""
+    t2s_counts = defaultdict(Counter)
+    s2t_counts = defaultdict(Counter)
+    trad_freq = Counter()
+    for trad, simp in cedict_pairs(cedict):
+        if len(trad) != len(simp):
+            continue
+        for t, s in zip(trad, simp):
+            t2s_counts[t][s] += 1
+            s2t_counts[s][t] += 1
+            trad_freq[t] += 1
+
+    unihan_simp = {c: parse_variant_field(u.get("simplified")) for c, u in unihan.items()
+                   if u.get("simplified")}
+    unihan_trad = {c: parse_variant_field(u.get("traditional")) for c, u in unihan.items()
+                   if u.get("traditional")}
+    t2s = _majority(t2s_counts, unihan_simp)
+    s2t = _majority(s2t_counts, unihan_trad)
+
+    # Japanese usage decides between a traditional char and its variants
+    jp_freq = Counter(ch for word in jmdict for ch in word)
+    t2j = {}
+    if jp_freq:
+        for trad in set(t2s) | set(trad_freq) | set(unihan_simp):
+            u = unihan.get(trad, {})
+            candidates = {trad, t2s.get(trad, trad)}
+            candidates.update(parse_variant_field(u.get("semantic_variants")))
+            candidates.update(parse_variant_field(u.get("z_variants")))
+            best = min(candidates, key=lambda c: (-jp_freq[c], c))
+            if best != trad and jp_freq[best] > jp_freq[trad]:
+                t2j[trad] = best
+
+    # Inverse: shinjitai -> the traditional form most used in Chinese
+    j2t_candidates = defaultdict(list)
+    for trad, jp in t2j.items():
+        j2t_candidates[jp].append(trad)
+    j2t = {jp: min(trads, key=lambda t: (-trad_freq[t], t))
+           for jp, trads in j2t_candidates.items() if jp not in trads}
+
+    s2j = {}
+    for simp, trad in s2t.items():
+        jp = t2j.get(trad, trad)
+        if jp != simp and jp_freq[simp] == 0 and jp_freq[jp] > 0:
+            s2j[simp] = jp
+
+    # Japanese forms -> simplified; only JMdict says which forms are Japanese
+    j2s = {}
+    if not jp_freq:
+        print("  Note: no JMdict headwords, so the Japanese tables (t2j, j2t, s2j, j2s) are empty")
+    for jp in jp_freq:
+        simp = t2s.get(j2t.get(jp, jp), j2t.get(jp, jp))
+        if simp != jp:
+            j2s[jp] = simp
+
+    fold = dict(t2s)
+    fold.update(j2s)
+
+    return {"t2s": t2s, "s2t": s2t, "t2j": t2j, "j2t": j2t,
+            "s2j": s2j, "j2s": j2s, "fold": fold}
+
+
+def write_variants(tables: Dict[str, Dict[str, str]], output_path: Path = VARIANTS_PATH):
+    output = {
+        "version": 1,
+        "tables": {name: dict(sorted(tables[name].items())) for name in TABLE_NAMES},
+    }
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, separators=(",", ":"))
+    sizes = ", ".join(f"{name} {len(tables[name])}" for name in TABLE_NAMES)
+    print(f"  Wrote {output_path.name} ({sizes})")
+
+
+def build_variant_clusters(unihan: dict) -> Dict[str, Dict[str, str]]:
+    """
+    Union-find over the Unihan variant links.
+
+    Returns {"clusters": character -> representative (its cluster's lowest
+    code point) for every character that is not its own representative,
+    "links": character -> the characters it is directly unioned with}.
+    """
+    # Simplified chars standing for more than one character are ambiguous,
+    # counting the char itself when it is also its own traditional form
+    # (后 <- 后 後, 面 <- 面 麵)
+    traditional_of = defaultdict(set)
+    for char, u in unihan.items():
+        for simp in parse_variant_field(u.get("simplified")):
+            traditional_of[simp].add(char)
+        for trad in parse_variant_field(u.get("traditional")):
+            traditional_of[char].add(trad)
+    ambiguous = {simp for simp, trads in traditional_of.items() if len(trads | {simp}) > 1
+                 and (simp in trads or len(trads) > 1)}
+
+    parent = {}
+
+    def find(char: str) -> str:
+        root = parent.setdefault(char, char)
+        while root != parent[root]:
+            # Path halving keeps every chain short
+            parent[root] = parent[parent[root]]
+            root = parent[root]
+        return root
+
+    def union(a: str, b: str):
+        a, b = find(a), find(b)
+        if a != b:
+            # The lower code point stays root, so roots are the representatives
+            if a < b:
+                parent[b] = a
+            else:
+                parent[a] = b
+
+    links = defaultdict(set)
+    for char, u in unihan.items():
+        for name in CLUSTER_FIELDS:
+            for other in parse_variant_field(u.get(name)):
+                if other == char:
+                    continue
+                if name in ("simplified", "traditional") and (char in ambiguous or other in ambiguous):
+                    continue
+                union(char, other)
+                links[char].add(other)
+                links[other].add(char)
+
+    return {
+        "clusters": {char: find(char) for char in parent if find(char) != char},
+        "links": {char: "".join(sorted(others)) for char, others in links.items()},
+    }
+
+
+def write_variant_clusters(clusters: Dict[str, Dict[str, str]], output_path: Path = CLUSTERS_PATH):
+    output = {"version": 2,
+              "clusters": dict(sorted(clusters["clusters"].items())),
+              "links": dict(sorted(clusters["links"].items()))}
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, separators=(",", ":"))
+    sizes = Counter(clusters["clusters"].values())
+    largest = max(sizes.values(), default=0) + 1
+    print(f"  Wrote {output_path.name} ({len(sizes)} clusters over "
+          f"{len(clusters['clusters']) + len(sizes)} characters, largest {largest})")
+
+
+# =============================================================================
+# Conversion
+# =============================================================================
+
+class VariantTables:
+    """str.translate() tables built once from build_variant_tables() output."""
+
+    def __init__(self, tables: Dict[str, Dict[str, str]]):
+        self.translations = {name: {ord(k): ord(v) for k, v in tables.get(name, {}).items()}
+                             for name in TABLE_NAMES}
+
+    @classmethod
+    def load(cls, path: Path = VARIANTS_PATH) -> Optional["VariantTables"]:
+        """Load the artifact, or None if the pipeline has not written it."""
+        if not Path(path).exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f)["tables"])
+
+    def convert(self, text: str, table: str) -> str:
+        return text.translate(self.translations[table])
+
+    def fold(self, text: str) -> str:
+        """Any script -> simplified, for comparisons."""
+        return text.translate(self.translations["fold"])
+
+    def same_word(self, a: str, b: str) -> bool:
+        """True when a and b differ at most by script variants (時間 / 时间)."""
+        return a == b or self.fold(a) == self.fold(b)
+
+
+class VariantClusters:
+    """Cluster IDs and word-level join keys from build_variant_clusters() output."""
+
+    def __init__(self, clusters: Dict[str, Dict[str, str]]):
+        self.translation = {ord(k): ord(v) for k, v in clusters["clusters"].items()}
+        self.links = clusters["links"]
+
+    @classmethod
+    def load(cls, path: Path = CLUSTERS_PATH) -> Optional["VariantClusters"]:
+        """Load the artifact, or None if the pipeline has not written it."""
+        if not Path(path).exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def cluster_id(self, char: str) -> int:
+        """The cluster's representative code point (the char's own if it has no variants)."""
+        return self.translation.get(ord(char), ord(char))
+
+    def key(self, text: str) -> str:
+        """Join key: every character replaced by its cluster representative."""
+        return text.translate(self.translation)
+
+    def same_word(self, a: str, b: str) -> bool:
+        """
+        True when a and b are spellings of one word: every character pair is
+        equal or directly linked in Unihan. Sharing a key is not enough,
+        since a cluster can chain characters that are not variants of
+        each other.
+        """
+        if a == b:
+            return True
+        if len(a) != len(b) or self.key(a) != self.key(b):
+            return False
+        return all(x == y or y in self.links.get(x, "") for x, y in zip(a, b))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert text with the variant tables")
+    parser.add_argument("text", nargs="+")
+    parser.add_argument("--table", choices=TABLE_NAMES, default="fold")
+    parser.add_argument("--path", type=str, default=None)
+    parser.add_argument("--clusters", action="store_true",
+                        help="Print cluster keys (output/variant_clusters.json) instead")
+    args = parser.parse_args()
+
+    if args.clusters:
+        path = Path(args.path or CLUSTERS_PATH)
+        clusters = VariantClusters.load(path)
+        if clusters is None:
+            raise SystemExit(f"{path} not found; run data_pipeline.py first")
+        for text in args.text:
+            ids = " ".join(f"U+{clusters.cluster_id(c):04X}" for c in text)
+            print(f"{text} -> {clusters.key(text)} ({ids})")
+        raise SystemExit(0)
+
+    args.path = args.path or str(VARIANTS_PATH)
+    variants = VariantTables.load(Path(args.path))
+    if variants is None:
+        raise SystemExit(f"{args.path} not found; run data_pipeline.py first")
+    for text in args.text:
+        print(f"{text} -> {variants.convert(text, args.table)}")